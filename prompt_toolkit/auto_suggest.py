@@ -9,6 +9,10 @@ suggestion will be inserted.
 from __future__ import unicode_literals
 from abc import ABCMeta, abstractmethod
 from six import with_metaclass
+from six.moves import range
+
+import threading
+import weakref
 
 from .filters import to_cli_filter
 
@@ -53,11 +57,36 @@ class AutoSuggest(with_metaclass(ABCMeta, object)):
         :param document: The :class:`~prompt_toolkit.document.Document` instance.
         """
 
+    #: Optional coroutine method. It takes the same arguments as
+    #: :meth:`get_suggestion` and returns the same result. When the interface
+    #: runs on an asyncio event loop, this is scheduled as a task instead of
+    #: running :meth:`get_suggestion` in a thread.
+    get_suggestion_async = None
+
 
 class AutoSuggestFromHistory(AutoSuggest):
     """
     Give suggestions based on the lines in the history.
+
+    The lines of the history are kept in a prefix index, so that looking up a
+    suggestion takes time proportional to the length of the input, not to the
+    size of the history. (The index is built on the first call and catches up
+    with new history entries afterwards.)
     """
+    def __init__(self):
+        # Map `History` instances to their `_HistoryPrefixIndex`.
+        self._indexes = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _get_index(self, history):
+        with self._lock:
+            try:
+                return self._indexes[history]
+            except KeyError:
+                index = _HistoryPrefixIndex(history)
+                self._indexes[history] = index
+                return index
+
     def get_suggestion(self, cli, buffer, document):
         history = buffer.history
 
@@ -66,11 +95,105 @@ class AutoSuggestFromHistory(AutoSuggest):
 
         # Only create a suggestion when this is not an empty line.
         if text.strip():
-            # Find first matching line in history.
-            for string in reversed(list(history)):
-                for line in reversed(string.splitlines()):
-                    if line.startswith(text):
-                        return Suggestion(line[len(text):])
+            # Find most recent matching line in history.
+            line = self._get_index(history).find(text)
+            if line is not None:
+                return Suggestion(line[len(text):])
+
+
+class _TrieNode(object):
+    """
+    Node of the history prefix trie.
+
+    :param line: The most recent line that starts with the prefix that leads
+        to this node.
+    :param children: Dictionary mapping the next character to a child node,
+        or `None` when `line` is the only line below this node. (In that case,
+        the node is a leaf that's only expanded when another line arrives.)
+    """
+    __slots__ = ('line', 'children')
+
+    def __init__(self, line, children=None):
+        self.line = line
+        self.children = children
+
+
+class _HistoryPrefixIndex(object):
+    """
+    Recency-ordered prefix index over all the lines of a
+    :class:`~prompt_toolkit.history.History`.
+
+    Every trie node remembers the most recent line that passes through it.
+    History is append-only, so we only have to insert the entries that were
+    added since the last lookup.
+    """
+    def __init__(self, history):
+        self.history = history
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._root = _TrieNode(None, {})
+        self._count = 0  # Number of history entries in the index.
+
+    def _update(self):
+        " Insert the history entries that were appended since the last call. "
+        history = self.history
+        count = len(history)
+
+        # Rebuild when the history shrunk. (It was replaced or cleared.)
+        if count < self._count:
+            self._reset()
+
+        for i in range(self._count, count):
+            for line in history[i].splitlines():
+                self._insert(line)
+
+        self._count = count
+
+    def _insert(self, line):
+        node = self._root
+        node.line = line
+
+        for i, c in enumerate(line):
+            child = node.children.get(c)
+
+            if child is None:
+                node.children[c] = _TrieNode(line)
+                return
+
+            if child.children is None:
+                # Same line as before? Nothing to do.
+                if child.line == line:
+                    return
+
+                # Expand leaf: push the existing line one level down.
+                old_line = child.line
+                child.children = {}
+                if len(old_line) > i + 1:
+                    child.children[old_line[i + 1]] = _TrieNode(old_line)
+
+            child.line = line
+            node = child
+
+    def find(self, prefix):
+        """
+        Return the most recent line that starts with `prefix`, or `None`.
+        """
+        with self._lock:
+            self._update()
+
+            node = self._root
+            for c in prefix:
+                if node.children is None:
+                    # Leaf: only one candidate left.
+                    break
+                node = node.children.get(c)
+                if node is None:
+                    return None
+
+            if node.line is not None and node.line.startswith(prefix):
+                return node.line
 
 
 class ConditionalAutoSuggest(AutoSuggest):
@@ -6,11 +6,12 @@ from __future__ import unicode_literals
 
 from .auto_suggest import AutoSuggest
 from .clipboard import ClipboardData
-from .completion import Completer, Completion, CompleteEvent
+from .completion import Completer, Completion, CompleteEvent, BoundedCompletions
 from .document import Document
 from .enums import IncrementalSearchDirection
 from .filters import to_simple_filter
 from .history import History, InMemoryHistory
+from .history_search import FuzzyHistorySearch
 from .search_state import SearchState
 from .selection import SelectionType, SelectionState, PasteMode
 from .utils import Event
@@ -19,6 +20,7 @@ from .validation import ValidationError
 
 from six.moves import range
 
+import bisect
 import os
 import re
 import six
@@ -78,11 +80,16 @@ class AcceptAction(object):
         """
         Validate buffer and handle the accept action.
         """
-        if buffer.validate():
-            if self.handler:
-                self.handler(cli, buffer)
+        def handle(valid):
+            if valid:
+                if self.handler:
+                    self.handler(cli, buffer)
 
-            buffer.append_to_history()
+                buffer.append_to_history()
+            else:
+                cli.invalidate()
+
+        buffer.validate_and_call(cli.eventloop, handle)
 
 
 def _return_document_handler(cli, buffer):
@@ -109,9 +116,17 @@ class ValidationState(object):
 
 class CompletionState(object):
     """
-    Immutable class that contains a completion state.
+    Class that contains a completion state.
+
+    Selecting another completion creates a new :class:`.CompletionState`, but
+    while completions are streamed in (see
+    `CommandLineInterface.completion_batch_interval`), the
+    `current_completions` list is extended in place and `hidden_count` is
+    updated when the completer is done. The list is shared with the states
+    created by :meth:`.go_to_index`.
     """
-    def __init__(self, original_document, current_completions=None, complete_index=None):
+    def __init__(self, original_document, current_completions=None, complete_index=None,
+                 hidden_count=0):
         #: Document as it was when the completion started.
         self.original_document = original_document
 
@@ -123,6 +138,10 @@ class CompletionState(object):
         #: This can be `None` to indicate "no completion", the original text.
         self.complete_index = complete_index  # Position in the `_completions` array.
 
+        #: Number of completions that were left out, because of
+        #: `Buffer.max_completions`.
+        self.hidden_count = hidden_count
+
     def __repr__(self):
         return '%s(%r, <%r> completions, index=%r)' % (
             self.__class__.__name__,
@@ -132,7 +151,8 @@ class CompletionState(object):
         """
         Create a new :class:`.CompletionState` object with the new index.
         """
-        return CompletionState(self.original_document, self.current_completions, complete_index=index)
+        return CompletionState(self.original_document, self.current_completions,
+                               complete_index=index, hidden_count=self.hidden_count)
 
     def new_text_and_position(self):
         """
@@ -182,6 +202,168 @@ class YankNthArgState(object):
             self.previous_inserted_word)
 
 
+class _WorkingLinesIndex(object):
+    """
+    Search index over the working lines of a :class:`.Buffer`.
+
+    All working lines are concatenated into one corpus string (and a reversed
+    copy of it for backward searches), so that finding the next matching
+    entry in the history is a single regular expression search instead of a
+    loop over all the entries.
+
+    For the up-arrow history search, the index also keeps the list of entries
+    that start with a given prefix.
+
+    The corpus is a snapshot. When a working line is modified, the buffer
+    calls :meth:`line_changed`: from then on, that line is searched in the
+    working lines themselves, and the prefix lists are patched for it. So
+    typing doesn't require building the index again.
+    """
+    _SEPARATOR = '\0'
+    _MAX_PREFIXES = 8
+
+    def __init__(self, working_lines):
+        self.working_lines = working_lines
+        self.corpus = self._SEPARATOR.join(working_lines)
+        self.reversed_corpus = self.corpus[::-1]
+
+        # Start offset of each entry in the corpus.
+        self.offsets = []
+        pos = 0
+        for line in working_lines:
+            self.offsets.append(pos)
+            pos += len(line) + 1
+
+        # Sorted indexes of the lines that are different from the corpus.
+        self._changed = []
+
+        # Maps prefixes to the sorted list of matching entry indexes.
+        self._prefix_matches = {}
+
+    def line_changed(self, index):
+        """
+        Called when the working line at `index` has been modified.
+        """
+        i = bisect.bisect_left(self._changed, index)
+        if i == len(self._changed) or self._changed[i] != index:
+            self._changed.insert(i, index)
+
+        line = self.working_lines[index]
+
+        for prefix, matches in self._prefix_matches.items():
+            i = bisect.bisect_left(matches, index)
+            present = i < len(matches) and matches[i] == index
+
+            if line.startswith(prefix) != present:
+                if present:
+                    del matches[i]
+                else:
+                    matches.insert(i, index)
+
+    def prefix_matches(self, prefix):
+        """
+        Return the sorted list of entry indexes that start with `prefix`.
+        """
+        try:
+            return self._prefix_matches[prefix]
+        except KeyError:
+            if len(self._prefix_matches) >= self._MAX_PREFIXES:
+                self._prefix_matches.clear()
+
+            matches = self._prefix_matches[prefix] = [
+                i for i, line in enumerate(self.working_lines)
+                if line.startswith(prefix)]
+            return matches
+
+    def _end(self, index):
+        " End offset of the entry at `index` in the corpus. "
+        if index + 1 < len(self.offsets):
+            return self.offsets[index + 1] - 1
+        else:
+            return len(self.corpus)
+
+    def _entry_at(self, position):
+        " Entry index for this position in the corpus. "
+        return bisect.bisect_right(self.offsets, position) - 1
+
+    def _changed_between(self, first, last):
+        " Sorted indexes of the modified lines from `first` until `last`. "
+        return self._changed[bisect.bisect_left(self._changed, first):
+                             bisect.bisect_right(self._changed, last)]
+
+    def find(self, text, first, last, ignore_case=False):
+        """
+        Find the first occurrence of `text` in the entries `first` until
+        `last` (inclusive). Return a (working_index, cursor_position) tuple or
+        `None`.
+        """
+        if first > last:
+            return
+
+        pattern = re.compile(re.escape(text), re.IGNORECASE if ignore_case else 0)
+
+        # Searching for the separator itself could match across entries.
+        # Search entry by entry in that case.
+        if self._SEPARATOR in text:
+            changed = range(first, last + 1)
+        else:
+            changed = self._changed_between(first, last)
+
+        # Search the unmodified entries in the corpus, and the modified
+        # entries in between separately.
+        start = first
+        for i in list(changed) + [last + 1]:
+            if start < i:
+                m = pattern.search(self.corpus, self.offsets[start], self._end(i - 1))
+                if m:
+                    i = self._entry_at(m.start())
+                    return i, m.start() - self.offsets[i]
+
+            if i <= last:
+                m = pattern.search(self.working_lines[i])
+                if m:
+                    return i, m.start()
+
+            start = i + 1
+
+    def find_backwards(self, text, first, last, ignore_case=False):
+        """
+        Find the last occurrence of `text` in the entries `first` until `last`
+        (inclusive). Return a (working_index, cursor_position) tuple or
+        `None`.
+        """
+        if first > last:
+            return
+
+        pattern = re.compile(re.escape(text[::-1]), re.IGNORECASE if ignore_case else 0)
+
+        if self._SEPARATOR in text:
+            changed = range(first, last + 1)
+        else:
+            changed = self._changed_between(first, last)
+
+        # Search the unmodified entries in the reversed corpus. (The first
+        # match there is the last match in the original.)
+        length = len(self.corpus)
+        end = last
+        for i in list(reversed(changed)) + [first - 1]:
+            if i < end:
+                m = pattern.search(self.reversed_corpus,
+                                   length - self._end(end), length - self.offsets[i + 1])
+                if m:
+                    start = length - m.start() - len(text)
+                    i = self._entry_at(start)
+                    return i, start - self.offsets[i]
+
+            if i >= first:
+                line = self.working_lines[i]
+                m = pattern.search(line[::-1])
+                if m:
+                    return i, len(line) - m.start() - len(text)
+
+            end = i - 1
+
+
 class Buffer(object):
     """
     The core data structure that holds the text and cursor position of the
@@ -192,6 +374,11 @@ class Buffer(object):
     :param history: :class:`~prompt_toolkit.history.History` instance.
     :param tempfile_suffix: Suffix to be appended to the tempfile for the 'open
                            in editor' function.
+    :param max_completions: Maximum number of completions to keep. The menu
+        shows how many were left out. (`None` means unlimited.)
+    :param completion_sort_key: Callable that takes a
+        :class:`~prompt_toolkit.completion.Completion` and returns a sort key.
+        When given, completions are sorted, and only the best ones are kept.
 
     Events:
 
@@ -221,7 +408,8 @@ class Buffer(object):
                  is_multiline=False, complete_while_typing=False,
                  enable_history_search=False, initial_document=None,
                  accept_action=AcceptAction.IGNORE, read_only=False,
-                 on_text_changed=None, on_text_insert=None, on_cursor_position_changed=None):
+                 on_text_changed=None, on_text_insert=None, on_cursor_position_changed=None,
+                 max_completions=None, completion_sort_key=None):
 
         # Accept both filters and booleans as input.
         enable_history_search = to_simple_filter(enable_history_search)
@@ -236,6 +424,8 @@ class Buffer(object):
         assert on_text_changed is None or callable(on_text_changed)
         assert on_text_insert is None or callable(on_text_insert)
         assert on_cursor_position_changed is None or callable(on_cursor_position_changed)
+        assert max_completions is None or (isinstance(max_completions, int) and max_completions > 0)
+        assert completion_sort_key is None or callable(completion_sort_key)
 
         self.completer = completer
         self.auto_suggest = auto_suggest
@@ -248,6 +438,8 @@ class Buffer(object):
         self.complete_while_typing = complete_while_typing
         self.enable_history_search = enable_history_search
         self.read_only = read_only
+        self.max_completions = max_completions
+        self.completion_sort_key = completion_sort_key
 
         # Text width. (For wrapping, used by the Vi 'gq' operator.)
         self.text_width = 0
@@ -267,6 +459,12 @@ class Buffer(object):
         # Document cache. (Avoid creating new Document instances.)
         self._document_cache = FastDictCache(Document, size=10)
 
+        # Fuzzy search index over the history. (Created lazily.)
+        self._fuzzy_history_search = None
+
+        # Running `validate_async` task.
+        self._validation_task = None
+
         self.reset(initial_document=initial_document)
 
     def reset(self, initial_document=None, append_to_history=False):
@@ -285,6 +483,7 @@ class Buffer(object):
         # `ValidationError` instance. (Will be set when the input is wrong.)
         self.validation_error = None
         self.validation_state = ValidationState.UNKNOWN
+        self._cancel_validation_task()
 
         # State of the selection.
         self.selection_state = None
@@ -323,10 +522,13 @@ class Buffer(object):
         #: Ctrl-C should reset this, and copy the whole history back in here.
         #: Enter should process the current command and append to the real
         #: history.
-        self._working_lines = self.history.strings[:]
+        self._working_lines = list(self.history)
         self._working_lines.append(initial_document.text)
         self.__working_index = len(self._working_lines) - 1
 
+        # Search index over the working lines. (Created lazily.)
+        self._working_lines_index = None
+
     # <getters/setters>
 
     def _set_text(self, value):
@@ -338,17 +540,23 @@ class Buffer(object):
         working_lines[working_index] = value
 
         # Return True when this text has been changed.
-        if len(value) != len(original_value):
-            # For Python 2, it seems that when two strings have a different
-            # length and one is a prefix of the other, Python still scans
-            # character by character to see whether the strings are different.
-            # (Some benchmarking showed significant differences for big
-            # documents. >100,000 of lines.)
-            return True
-        elif value != original_value:
+        # (For Python 2, it seems that when two strings have a different
+        # length and one is a prefix of the other, Python still scans
+        # character by character to see whether the strings are different.
+        # Some benchmarking showed significant differences for big documents.
+        # >100,000 of lines. So, compare the length first.)
+        if len(value) != len(original_value) or value != original_value:
+            if self._working_lines_index is not None:
+                self._working_lines_index.line_changed(working_index)
             return True
         return False
 
+    def _get_working_lines_index(self):
+        " Return the :class:`._WorkingLinesIndex` for the working lines. "
+        if self._working_lines_index is None:
+            self._working_lines_index = _WorkingLinesIndex(self._working_lines)
+        return self._working_lines_index
+
     def _set_cursor_position(self, value):
         """ Set cursor position. Return whether it changed. """
         original_position = self.__cursor_position
@@ -413,6 +621,7 @@ class Buffer(object):
         # Remove any validation errors and complete state.
         self.validation_error = None
         self.validation_state = ValidationState.UNKNOWN
+        self._cancel_validation_task()
         self.complete_state = None
         self.yank_nth_arg_state = None
         self.document_before_paste = None
@@ -427,6 +636,7 @@ class Buffer(object):
         # Remove any validation errors and complete state.
         self.validation_error = None
         self.validation_state = ValidationState.UNKNOWN
+        self._cancel_validation_task()
         self.complete_state = None
         self.yank_nth_arg_state = None
         self.document_before_paste = None
@@ -749,19 +959,25 @@ class Buffer(object):
             self.go_to_completion(None)
             self.complete_state = None
 
-    def set_completions(self, completions, go_to_first=True, go_to_last=False):
+    def set_completions(self, completions, go_to_first=True, go_to_last=False,
+                        hidden_count=0):
         """
         Start completions. (Generate list of completions and initialize.)
+
+        :param hidden_count: Number of completions that were left out.
         """
         assert not (go_to_first and go_to_last)
 
         # Generate list of all completions.
         if completions is None:
             if self.completer:
-                completions = list(self.completer.get_completions(
-                    self.document,
-                    CompleteEvent(completion_requested=True)
-                ))
+                collector = self.create_completion_collector()
+                for c in self.completer.get_completions(
+                        self.document, CompleteEvent(completion_requested=True)):
+                    collector.add(c)
+
+                completions = collector.completions
+                hidden_count = collector.hidden_count
             else:
                 completions = []
 
@@ -769,7 +985,8 @@ class Buffer(object):
         if completions:
             self.complete_state = CompletionState(
                 original_document=self.document,
-                current_completions=completions)
+                current_completions=completions,
+                hidden_count=hidden_count)
             if go_to_first:
                 self.go_to_completion(0)
             elif go_to_last:
@@ -780,6 +997,13 @@ class Buffer(object):
         else:
             self.complete_state = None
 
+    def create_completion_collector(self):
+        """
+        Create a :class:`~prompt_toolkit.completion.BoundedCompletions` for
+        collecting the completions of this buffer.
+        """
+        return BoundedCompletions(limit=self.max_completions, key=self.completion_sort_key)
+
     def start_history_lines_completion(self):
         """
         Start a completion based on all the other lines in the document and the
@@ -812,6 +1036,32 @@ class Buffer(object):
 
         self.set_completions(completions=completions[::-1])
 
+    def start_fuzzy_history_completion(self, max_results=20):
+        """
+        Start a completion with the history entries that fuzzy match the
+        current line. Frequently and recently used entries come first.
+        """
+        if (self._fuzzy_history_search is None or
+                self._fuzzy_history_search.history is not self.history):
+            self._fuzzy_history_search = FuzzyHistorySearch(self.history)
+
+        current_line = self.document.current_line_before_cursor
+
+        completions = []
+        for match in self._fuzzy_history_search.find(current_line, max_results=max_results):
+            if match.count > 1:
+                display_meta = 'Used %s times' % match.count
+            else:
+                display_meta = 'Used once'
+
+            completions.append(Completion(
+                match.text,
+                start_position=-len(current_line),
+                display=match.text.replace('\n', ' '),
+                display_meta=display_meta))
+
+        self.set_completions(completions=completions)
+
     def go_to_completion(self, index):
         """
         Select a completion from the list of current completions.
@@ -852,13 +1102,17 @@ class Buffer(object):
         else:
             self.history_search_text = None
 
-    def _history_matches(self, i):
+    def _history_search_matches(self):
         """
-        True when the current entry matches the history search.
-        (when we don't have history search, it's also True.)
+        Return the sorted list of working line indexes that match the history
+        search, or `None` when every entry matches. (When we don't have
+        history search.)
         """
-        return (self.history_search_text is None or
-                self._working_lines[i].startswith(self.history_search_text))
+        if self.history_search_text is None:
+            return None
+        else:
+            return self._get_working_lines_index().prefix_matches(
+                self.history_search_text)
 
     def history_forward(self, count=1):
         """
@@ -869,18 +1123,20 @@ class Buffer(object):
         self._set_history_search()
 
         # Go forward in history.
-        found_something = False
-
-        for i in range(self.working_index + 1, len(self._working_lines)):
-            if self._history_matches(i):
-                self.working_index = i
-                count -= 1
-                found_something = True
-            if count == 0:
-                break
+        matches = self._history_search_matches()
+        new_index = None
+
+        if matches is None:
+            if self.working_index < len(self._working_lines) - 1:
+                new_index = min(len(self._working_lines) - 1, self.working_index + count)
+        else:
+            i = bisect.bisect_right(matches, self.working_index)
+            if i < len(matches):
+                new_index = matches[min(len(matches) - 1, i + count - 1)]
 
         # If we found an entry, move cursor to the end of the first line.
-        if found_something:
+        if new_index is not None:
+            self.working_index = new_index
             self.cursor_position = 0
             self.cursor_position += self.document.get_end_of_line_position()
 
@@ -891,18 +1147,20 @@ class Buffer(object):
         self._set_history_search()
 
         # Go back in history.
-        found_something = False
-
-        for i in range(self.working_index - 1, -1, -1):
-            if self._history_matches(i):
-                self.working_index = i
-                count -= 1
-                found_something = True
-            if count == 0:
-                break
+        matches = self._history_search_matches()
+        new_index = None
+
+        if matches is None:
+            if self.working_index > 0:
+                new_index = max(0, self.working_index - count)
+        else:
+            i = bisect.bisect_left(matches, self.working_index)
+            if i > 0:
+                new_index = matches[max(0, i - count)]
 
         # If we move to another entry, move cursor to the end of the line.
-        if found_something:
+        if new_index is not None:
+            self.working_index = new_index
             self.cursor_position = len(self.text)
 
     def yank_nth_arg(self, n=None, _yank_last_arg=False):
@@ -1102,18 +1360,71 @@ class Buffer(object):
             try:
                 self.validator.validate(self.document)
             except ValidationError as e:
-                # Set cursor position (don't allow invalid values.)
-                cursor_position = e.cursor_position
-                self.cursor_position = min(max(0, cursor_position), len(self.text))
-
-                self.validation_state = ValidationState.INVALID
-                self.validation_error = e
+                self._set_validation_error(e)
                 return False
 
         self.validation_state = ValidationState.VALID
         self.validation_error = None
         return True
 
+    def _set_validation_error(self, e):
+        # Set cursor position (don't allow invalid values.)
+        cursor_position = e.cursor_position
+        self.cursor_position = min(max(0, cursor_position), len(self.text))
+
+        self.validation_state = ValidationState.INVALID
+        self.validation_error = e
+
+    def validate_and_call(self, eventloop, callback):
+        """
+        Validate the input and call `callback` with `True` when it's valid, or
+        `False` otherwise.
+
+        When the validator has a `validate_async` coroutine and the event loop
+        supports coroutines, the validation runs as a task and `callback` is
+        called when it's done. (Not at all when the input changes in the
+        meantime.) Otherwise, `callback` is called right away.
+        """
+        validator = self.validator
+
+        if (self.validation_state != ValidationState.UNKNOWN or validator is None or
+                validator.validate_async is None or not eventloop.supports_coroutines):
+            callback(self.validate())
+            return
+
+        # Already validating this input.
+        if self._validation_task is not None:
+            return
+
+        task = eventloop.create_task(validator.validate_async(self.document))
+        self._validation_task = task
+
+        def done(_):
+            if self._validation_task is not task:
+                return  # Cancelled.
+
+            self._validation_task = None
+
+            try:
+                task.result()
+            except ValidationError as e:
+                self._set_validation_error(e)
+                callback(False)
+            else:
+                self.validation_state = ValidationState.VALID
+                self.validation_error = None
+                callback(True)
+
+        task.add_done_callback(done)
+
+    def _cancel_validation_task(self):
+        " Cancel the running `validate_async` task, if any. "
+        task = self._validation_task
+        self._validation_task = None
+
+        if task is not None:
+            task.cancel()
+
     def append_to_history(self):
         """
         Append the current input to the history.
@@ -1145,6 +1456,9 @@ class Buffer(object):
             Do search one time.
             Return (working_index, document) or `None`
             """
+            index = self._get_working_lines_index()
+            last = len(self._working_lines) - 1
+
             if direction == IncrementalSearchDirection.FORWARD:
                 # Try find at the current input.
                 new_index = document.find(
@@ -1155,17 +1469,15 @@ class Buffer(object):
                     return (working_index,
                             Document(document.text, document.cursor_position + new_index))
                 else:
-                    # No match, go forward in the history. (Include len+1 to wrap around.)
+                    # No match, go forward in the history. (Wrap around to
+                    # the first entry.)
                     # (Here we should always include all cursor positions, because
                     # it's a different line.)
-                    for i in range(working_index + 1, len(self._working_lines) + 1):
-                        i %= len(self._working_lines)
-
-                        document = Document(self._working_lines[i], 0)
-                        new_index = document.find(text, include_current_position=True,
-                                                  ignore_case=ignore_case)
-                        if new_index is not None:
-                            return (i, Document(document.text, new_index))
+                    result = (index.find(text, working_index + 1, last, ignore_case) or
+                              index.find(text, 0, 0, ignore_case))
+                    if result is not None:
+                        i, position = result
+                        return (i, Document(self._working_lines[i], position))
             else:
                 # Try find at the current input.
                 new_index = document.find_backwards(
@@ -1175,15 +1487,13 @@ class Buffer(object):
                     return (working_index,
                             Document(document.text, document.cursor_position + new_index))
                 else:
-                    # No match, go back in the history. (Include -1 to wrap around.)
-                    for i in range(working_index - 1, -2, -1):
-                        i %= len(self._working_lines)
-
-                        document = Document(self._working_lines[i], len(self._working_lines[i]))
-                        new_index = document.find_backwards(
-                            text, ignore_case=ignore_case)
-                        if new_index is not None:
-                            return (i, Document(document.text, len(document.text) + new_index))
+                    # No match, go back in the history. (Wrap around to the
+                    # last entry.)
+                    result = (index.find_backwards(text, 0, working_index - 1, ignore_case) or
+                              index.find_backwards(text, last, last, ignore_case))
+                    if result is not None:
+                        i, position = result
+                        return (i, Document(self._working_lines[i], position))
 
         # Do 'count' search iterations.
         working_index = self.working_index
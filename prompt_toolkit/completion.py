@@ -4,10 +4,13 @@ from __future__ import unicode_literals
 from abc import ABCMeta, abstractmethod
 from six import with_metaclass
 
+import heapq
+
 __all__ = (
     'Completion',
     'Completer',
     'CompleteEvent',
+    'BoundedCompletions',
     'get_common_complete_suffix',
 )
 
@@ -24,13 +27,17 @@ class Completion(object):
         completion, e.g. the path or source where it's coming from.
     :param get_display_meta: Lazy `display_meta`. Retrieve meta information
         only when meta is displayed.
+    :param highlighted_positions: (Optional) Indexes of the characters in
+        `display` that are highlighted in the completion menu. E.g. the
+        characters that matched the input.
     """
     def __init__(self, text, start_position=0, display=None, display_meta=None,
-                 get_display_meta=None):
+                 get_display_meta=None, highlighted_positions=None):
         self.text = text
         self.start_position = start_position
         self._display_meta = display_meta
         self._get_display_meta = get_display_meta
+        self.highlighted_positions = highlighted_positions
 
         if display is None:
             self.display = text
@@ -80,11 +87,25 @@ class Completion(object):
         """
         assert isinstance(position, int) and position - self.start_position >= 0
 
+        return self._copy(text=self.text[position - self.start_position:], start_position=0)
+
+    def new_completion_with_start_position(self, start_position):
+        """
+        Get a copy of this completion, that starts at another position
+        relative to the cursor. (For when text was typed after the completion
+        was created. All other attributes are kept.)
+        """
+        return self._copy(text=self.text, start_position=start_position)
+
+    def _copy(self, text, start_position):
+        " Copy this completion, with a new text and start position. "
         return Completion(
-            text=self.text[position - self.start_position:],
+            text=text,
+            start_position=start_position,
             display=self.display,
             display_meta=self._display_meta,
-            get_display_meta=self._get_display_meta)
+            get_display_meta=self._get_display_meta,
+            highlighted_positions=self.highlighted_positions)
 
 
 class CompleteEvent(object):
@@ -100,6 +121,11 @@ class CompleteEvent(object):
     shows some completions when ``Tab`` has been pressed, but not
     automatically when the user presses a space. (Because of
     `complete_while_typing`.)
+
+    When completions are retrieved in the background, the event is cancelled
+    as soon as the result is no longer needed. (Because the text changed.)
+    The remaining completions are not consumed anymore in that case. Slow
+    completers can check `cancelled` to stop their work early.
     """
     def __init__(self, text_inserted=False, completion_requested=False):
         assert not (text_inserted and completion_requested)
@@ -110,6 +136,13 @@ class CompleteEvent(object):
         #: Used explicitely requested completion by pressing 'tab'.
         self.completion_requested = completion_requested
 
+        #: True when the completions are no longer needed.
+        self.cancelled = False
+
+    def cancel(self):
+        " Tell the completer that the completions are no longer needed. "
+        self.cancelled = True
+
     def __repr__(self):
         return '%s(text_inserted=%r, completion_requested=%r)' % (
             self.__class__.__name__, self.text_inserted, self.completion_requested)
@@ -130,6 +163,76 @@ class Completer(with_metaclass(ABCMeta, object)):
         while False:
             yield
 
+    #: Optional coroutine method. It takes the same arguments as
+    #: :meth:`get_completions`, and returns a list of :class:`.Completion`
+    #: instances. When the interface runs on an asyncio event loop, this is
+    #: scheduled as a task instead of running :meth:`get_completions` in a
+    #: thread. The task is cancelled when the input changes.
+    get_completions_async = None
+
+
+class BoundedCompletions(object):
+    """
+    Collect completions from a stream, while keeping at most `limit` of them
+    in memory.
+
+    Without `key`, the first completions are kept, in their original order.
+    With `key`, the best completions (those with the lowest key) are kept.
+    They are selected with a heap while the completions come in, and returned
+    in sorted order. (Completions with the same key keep their original
+    order.)
+
+    :param limit: Maximum number of completions to keep, or `None`.
+    :param key: Optional callable that takes a :class:`.Completion` and
+        returns a sort key.
+    """
+    def __init__(self, limit=None, key=None):
+        assert limit is None or (isinstance(limit, int) and limit > 0)
+        assert key is None or callable(key)
+
+        self.limit = limit
+        self.key = key
+
+        #: Number of completions that were added.
+        self.count = 0
+
+        # Kept completions. With a key, these are (key, index, completion)
+        # tuples. Up to twice the limit is kept, before it's reduced again.
+        # (That way, the selection happens only once in `limit` additions.)
+        self._items = []
+
+    def add(self, completion):
+        " Add a :class:`.Completion`. "
+        if self.key is None:
+            if self.limit is None or self.count < self.limit:
+                self._items.append(completion)
+        else:
+            self._items.append((self.key(completion), self.count, completion))
+
+            if self.limit is not None and len(self._items) >= 2 * self.limit:
+                self._items = heapq.nsmallest(self.limit, self._items)
+
+        self.count += 1
+
+    @property
+    def completions(self):
+        """
+        List of the kept completions. (Without key, this is the list that
+        receives the new completions.)
+        """
+        if self.key is None:
+            return self._items
+        else:
+            return [c for _, _, c in heapq.nsmallest(
+                self.limit or len(self._items), self._items)]
+
+    @property
+    def hidden_count(self):
+        " Number of completions that were left out. "
+        if self.limit is None:
+            return 0
+        return max(0, self.count - self.limit)
+
 
 def get_common_complete_suffix(document, completions):
     """
@@ -1,5 +1,9 @@
 from __future__ import unicode_literals
 
 from .filesystem import PathCompleter
-from .base import WordCompleter
+from .base import WordCompleter, IndexedWordCompleter
 from .system import SystemCompleter
+from .cache import CachingCompleter
+from .fuzzy import FuzzyCompleter
+from .process import ProcessPoolCompleter
+from .merge import MergedCompleter
@@ -1,10 +1,14 @@
 from __future__ import unicode_literals
 
 from six import string_types
+from six.moves import range
 from prompt_toolkit.completion import Completer, Completion
 
+import bisect
+
 __all__ = (
     'WordCompleter',
+    'IndexedWordCompleter',
 )
 
 
@@ -59,3 +63,147 @@ class WordCompleter(Completer):
             if word_matches(a):
                 display_meta = self.meta_dict.get(a, '')
                 yield Completion(a, -len(word_before_cursor), display_meta=display_meta)
+
+
+class IndexedWordCompleter(Completer):
+    """
+    Like :class:`.WordCompleter`, but for very large lists of words.
+
+    The words are indexed once, when the completer is created. Looking up the
+    words that start with the text before the cursor is a binary search in the
+    sorted list of words, so it doesn't depend on the amount of words. For
+    `match_middle`, the words are indexed on the trigrams (substrings of
+    three characters) that they contain, and only the words that contain the
+    rarest trigram of the text before the cursor are tested. Shorter texts
+    are searched in all the words at once, in one big string. (They are
+    contained in so many words that the matches are found quickly.)
+
+    Completions are yielded lazily, in sorted order. (Case-insensitive, if
+    `ignore_case` was given.)
+
+    The parameters are the same as for :class:`.WordCompleter`.
+    """
+    _SEPARATOR = '\0'
+    _NGRAM_SIZE = 3
+
+    def __init__(self, words, ignore_case=False, meta_dict=None, WORD=False,
+                 sentence=False, match_middle=False):
+        assert not (WORD and sentence)
+
+        words = list(words)
+        assert all(isinstance(w, string_types) for w in words)
+
+        self.ignore_case = ignore_case
+        self.meta_dict = meta_dict or {}
+        self.WORD = WORD
+        self.sentence = sentence
+        self.match_middle = match_middle
+
+        # Sorted list of keys. (The lower case words, if `ignore_case` was
+        # given.) `self._words` contains the original words in the same order.
+        if ignore_case:
+            pairs = sorted((w.lower(), w) for w in words)
+            self._keys = [k for k, w in pairs]
+            self._words = [w for k, w in pairs]
+        else:
+            self._keys = self._words = sorted(words)
+
+        # All the keys in one string, and a map from every trigram to the
+        # sorted list of indexes of the keys that contain it. (For
+        # `match_middle`.)
+        self._ngrams = {}
+
+        if match_middle:
+            self._corpus = self._SEPARATOR.join(self._keys)
+            self._index_ngrams()
+        else:
+            self._corpus = None
+
+    def _index_ngrams(self):
+        " Fill `self._ngrams`. "
+        ngrams = self._ngrams
+        size = self._NGRAM_SIZE
+
+        for i, key in enumerate(self._keys):
+            for ngram in set(key[j:j + size] for j in range(len(key) - size + 1)):
+                try:
+                    ngrams[ngram].append(i)
+                except KeyError:
+                    ngrams[ngram] = [i]
+
+    @property
+    def words(self):
+        " The sorted list of words. "
+        return self._words
+
+    def _get_prefix_matches(self, text):
+        " Yield the indexes of the keys that start with `text`. "
+        keys = self._keys
+        i = bisect.bisect_left(keys, text)
+
+        while i < len(keys) and keys[i].startswith(text):
+            yield i
+            i += 1
+
+    def _get_middle_matches(self, text):
+        " Yield the indexes of the keys that contain `text`. "
+        if not text:
+            for i in range(len(self._keys)):
+                yield i
+            return
+
+        keys = self._keys
+
+        # Test the keys that contain the rarest trigram of the text.
+        size = self._NGRAM_SIZE
+        if len(text) >= size:
+            candidates = min((self._ngrams.get(text[j:j + size], [])
+                              for j in range(len(text) - size + 1)), key=len)
+            for i in candidates:
+                if text in keys[i]:
+                    yield i
+            return
+
+        # For shorter texts, search in the corpus.
+        corpus = self._corpus
+        pos = 0
+
+        while True:
+            pos = corpus.find(text, pos)
+            if pos == -1:
+                return
+
+            # Find the key for this match.
+            start = corpus.rfind(self._SEPARATOR, 0, pos) + 1
+            end = corpus.find(self._SEPARATOR, pos)
+            if end == -1:
+                end = len(corpus)
+            key = corpus[start:end]
+
+            # Yield this key and all its duplicates. (They are next to each
+            # other in the corpus.)
+            lo = bisect.bisect_left(keys, key)
+            hi = bisect.bisect_right(keys, key)
+            for i in range(lo, hi):
+                yield i
+
+            pos = start + (hi - lo) * (len(key) + 1)
+
+    def get_completions(self, document, complete_event):
+        # Get word/text before cursor.
+        if self.sentence:
+            word_before_cursor = document.text_before_cursor
+        else:
+            word_before_cursor = document.get_word_before_cursor(WORD=self.WORD)
+
+        text = word_before_cursor.lower() if self.ignore_case else word_before_cursor
+
+        if self.match_middle:
+            indexes = self._get_middle_matches(text)
+        else:
+            indexes = self._get_prefix_matches(text)
+
+        for i in indexes:
+            word = self._words[i]
+            display_meta = self.meta_dict.get(word, '')
+            yield Completion(word, -len(word_before_cursor), display_meta=display_meta)
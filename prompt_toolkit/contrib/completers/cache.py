@@ -0,0 +1,219 @@
+from __future__ import unicode_literals
+
+from prompt_toolkit.completion import Completer
+from .base import WordCompleter, IndexedWordCompleter
+
+import re
+import threading
+
+__all__ = (
+    'CachingCompleter',
+)
+
+_WORD_RE = re.compile(r'^\w+$', re.UNICODE)
+
+
+class _CacheEntry(object):
+    """
+    Completions for one document.
+
+    :param refinable: True when all the completions contain the text that they
+        replace. Only in that case, we can tell which completions remain valid
+        when more text is typed.
+    """
+    __slots__ = ('completions', 'refinable')
+
+    def __init__(self, completions, refinable):
+        self.completions = completions
+        self.refinable = refinable
+
+
+class CachingCompleter(Completer):
+    """
+    Wrapper around a :class:`~prompt_toolkit.completion.Completer` that
+    remembers the completions for the most recent documents.
+
+    When text is typed after a document that is in the cache, the cached
+    completions can be filtered, instead of calling the wrapped completer
+    again. This is only correct for completers that return the words that
+    start with (or contain) the text before the cursor that they replace,
+    like :class:`~prompt_toolkit.contrib.completers.WordCompleter`. For other
+    completers (like a fuzzy completer, which could match other words and
+    highlight other characters), the wrapped completer is called again for
+    every new document.
+
+    :param completer: The wrapped :class:`~prompt_toolkit.completion.Completer`.
+    :param maxsize: Maximum number of documents to keep in the cache. The
+        least recently used one is discarded first.
+    :param refine: True when the wrapped completer does prefix (or, with
+        `match_middle`, substring) matching, so that the cached completions
+        can be filtered. By default, only for a
+        :class:`~prompt_toolkit.contrib.completers.WordCompleter` or
+        :class:`~prompt_toolkit.contrib.completers.IndexedWordCompleter`.
+        (The highlighted positions of filtered completions are cleared.)
+    :param ignore_case: Match the typed text case-insensitive when filtering.
+        (By default, like the word completer.)
+    :param match_middle: Set this when the wrapped completer also returns
+        completions that contain the typed text somewhere in the middle. (By
+        default, like the word completer.)
+    :param can_refine: Callable that takes the typed text and returns whether
+        the cached completions can be filtered for it. By default, only text
+        that consists of word characters. (Typing a separator, like a space or
+        a slash, usually changes what's being completed.)
+    """
+    def __init__(self, completer, maxsize=16, refine=None, ignore_case=None,
+                 match_middle=None, can_refine=None):
+        assert isinstance(completer, Completer)
+        assert isinstance(maxsize, int) and maxsize > 0
+        assert can_refine is None or callable(can_refine)
+
+        is_word_completer = isinstance(completer, (WordCompleter, IndexedWordCompleter))
+
+        if refine is None:
+            refine = is_word_completer
+        if ignore_case is None:
+            ignore_case = is_word_completer and completer.ignore_case
+        if match_middle is None:
+            match_middle = is_word_completer and completer.match_middle
+
+        self.completer = completer
+        self.maxsize = maxsize
+        self.refine = refine
+        self.ignore_case = ignore_case
+        self.match_middle = match_middle
+        self.can_refine = can_refine or (lambda text: bool(_WORD_RE.match(text)))
+
+        self._lock = threading.Lock()
+        self._entries = {}  # Maps key to `_CacheEntry`.
+        self._keys = []  # Keys, least recently used first.
+
+    def invalidate(self):
+        """
+        Clear the cache. (Call this when the data that the wrapped completer
+        uses has changed.)
+        """
+        with self._lock:
+            self._entries = {}
+            self._keys = []
+
+    def _store(self, key, entry):
+        " Insert entry. (Caller should hold the lock.) "
+        if key not in self._entries:
+            self._keys.append(key)
+        self._entries[key] = entry
+
+        # Remove the least recently used key when the size is exceeded.
+        if len(self._keys) > self.maxsize:
+            del self._entries[self._keys.pop(0)]
+
+    def _lookup(self, key):
+        """
+        Return the cached `_CacheEntry` for this key. Refine the completions of
+        a shorter document if possible. Return `None` when nothing was found.
+        (Caller should hold the lock.)
+        """
+        text_before_cursor, text_after_cursor, completion_requested = key
+
+        try:
+            entry = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            # Mark as most recently used.
+            self._keys.remove(key)
+            self._keys.append(key)
+            return entry
+
+        if not self.refine:
+            return
+
+        # Find longest cached document that we can refine.
+        best = None
+        for k, entry in self._entries.items():
+            if (entry.refinable and
+                    k[1] == text_after_cursor and
+                    k[2] == completion_requested and
+                    len(k[0]) < len(text_before_cursor) and
+                    text_before_cursor.startswith(k[0]) and
+                    (best is None or len(k[0]) > len(best[0]))):
+                best = k
+
+        if best is not None:
+            typed = text_before_cursor[len(best[0]):]
+            if self.can_refine(typed):
+                entry = _CacheEntry(
+                    self._refine(self._entries[best].completions, best[0], typed),
+                    refinable=True)
+                self._store(key, entry)
+                return entry
+
+    def _refine(self, completions, text_before_cursor, typed):
+        """
+        Return the completions that remain valid after typing `typed`.
+        """
+        result = []
+        for c in completions:
+            replaced = text_before_cursor[len(text_before_cursor) + c.start_position:]
+            new_replaced = replaced + typed
+
+            if self._matches(c.text, replaced, new_replaced):
+                c = c.new_completion_with_start_position(c.start_position - len(typed))
+
+                # (The highlighted characters were matched for the shorter
+                # text.)
+                c.highlighted_positions = None
+                result.append(c)
+        return result
+
+    def _matches(self, text, replaced, new_replaced):
+        """
+        True when the completion `text`, which replaced `replaced`, still
+        matches after typing more text. (Prefix matches have to remain prefix
+        matches.)
+        """
+        if self.ignore_case:
+            text = text.lower()
+            replaced = replaced.lower()
+            new_replaced = new_replaced.lower()
+
+        if self.match_middle or not text.startswith(replaced):
+            return new_replaced in text
+        else:
+            return text.startswith(new_replaced)
+
+    def _contains_replaced_text(self, completion, text_before_cursor):
+        replaced = text_before_cursor[len(text_before_cursor) + completion.start_position:]
+        text = completion.text
+
+        if self.ignore_case:
+            replaced = replaced.lower()
+            text = text.lower()
+
+        return replaced in text
+
+    def get_completions(self, document, complete_event):
+        text_before_cursor = document.text_before_cursor
+        key = (text_before_cursor, document.text_after_cursor,
+               complete_event.completion_requested)
+
+        with self._lock:
+            entry = self._lookup(key)
+
+        if entry is not None:
+            for c in entry.completions:
+                yield c
+            return
+
+        # Not in cache. Call the wrapped completer.
+        completions = []
+        refinable = True
+
+        for c in self.completer.get_completions(document, complete_event):
+            completions.append(c)
+            refinable = refinable and self._contains_replaced_text(c, text_before_cursor)
+            yield c
+
+        # Only store complete results. (Not when the completion was cancelled.)
+        if not complete_event.cancelled:
+            with self._lock:
+                self._store(key, _CacheEntry(completions, refinable))
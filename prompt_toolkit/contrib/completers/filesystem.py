@@ -1,14 +1,173 @@
 from __future__ import unicode_literals
 
 from prompt_toolkit.completion import Completer, Completion
+
+import bisect
 import os
+import stat
+import threading
+import time
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir  # Python 2 backport.
+    except ImportError:
+        scandir = None
 
 __all__ = (
+    'DirectoryCache',
     'PathCompleter',
     'ExecutableCompleter',
 )
 
 
+class _DirectoryListing(object):
+    """
+    Sorted content of a directory.
+
+    :param names: Sorted list of file names.
+    :param is_dir: For every name, whether it's a directory.
+    :param mtime: Modification time of the directory when it was listed.
+    :param checked: Time when the modification time was checked for the last
+        time.
+    """
+    __slots__ = ('names', 'is_dir', 'mtime', 'checked')
+
+    def __init__(self, names, is_dir, mtime, checked):
+        self.names = names
+        self.is_dir = is_dir
+        self.mtime = mtime
+        self.checked = checked
+
+
+def _list_directory(directory):
+    """
+    Return a sorted list of (name, is_dir) tuples for this directory.
+    """
+    if scandir is not None:
+        # `scandir` already knows the file type, so that we don't need a
+        # `stat` call for every file.
+        entries = []
+        for entry in scandir(directory):
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            entries.append((entry.name, is_dir))
+    else:
+        entries = [(name, os.path.isdir(os.path.join(directory, name)))
+                   for name in os.listdir(directory)]
+
+    return sorted(entries)
+
+
+class DirectoryCache(object):
+    """
+    Cache of directory listings, used by :class:`.PathCompleter`.
+
+    Completing a path lists the same directory again for every typed
+    character. On a slow file system (like a network mount), that becomes
+    noticeable. This cache keeps the sorted listings of the most recently used
+    directories.
+
+    :param ttl: Number of seconds during which a listing is used without
+        looking at the directory again. After that, the modification time of
+        the directory is checked, and it's only listed again when it changed.
+    :param maxsize: Maximum number of directories in the cache.
+    """
+    def __init__(self, ttl=1., maxsize=64):
+        assert isinstance(maxsize, int) and maxsize > 0
+
+        self.ttl = ttl
+        self.maxsize = maxsize
+
+        self._lock = threading.Lock()
+        self._listings = {}  # Maps absolute path to `_DirectoryListing`.
+        self._paths = []  # Least recently used first.
+
+    def invalidate(self, directory=None):
+        """
+        Forget the listing of this directory, or of all directories when
+        `None` is given.
+        """
+        with self._lock:
+            if directory is None:
+                self._listings = {}
+                self._paths = []
+            else:
+                path = os.path.abspath(directory)
+                if path in self._listings:
+                    del self._listings[path]
+                    self._paths.remove(path)
+
+    def _get_listing(self, directory):
+        """
+        Return the `_DirectoryListing` for this directory or `None` when it's
+        not a directory.
+        """
+        path = os.path.abspath(directory)
+        now = time.time()
+
+        with self._lock:
+            listing = self._listings.get(path)
+
+        if listing is not None and now - listing.checked < self.ttl:
+            return listing
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        if not stat.S_ISDIR(st.st_mode):
+            return None
+
+        if listing is not None and listing.mtime == st.st_mtime:
+            listing.checked = now
+            return listing
+
+        entries = _list_directory(path)
+        listing = _DirectoryListing(
+            names=[name for name, is_dir in entries],
+            is_dir=[is_dir for name, is_dir in entries],
+            mtime=st.st_mtime, checked=now)
+
+        with self._lock:
+            if path in self._listings:
+                self._paths.remove(path)
+            self._listings[path] = listing
+            self._paths.append(path)
+
+            # Remove the least recently listed directory when the size is
+            # exceeded.
+            if len(self._paths) > self.maxsize:
+                del self._listings[self._paths.pop(0)]
+
+        return listing
+
+    def get_entries(self, directory, prefix=''):
+        """
+        Return a sorted list of (name, is_dir) tuples for the files in this
+        directory that start with `prefix`. When `directory` is not a
+        directory, an empty list is returned.
+        """
+        # (An empty string is not the current directory.)
+        listing = self._get_listing(directory) if directory else None
+        if listing is None:
+            return []
+
+        names = listing.names
+        start = bisect.bisect_left(names, prefix)
+        end = start
+
+        while end < len(names) and names[end].startswith(prefix):
+            end += 1
+
+        return list(zip(names[start:end], listing.is_dir[start:end]))
+
+
 class PathCompleter(Completer):
     """
     Complete for Path variables.
@@ -19,19 +178,24 @@ class PathCompleter(Completer):
                         this file should show up in the completion. ``None``
                         when no filtering has to be done.
     :param min_input_len: Don't do autocompletion when the input string is shorter.
+    :param directory_cache: :class:`.DirectoryCache` instance for the
+                            directory listings. (By default, every completer
+                            has its own cache.)
     """
     def __init__(self, only_directories=False, get_paths=None, file_filter=None,
-                 min_input_len=0, expanduser=False):
+                 min_input_len=0, expanduser=False, directory_cache=None):
         assert get_paths is None or callable(get_paths)
         assert file_filter is None or callable(file_filter)
         assert isinstance(min_input_len, int)
         assert isinstance(expanduser, bool)
+        assert directory_cache is None or isinstance(directory_cache, DirectoryCache)
 
         self.only_directories = only_directories
         self.get_paths = get_paths or (lambda: ['.'])
         self.file_filter = file_filter or (lambda _: True)
         self.min_input_len = min_input_len
         self.expanduser = expanduser
+        self.directory_cache = directory_cache or DirectoryCache()
 
     def get_completions(self, document, complete_event):
         text = document.text_before_cursor
@@ -62,20 +226,18 @@ class PathCompleter(Completer):
             filenames = []
             for directory in directories:
                 # Look for matches in this directory.
-                if os.path.isdir(directory):
-                    for filename in os.listdir(directory):
-                        if filename.startswith(prefix):
-                            filenames.append((directory, filename))
+                for filename, is_dir in self.directory_cache.get_entries(directory, prefix):
+                    filenames.append((directory, filename, is_dir))
 
             # Sort
             filenames = sorted(filenames, key=lambda k: k[1])
 
             # Yield them.
-            for directory, filename in filenames:
+            for directory, filename, is_dir in filenames:
                 completion = filename[len(prefix):]
                 full_name = os.path.join(directory, filename)
 
-                if os.path.isdir(full_name):
+                if is_dir:
                     # For directories, add a slash to the filename.
                     # (We don't add them to the `completion`. Users can type it
                     # to trigger the autocompletion themself.)
@@ -91,15 +253,153 @@ class PathCompleter(Completer):
             pass
 
 
+class _ExecutableIndex(object):
+    """
+    Sorted index of the executable files in a list of directories. (The
+    directories of $PATH.)
+
+    The index is only checked again after `ttl` seconds. Then, only the
+    directories that have a different modification time are listed again.
+
+    :param get_paths: Callable which returns the list of directories.
+    :param ttl: Number of seconds during which the index is used without
+        looking at the directories.
+    """
+    def __init__(self, get_paths, ttl=5.):
+        assert callable(get_paths)
+
+        self.get_paths = get_paths
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._directories = {}  # Maps directory to (mtime, executables) tuple.
+        self._paths = None  # The directories in the current index.
+        self._checked = 0  # Time of the last check.
+
+        # Sorted list of names, sorted list of (name, position in paths,
+        # is_dir) tuples and the paths. (Replaced at once, so that it can be
+        # read without the lock.)
+        self._index = ([], [], ())
+
+    def refresh_in_background(self):
+        """
+        Build or refresh the index in a background thread.
+        """
+        t = threading.Thread(target=lambda: self.refresh(force=False))
+        t.daemon = True
+        t.start()
+
+    def refresh(self, force=True):
+        """
+        Check the modification time of all the directories and list the
+        directories that changed.
+
+        :param force: When `False`, don't do anything if the index was
+            checked within the last `ttl` seconds.
+        """
+        with self._lock:
+            paths = tuple(self.get_paths())
+
+            if (not force and paths == self._paths and
+                    time.time() - self._checked < self.ttl):
+                return
+
+            changed = paths != self._paths
+            directories = {}
+
+            for directory in set(paths):
+                try:
+                    mtime = os.stat(directory).st_mtime
+                except OSError:
+                    continue
+
+                try:
+                    old_mtime, executables = self._directories[directory]
+                except KeyError:
+                    old_mtime = executables = None
+
+                if old_mtime != mtime:
+                    changed = True
+                    try:
+                        executables = [
+                            (name, is_dir) for name, is_dir in _list_directory(directory)
+                            if os.access(os.path.join(directory, name), os.X_OK)]
+                    except OSError:
+                        executables = []
+
+                directories[directory] = (mtime, executables)
+
+            changed = changed or len(directories) != len(self._directories)
+
+            if changed:
+                entries = []
+                for i, directory in enumerate(paths):
+                    if directory in directories:
+                        entries.extend((name, i, is_dir) for name, is_dir in
+                                       directories[directory][1])
+                entries.sort()
+
+                self._index = ([e[0] for e in entries], entries, paths)
+
+            self._directories = directories
+            self._paths = paths
+            self._checked = time.time()
+
+    def get_entries(self, prefix):
+        """
+        Return a sorted list of (name, directory, is_dir) tuples for the
+        executables that start with `prefix`.
+        """
+        self.refresh(force=False)
+
+        names, entries, paths = self._index
+
+        start = bisect.bisect_left(names, prefix)
+        end = start
+
+        while end < len(names) and names[end].startswith(prefix):
+            end += 1
+
+        return [(name, paths[i], is_dir) for name, i, is_dir in entries[start:end]]
+
+
 class ExecutableCompleter(PathCompleter):
     """
     Complete only excutable files in the current path.
+
+    The executables in $PATH are indexed in a background thread when the
+    completer is created. (Paths that contain a directory name are completed
+    like in :class:`.PathCompleter`.)
     """
     def __init__(self):
         PathCompleter.__init__(
             self,
             only_directories=False,
             min_input_len=1,
-            get_paths=lambda: os.environ.get('PATH', '').split(os.pathsep),
+            get_paths=self._get_paths,
             file_filter=lambda name: os.access(name, os.X_OK),
-            expanduser=True),
+            expanduser=True)
+
+        self._index = _ExecutableIndex(self._get_paths)
+        self._index.refresh_in_background()
+
+    @staticmethod
+    def _get_paths():
+        return os.environ.get('PATH', '').split(os.pathsep)
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor
+
+        if len(text) < self.min_input_len:
+            return
+
+        text = os.path.expanduser(text)
+
+        # A path: complete like `PathCompleter`.
+        if os.path.dirname(text):
+            for c in super(ExecutableCompleter, self).get_completions(document, complete_event):
+                yield c
+            return
+
+        for name, directory, is_dir in self._index.get_entries(text):
+            yield Completion(name[len(text):], 0, display=name + '/' if is_dir else name)
@@ -0,0 +1,300 @@
+"""
+Fuzzy completion.
+
+The characters of the word before the cursor have to appear in the completion
+in the same order, but not necessarily next to each other. ("fzcm" matches
+"FuzzyCompleter".) Matches are ranked by how close together the matched
+characters are.
+"""
+from __future__ import unicode_literals
+
+from six import string_types
+from six.moves import range
+from prompt_toolkit.completion import Completer, Completion
+from prompt_toolkit.document import Document
+
+import bisect
+import re
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = (
+    'FuzzyCompleter',
+)
+
+
+def _match_positions(key, query):
+    """
+    Return the positions of the characters of `query` in `key`, or `None` when
+    `query` is not a subsequence of `key`.
+
+    First the earliest position where the match can end is found. Then we go
+    backwards from there, which gives the shortest match that ends at that
+    position.
+    """
+    pos = -1
+    for c in query:
+        pos = key.find(c, pos + 1)
+        if pos == -1:
+            return None
+
+    positions = [0] * len(query)
+    end = pos + 1
+    for i in range(len(query) - 1, -1, -1):
+        end = key.rfind(query[i], 0, end)
+        positions[i] = end
+
+    return positions
+
+
+def _sort_key(positions, key, query, index):
+    """
+    Rank of a match. (Lower is better.) Matches with fewer characters between
+    the matched characters come first. Then matches that start earlier, then
+    the shorter candidates. Ties are kept in the original order.
+    """
+    start = positions[0]
+    return (positions[-1] - start + 1 - len(query), start, len(key), index)
+
+
+class _CandidateIndex(object):
+    """
+    Precomputed data for scoring a fixed list of candidates.
+
+    :param keys: List of strings to match against. (Lower case when matching
+        case-insensitive.)
+    :param use_numpy: When True, also create a character array for vectorized
+        scoring.
+    """
+    _SEPARATOR = '\n'
+
+    def __init__(self, keys, use_numpy):
+        self.keys = keys
+
+        # All keys in one string. Filtering happens with one regular
+        # expression over this string, instead of once for every key.
+        self.corpus = self._SEPARATOR.join(keys)
+        self.offsets = []
+        offset = 0
+        for k in keys:
+            self.offsets.append(offset)
+            offset += len(k) + 1
+
+        # Keys that contain the separator can't be matched per line. These
+        # are tested separately.
+        self.multiline_indexes = set(
+            i for i, k in enumerate(keys) if self._SEPARATOR in k)
+
+        # Array of code points. One row per key, padded with zeros. And for
+        # every key, a bit mask of the characters that it contains, so that
+        # most of the keys can be rejected without looking at the positions.
+        if use_numpy and keys:
+            max_length = max(1, max(len(k) for k in keys))
+            self.array = numpy.array(keys, dtype='U%i' % max_length).view(
+                numpy.uint32).reshape(len(keys), max_length)
+            self.lengths = numpy.array([len(k) for k in keys])
+
+            bits = numpy.uint64(1) << (self.array % 64).astype(numpy.uint64)
+            self.char_masks = numpy.bitwise_or.reduce(bits, axis=1)
+        else:
+            self.array = None
+
+    def get_ranked_indexes(self, query):
+        """
+        Return the indexes of the keys that match `query`, best match first.
+        """
+        if self.array is not None:
+            return self._get_ranked_indexes_numpy(query)
+        else:
+            return self._get_ranked_indexes_python(query)
+
+    def _get_ranked_indexes_python(self, query):
+        keys = self.keys
+        offsets = self.offsets
+        multiline_indexes = self.multiline_indexes
+        result = []
+        last_index = -1
+
+        # Every line that contains the query as a subsequence. (Every
+        # character can only be matched at its first occurrence, so this
+        # doesn't backtrack.)
+        regex = re.compile('^' + ''.join(
+            '[^%s\n]*%s' % (re.escape(c), re.escape(c)) for c in query), re.M)
+
+        for m in regex.finditer(self.corpus):
+            index = bisect.bisect_right(offsets, m.start()) - 1
+
+            if index != last_index and index not in multiline_indexes:
+                last_index = index
+                key = keys[index]
+                result.append(_sort_key(_match_positions(key, query), key, query, index))
+
+        for index in multiline_indexes:
+            key = keys[index]
+            positions = _match_positions(key, query)
+            if positions is not None:
+                result.append(_sort_key(positions, key, query, index))
+
+        result.sort()
+        return [sort_key[-1] for sort_key in result]
+
+    def _get_ranked_indexes_numpy(self, query):
+        query_codes = [ord(c) for c in query]
+
+        # Keys that contain all the characters.
+        query_mask = numpy.uint64(0)
+        for code in query_codes:
+            query_mask |= numpy.uint64(1) << numpy.uint64(code % 64)
+
+        rows = numpy.flatnonzero(self.char_masks & query_mask == query_mask)
+        array = self.array[rows]
+        columns = numpy.arange(array.shape[1])
+
+        # Forward pass: find the earliest end position of the match in every
+        # row. Rows that don't match are dropped after every character.
+        pos = numpy.full(len(rows), -1)
+
+        for code in query_codes:
+            mask = (array == code) & (columns > pos[:, None])
+            pos = mask.argmax(axis=1)
+            found = mask[numpy.arange(len(rows)), pos]
+
+            rows = rows[found]
+            array = array[found]
+            pos = pos[found]
+
+        # Backward pass: go back to the latest start position.
+        start = pos + 1
+        reversed_columns = columns[::-1]
+
+        for code in reversed(query_codes):
+            mask = (array == code) & (columns < start[:, None])
+            start = reversed_columns[mask[:, ::-1].argmax(axis=1)]
+
+        gaps = pos - start + 1 - len(query)
+
+        return rows[numpy.lexsort((rows, self.lengths[rows], start, gaps))]
+
+
+class FuzzyCompleter(Completer):
+    """
+    Fuzzy completion for a list of words or for the completions of another
+    completer.
+
+    The characters of the word before the cursor are matched as a subsequence
+    of the candidates. The matched characters are highlighted in the
+    completion menu.
+
+    For a list of words, everything that's needed for matching is computed
+    once. When NumPy is installed, all the words are scored at the same time,
+    which keeps this fast for hundreds of thousands of words. Otherwise, the
+    words are filtered with one regular expression search through all the
+    words.
+
+    When another completer is given, it's called with the text before the
+    word before the cursor removed, and its completions are filtered and
+    ranked.
+
+    :param words: List of words or :class:`~prompt_toolkit.completion.Completer`.
+    :param ignore_case: Match case-insensitive. (True by default.)
+    :param meta_dict: Optional dict mapping words to their meta-information.
+        (Only for a list of words.)
+    :param WORD: When True, use WORD characters.
+    :param use_numpy: Use NumPy for scoring a list of words. `None` means:
+        only when NumPy is installed.
+    """
+    def __init__(self, words, ignore_case=True, meta_dict=None, WORD=False, use_numpy=None):
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        assert not use_numpy or numpy is not None, 'NumPy is not installed.'
+
+        self.ignore_case = ignore_case
+        self.meta_dict = meta_dict or {}
+        self.WORD = WORD
+
+        if isinstance(words, Completer):
+            self.completer = words
+            self.words = None
+            self._index = None
+        else:
+            self.completer = None
+            self.words = list(words)
+            assert all(isinstance(w, string_types) for w in self.words)
+
+            self._index = _CandidateIndex(
+                [self._get_key(w) for w in self.words], use_numpy=use_numpy)
+
+    def _get_key(self, text):
+        return text.lower() if self.ignore_case else text
+
+    def get_completions(self, document, complete_event):
+        word_before_cursor = document.get_word_before_cursor(WORD=self.WORD)
+        query = self._get_key(word_before_cursor)
+
+        if self.completer is None:
+            completions = self._get_word_completions(query, word_before_cursor)
+        else:
+            completions = self._get_wrapped_completions(document, complete_event, query,
+                                                        word_before_cursor)
+
+        for c in completions:
+            if complete_event.cancelled:
+                return
+            yield c
+
+    def _get_word_completions(self, query, word_before_cursor):
+        words = self.words
+
+        # Without input, everything matches.
+        if not query:
+            for word in words:
+                yield Completion(word, -len(word_before_cursor),
+                                 display_meta=self.meta_dict.get(word, ''))
+            return
+
+        for index in self._index.get_ranked_indexes(query):
+            word = words[index]
+            yield Completion(
+                word, -len(word_before_cursor),
+                display_meta=self.meta_dict.get(word, ''),
+                highlighted_positions=_match_positions(self._index.keys[index], query))
+
+    def _get_wrapped_completions(self, document, complete_event, query, word_before_cursor):
+        # Let the wrapped completer complete the text without the word before
+        # the cursor.
+        document2 = Document(
+            text=document.text[:document.cursor_position - len(word_before_cursor)] +
+                document.text[document.cursor_position:],
+            cursor_position=document.cursor_position - len(word_before_cursor))
+
+        completions = self.completer.get_completions(document2, complete_event)
+
+        if not query:
+            for c in completions:
+                yield c
+            return
+
+        completions = list(completions)
+        matches = []
+        for i, c in enumerate(completions):
+            key = self._get_key(c.text)
+            positions = _match_positions(key, query)
+            if positions is not None:
+                matches.append((_sort_key(positions, key, query, i), positions))
+
+        matches.sort()
+
+        for sort_key, positions in matches:
+            c = completions[sort_key[-1]]
+
+            # Only highlight when the completion is displayed as it's inserted.
+            if c.display != c.text:
+                positions = None
+
+            c = c.new_completion_with_start_position(
+                c.start_position - len(word_before_cursor))
+            c.highlighted_positions = positions
+            yield c
@@ -0,0 +1,203 @@
+"""
+Completion from several sources at the same time.
+"""
+from __future__ import unicode_literals
+
+from prompt_toolkit.completion import Completer, CompleteEvent
+from prompt_toolkit.eventloop.executor import ThreadPool
+from six.moves import queue, range
+
+import threading
+import time
+import traceback
+
+__all__ = (
+    'MergedCompleter',
+)
+
+# Marker that is queued when a source is done.
+_DONE = object()
+
+
+class MergedCompleter(Completer):
+    """
+    Combine the completions of several completers.
+
+    All the completers run concurrently, each in a thread of its own. The
+    completions are yielded as soon as they arrive, so a slow source doesn't
+    delay the others. A source that takes longer than its timeout is
+    cancelled, and the completions that it didn't produce yet are left out.
+    When several sources return a completion that inserts the same text at the
+    same position, only the first one is kept.
+
+    A source runs at most one request at a time. When a new request arrives
+    while the source is still busy with an older one (for instance, because it
+    doesn't stop when the older one was cancelled), the new request waits
+    until the source is done. Only the most recent waiting request is kept, so
+    work doesn't pile up behind a slow source, and the other sources keep
+    their workers.
+
+    :param completers: List of :class:`~prompt_toolkit.completion.Completer`
+        instances.
+    :param timeout: Maximum time in seconds that we wait for a source. This is
+        either one number (or `None` for no timeout) that is used for every
+        source, or a list with a value for every completer.
+    :param sort_key: Optional callable that takes a
+        :class:`~prompt_toolkit.completion.Completion` and returns a sort key.
+        When given, the completions of all sources are collected and yielded
+        in sorted order. (Ties are in the order of the sources.)
+    :param executor: :class:`~prompt_toolkit.eventloop.executor.ThreadPool`
+        for running the sources. By default, every `MergedCompleter` gets its
+        own. (The merged completer itself usually runs in the shared
+        executor, where it blocks a worker while waiting for the sources.)
+    """
+    #: Interval at which we check whether the completion was cancelled while
+    #: waiting for the sources.
+    poll_interval = .1
+
+    def __init__(self, completers, timeout=None, sort_key=None, executor=None):
+        completers = list(completers)
+
+        if isinstance(timeout, (list, tuple)):
+            timeouts = list(timeout)
+        else:
+            timeouts = [timeout] * len(completers)
+
+        assert all(isinstance(c, Completer) for c in completers)
+        assert len(timeouts) == len(completers)
+        assert sort_key is None or callable(sort_key)
+        assert executor is None or isinstance(executor, ThreadPool)
+
+        self.completers = completers
+        self.timeouts = timeouts
+        self.sort_key = sort_key
+        self.executor = executor or ThreadPool(max_workers=max(1, len(completers)))
+
+        self._lock = threading.Lock()
+        self._busy_sources = set()  # Indexes of the sources that are running.
+        self._waiting_requests = {}  # Maps source index to the next request.
+
+    def get_completions(self, document, complete_event):
+        if self.sort_key is None:
+            completions = self._get_merged_completions(document, complete_event)
+        else:
+            # Collect all completions. (Keep the order of the sources for ties.)
+            completions = list(self._get_merged_completions(document, complete_event))
+            completions = sorted(enumerate(completions), key=lambda item: (
+                self.sort_key(item[1][1]), item[1][0], item[0]))
+            completions = ((index, c) for _, (index, c) in completions)
+
+        seen = set()
+
+        for index, c in completions:
+            key = (c.text, c.start_position)
+            if key not in seen:
+                seen.add(key)
+                yield c
+
+    def _get_merged_completions(self, document, complete_event):
+        """
+        Yield (source_index, completion) tuples in the order in which they
+        arrive.
+        """
+        results = queue.Queue()
+        start = time.time()
+
+        # Every source gets its own event, so that it can be cancelled on its
+        # own.
+        events = []
+        deadlines = {}
+
+        for i, completer in enumerate(self.completers):
+            event = CompleteEvent(text_inserted=complete_event.text_inserted,
+                                  completion_requested=complete_event.completion_requested)
+            events.append(event)
+
+            if self.timeouts[i] is not None:
+                deadlines[i] = start + self.timeouts[i]
+
+            self._submit(i, (document, event, results))
+
+        running = set(range(len(self.completers)))
+
+        try:
+            while True:
+                # Drop the sources that took too long.
+                now = time.time()
+                for i in list(running):
+                    if i in deadlines and now >= deadlines[i]:
+                        events[i].cancel()
+                        running.remove(i)
+
+                if not running or complete_event.cancelled:
+                    break
+
+                # Wait until the next result, or until the next deadline.
+                wait = self.poll_interval
+                for i in running:
+                    if i in deadlines:
+                        wait = min(wait, deadlines[i] - now)
+
+                try:
+                    index, item = results.get(timeout=max(0, wait))
+                except queue.Empty:
+                    continue
+
+                if index not in running:
+                    continue  # Result from a source that timed out.
+                elif item is _DONE:
+                    running.remove(index)
+                else:
+                    yield index, item
+        finally:
+            # Stop the sources that are still running.
+            for event in events:
+                event.cancel()
+
+    def _submit(self, index, request):
+        """
+        Run a (document, complete_event, results) request for the given
+        source. When the source is busy, the request waits. (And replaces the
+        request that was waiting before.)
+        """
+        with self._lock:
+            if index in self._busy_sources:
+                replaced = self._waiting_requests.get(index)
+                self._waiting_requests[index] = request
+            else:
+                replaced = None
+                self._busy_sources.add(index)
+                self.executor.submit(lambda: self._run_source(index, request))
+
+        # The request that was replaced will never run. Tell it that the
+        # source is done.
+        if replaced is not None:
+            replaced[2].put((index, _DONE))
+
+    def _run_source(self, index, request):
+        """
+        Run the requests for one source, until there are no more waiting.
+        """
+        completer = self.completers[index]
+
+        while request is not None:
+            document, complete_event, results = request
+
+            try:
+                # Don't start when the request was cancelled while waiting.
+                if not complete_event.cancelled:
+                    for c in completer.get_completions(document, complete_event):
+                        if complete_event.cancelled:
+                            break
+                        results.put((index, c))
+            except Exception:
+                # Keep running the other requests. (Print the exception, like
+                # the executor would do.)
+                traceback.print_exc()
+            finally:
+                results.put((index, _DONE))
+
+            with self._lock:
+                request = self._waiting_requests.pop(index, None)
+                if request is None:
+                    self._busy_sources.remove(index)
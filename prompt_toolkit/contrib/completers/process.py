@@ -0,0 +1,276 @@
+"""
+Completion in a separate process.
+
+Completers that do a lot of work in Python (like type inference) hold the GIL
+while they run. When they run in a background thread, that slows down the
+thread that handles the input and renders the interface. A
+:class:`ProcessPoolCompleter` runs such a completer in worker processes
+instead. Only the text and cursor position are sent to the worker, and the
+completions are sent back in batches while they are being generated.
+"""
+from __future__ import unicode_literals
+
+from prompt_toolkit.completion import Completer, Completion, CompleteEvent
+from prompt_toolkit.document import Document
+
+import multiprocessing
+import pickle
+import threading
+import time
+import traceback
+
+__all__ = (
+    'ProcessPoolCompleter',
+)
+
+# Messages from the worker process.
+_COMPLETIONS = 'completions'
+_DONE = 'done'
+_ERROR = 'error'
+
+# Messages to the worker process.
+_COMPLETE = 'complete'
+_CANCEL = 'cancel'
+
+
+def _completion_to_tuple(completion):
+    return (completion.text, completion.start_position, completion.display,
+            completion.display_meta, completion.highlighted_positions)
+
+
+def _get_context():
+    """
+    Return the multiprocessing context for starting worker processes.
+
+    The input and event loop threads are already running when the first
+    worker is started, and forking a process that has threads can deadlock
+    in the child (on locks that another thread was holding). So start the
+    workers from a clean process: with 'forkserver' where it is available,
+    otherwise with 'spawn'. (Python 2 has no contexts and always forks.)
+    """
+    if not hasattr(multiprocessing, 'get_context'):  # Python 2.
+        return multiprocessing
+
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    else:
+        return multiprocessing.get_context('spawn')
+
+
+def _worker_main(connection, completer_data, batch_size, batch_interval):
+    """
+    Main loop of the worker process.
+
+    For every request, zero or more batches of completions are sent, followed
+    by exactly one `_DONE` or `_ERROR` message. The completer is created only
+    once, so anything that it caches stays available for the next requests.
+    """
+    completer = pickle.loads(completer_data)
+
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+
+        if message is None:
+            return
+
+        # A cancel message that arrived after the request was done.
+        if message[0] != _COMPLETE:
+            continue
+
+        _, text, cursor_position, text_inserted, completion_requested = message
+
+        document = Document(text, cursor_position)
+        complete_event = CompleteEvent(text_inserted=text_inserted,
+                                       completion_requested=completion_requested)
+
+        try:
+            batch = []
+            last_send = time.time()
+
+            for c in completer.get_completions(document, complete_event):
+                batch.append(_completion_to_tuple(c))
+
+                if len(batch) >= batch_size or time.time() - last_send >= batch_interval:
+                    connection.send((_COMPLETIONS, batch))
+                    batch = []
+                    last_send = time.time()
+
+                    # Stop when the parent cancelled the request.
+                    if connection.poll():
+                        connection.recv()
+                        complete_event.cancel()
+                        break
+            else:
+                if batch:
+                    connection.send((_COMPLETIONS, batch))
+        except Exception:
+            connection.send((_ERROR, traceback.format_exc()))
+        else:
+            connection.send((_DONE, None))
+
+
+class _Worker(object):
+    " Handle to a worker process. "
+    def __init__(self, context, completer_data, batch_size, batch_interval):
+        self.connection, child_connection = context.Pipe()
+
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_connection, completer_data, batch_size, batch_interval))
+        self.process.daemon = True
+        self.process.start()
+
+        child_connection.close()
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except (IOError, OSError):
+            pass
+        self.process.join()
+        self.connection.close()
+
+
+class ProcessPoolCompleter(Completer):
+    """
+    Wrapper around a :class:`~prompt_toolkit.completion.Completer` that runs
+    it in worker processes.
+
+    The worker processes are started when they are first needed and keep
+    running, so the completer keeps its state between calls. Completions are
+    streamed back in batches. When the completion is cancelled, the worker
+    stops generating completions after the current batch.
+
+    The completions are recreated from their text, start position, display,
+    meta text and highlighted positions. (The meta text is computed in the
+    worker.)
+
+    With the 'forkserver' and 'spawn' start methods, the worker processes
+    import the ``__main__`` module of the application again. So scripts that
+    create a :class:`ProcessPoolCompleter` have to run the application from
+    inside an ``if __name__ == '__main__':`` block, otherwise every worker
+    starts the application again.
+
+    :param completer: The wrapped :class:`~prompt_toolkit.completion.Completer`.
+        This has to be picklable, and its class has to be importable, because
+        the worker processes are not forked from this process (except on
+        Python 2).
+    :param processes: Maximum number of worker processes. (Only one request can
+        be handled by a worker at the same time.)
+    :param batch_size: Maximum number of completions that are sent at once.
+    :param batch_interval: Maximum time in seconds that generated completions
+        are held back before they are sent.
+    :param context: Optional `multiprocessing` context for starting the
+        worker processes. By default, 'forkserver' is used where it is
+        available, and 'spawn' otherwise.
+    """
+    def __init__(self, completer, processes=1, batch_size=100, batch_interval=.05,
+                 context=None):
+        assert isinstance(completer, Completer)
+        assert isinstance(processes, int) and processes > 0
+        assert isinstance(batch_size, int) and batch_size > 0
+
+        self.completer = completer
+        self.processes = processes
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.context = context or _get_context()
+
+        # Pickle right away, so that we fail early.
+        self._completer_data = pickle.dumps(completer, protocol=2)
+
+        self._condition = threading.Condition()
+        self._workers = []
+        self._idle_workers = []
+        self._closed = False
+
+    def _acquire_worker(self):
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError('ProcessPoolCompleter has been closed.')
+
+                if self._idle_workers:
+                    return self._idle_workers.pop()
+
+                if len(self._workers) < self.processes:
+                    worker = _Worker(self.context, self._completer_data,
+                                     self.batch_size, self.batch_interval)
+                    self._workers.append(worker)
+                    return worker
+
+                self._condition.wait()
+
+    def _release_worker(self, worker, alive=True):
+        with self._condition:
+            keep = alive and not self._closed
+            if keep:
+                self._idle_workers.append(worker)
+            else:
+                self._workers.remove(worker)
+            self._condition.notify()
+
+        if not keep:
+            worker.stop()
+
+    def close(self):
+        """
+        Stop the worker processes. (Requests that are running are finished
+        first.)
+        """
+        with self._condition:
+            self._closed = True
+            workers, self._idle_workers = self._idle_workers, []
+            for w in workers:
+                self._workers.remove(w)
+            self._condition.notify_all()
+
+        for w in workers:
+            w.stop()
+
+    def get_completions(self, document, complete_event):
+        worker = self._acquire_worker()
+        connection = worker.connection
+        alive = True
+        done = False
+
+        try:
+            connection.send((_COMPLETE, document.text, document.cursor_position,
+                             complete_event.text_inserted,
+                             complete_event.completion_requested))
+
+            while True:
+                kind, data = connection.recv()
+
+                if kind == _COMPLETIONS:
+                    for text, start_position, display, display_meta, highlighted_positions in data:
+                        yield Completion(text, start_position, display=display,
+                                         display_meta=display_meta,
+                                         highlighted_positions=highlighted_positions)
+
+                    if complete_event.cancelled:
+                        break
+                else:
+                    done = True
+
+                    if kind == _ERROR:
+                        raise RuntimeError('Error in completer process:\n' + data)
+                    break
+        except (EOFError, IOError, OSError):
+            # The worker process died.
+            alive = False
+        finally:
+            # When we stopped early, tell the worker to stop, and skip the
+            # remaining messages of this request.
+            if alive and not done:
+                try:
+                    connection.send((_CANCEL, ))
+                    while connection.recv()[0] == _COMPLETIONS:
+                        pass
+                except (EOFError, IOError, OSError):
+                    alive = False
+
+            self._release_worker(worker, alive=alive)
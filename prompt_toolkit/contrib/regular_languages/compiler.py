@@ -39,7 +39,13 @@ Partial matches are possible::
 
 """
 from __future__ import unicode_literals
+import hashlib
+import io
+import json
+import os
 import re
+import tempfile
+import threading
 
 from six.moves import range
 from .regex_parser import Any, Sequence, Regex, Variable, Repeat, Lookahead
@@ -61,33 +67,34 @@ class _CompiledGrammar(object):
     Compiles a grammar. This will take the parse tree of a regular expression
     and compile the grammar.
 
-    :param root_node: :class~`.regex_parser.Node` instance.
+    :param root_node: :class~`.regex_parser.Node` instance. (Can be `None`
+        when `patterns` is given.)
     :param escape_funcs: `dict` mapping variable names to escape callables.
     :param unescape_funcs: `dict` mapping variable names to unescape callables.
+    :param patterns: The regex strings for this grammar, as returned by
+        :meth:`._create_patterns`. (When they were cached.)
     """
-    def __init__(self, root_node, escape_funcs=None, unescape_funcs=None):
+    def __init__(self, root_node, escape_funcs=None, unescape_funcs=None,
+                 patterns=None):
         self.root_node = root_node
         self.escape_funcs = escape_funcs or {}
         self.unescape_funcs = unescape_funcs or {}
 
-        #: Dictionary that will map the redex names to Node instances.
-        self._group_names_to_nodes = {}  # Maps regex group names to varnames.
-        counter = [0]
+        if patterns is None:
+            patterns = self._create_patterns(root_node)
 
-        def create_group_func(node):
-            name = 'n%s' % counter[0]
-            self._group_names_to_nodes[name] = node.varname
-            counter[0] += 1
-            return name
+        #: Dictionary that will map the redex names to Node instances.
+        self._group_names_to_nodes = patterns['group_names_to_nodes']
 
-        # Compile regex strings.
-        self._re_pattern = '^%s$' % self._transform(root_node, create_group_func)
-        self._re_prefix_patterns = list(self._transform_prefix(root_node, create_group_func))
+        # Regex strings.
+        self._re_pattern = patterns['pattern']
+        self._re_prefix_patterns = patterns['prefix_patterns']
 
         # Compile the regex itself.
         flags = re.DOTALL  # Note that we don't need re.MULTILINE! (^ and $
                            # still represent the start and end of input text.)
         self._re = re.compile(self._re_pattern, flags)
+
         self._re_prefix = [re.compile(t, flags) for t in self._re_prefix_patterns]
 
         # We compile one more set of regexes, similar to `_re_prefix`, but accept any trailing
@@ -97,6 +104,13 @@ class _CompiledGrammar(object):
             re.compile(r'(?:%s)(?P<%s>.*?)$' % (t.rstrip('$'), _INVALID_TRAILING_INPUT), flags)
             for t in self._re_prefix_patterns]
 
+        # Results of the most recent calls to `match` and `match_prefix`. The
+        # completer, lexer and validator usually match the same input, right
+        # after each other.
+        self._match_cache = _LRUCache(maxsize=8)
+        self._match_prefix_cache = _LRUCache(maxsize=8)
+        self._cache_lock = threading.Lock()
+
     def escape(self, varname, value):
         """
         Escape `value` to fit in the place of this variable into the grammar.
@@ -111,6 +125,27 @@ class _CompiledGrammar(object):
         f = self.unescape_funcs.get(varname)
         return f(value) if f else value
 
+    @classmethod
+    def _create_patterns(cls, root_node):
+        """
+        Turn the parse tree into regex strings. Returns a `dict` that can be
+        serialized as JSON.
+        """
+        group_names_to_nodes = {}
+        counter = [0]
+
+        def create_group_func(node):
+            name = 'n%s' % counter[0]
+            group_names_to_nodes[name] = node.varname
+            counter[0] += 1
+            return name
+
+        return {
+            'pattern': '^%s$' % cls._transform(root_node, create_group_func),
+            'prefix_patterns': list(cls._transform_prefix(root_node, create_group_func)),
+            'group_names_to_nodes': group_names_to_nodes,
+        }
+
     @classmethod
     def _transform(cls, root_node, create_group_func):
         """
@@ -236,6 +271,26 @@ class _CompiledGrammar(object):
 
         :param string: The input string.
         """
+        return self._cached(self._match_cache, string, self._match)
+
+    def _cached(self, cache, string, match_func):
+        """
+        Look up `string` in `cache`, or call `match_func` to match it. The
+        lock is only held around the cache access, not while matching.
+        """
+        with self._cache_lock:
+            try:
+                return cache.get(string)
+            except KeyError:
+                pass
+
+        result = match_func(string)
+
+        with self._cache_lock:
+            cache.set(string, result)
+        return result
+
+    def _match(self, string):
         m = self._re.match(string)
 
         if m:
@@ -250,6 +305,9 @@ class _CompiledGrammar(object):
 
         :param string: The input string.
         """
+        return self._cached(self._match_prefix_cache, string, self._match_prefix)
+
+    def _match_prefix(self, string):
         # First try to match using `_re_prefix`. If nothing is found, use the patterns that
         # also accept trailing characters.
         for patterns in [self._re_prefix, self._re_prefix_with_trailing_input]:
@@ -280,7 +338,7 @@ class Match(object):
             for r, re_match in self._re_matches:
                 for group_name, group_index in r.groupindex.items():
                     if group_name != _INVALID_TRAILING_INPUT:
-                        reg = re_match.regs[group_index]
+                        reg = re_match.span(group_index)
                         node = self._group_names_to_nodes[group_name]
                         yield (node, reg)
 
@@ -320,7 +378,7 @@ class Match(object):
         for r, re_match in self._re_matches:
             for group_name, group_index in r.groupindex.items():
                 if group_name == _INVALID_TRAILING_INPUT:
-                    slices.append(re_match.regs[group_index])
+                    slices.append(re_match.span(group_index))
 
         # Take the smallest part. (Smaller trailing text means that a larger input has
         # been matched, so that is better.)
@@ -389,15 +447,72 @@ class MatchVariable(object):
         return '%s(%r, %r)' % (self.__class__.__name__, self.varname, self.value)
 
 
-def compile(expression, escape_funcs=None, unescape_funcs=None):
+class _LRUCache(object):
+    """
+    Small cache that discards the least recently used item when the cache
+    size is exceeded. (Not thread safe, the caller has to lock.)
+
+    :param maxsize: Maximum size of the cache. Lookups are linear in the size.
+    """
+    def __init__(self, maxsize=8):
+        assert isinstance(maxsize, int) and maxsize > 0
+
+        self._data = {}
+        self._keys = []  # Least recently used first.
+        self.maxsize = maxsize
+
+    def get(self, key):
+        """
+        Return the cached value for `key` and mark it as most recently used.
+        Raises `KeyError` when it's not in the cache.
+        """
+        value = self._data[key]
+        self._keys.remove(key)
+        self._keys.append(key)
+        return value
+
+    def set(self, key, value):
+        " Store `value`, discarding the least recently used item if needed. "
+        if key in self._data:
+            self._keys.remove(key)
+        elif len(self._keys) >= self.maxsize:
+            del self._data[self._keys.pop(0)]
+
+        self._data[key] = value
+        self._keys.append(key)
+
+
+def compile(expression, escape_funcs=None, unescape_funcs=None, cache_dir=None):
     """
     Compile grammar (given as regex string), returning a `CompiledGrammar`
     instance.
+
+    :param cache_dir: Optional directory for caching the result of the
+        compilation. When the same grammar was compiled before by the same
+        version of prompt_toolkit, parsing and transforming the grammar is
+        skipped. (The `root_node` of the result is `None` in that case.)
     """
-    return _compile_from_parse_tree(
-        parse_regex(tokenize_regex(expression)),
+    if cache_dir is None:
+        return _compile_from_parse_tree(
+            parse_regex(tokenize_regex(expression)),
+            escape_funcs=escape_funcs,
+            unescape_funcs=unescape_funcs)
+
+    cache_file = _get_cache_file(cache_dir, expression)
+    patterns = _load_patterns(cache_file)
+
+    if patterns is None:
+        root_node = parse_regex(tokenize_regex(expression))
+        patterns = _CompiledGrammar._create_patterns(root_node)
+        _save_patterns(cache_file, patterns)
+    else:
+        root_node = None
+
+    return _CompiledGrammar(
+        root_node,
         escape_funcs=escape_funcs,
-        unescape_funcs=unescape_funcs)
+        unescape_funcs=unescape_funcs,
+        patterns=patterns)
 
 
 def _compile_from_parse_tree(root_node, *a, **kw):
@@ -406,3 +521,56 @@ def _compile_from_parse_tree(root_node, *a, **kw):
     instance.
     """
     return _CompiledGrammar(root_node, *a, **kw)
+
+
+def _get_cache_file(cache_dir, expression):
+    """
+    Return the cache file for this grammar. The name is a hash of the grammar
+    and the prompt_toolkit version, so that a new version, which could
+    compile the grammar differently, doesn't use old files.
+    """
+    from prompt_toolkit import __version__
+
+    key = hashlib.sha1(('%s\0%s' % (__version__, expression)).encode('utf-8'))
+    return os.path.join(cache_dir, 'grammar-%s.json' % key.hexdigest())
+
+
+def _load_patterns(cache_file):
+    """
+    Load the patterns from the cache file. Return `None` when they are not
+    available.
+    """
+    try:
+        with io.open(cache_file, 'r', encoding='utf-8') as f:
+            patterns = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+    if (isinstance(patterns, dict) and
+            set(patterns) == set(['pattern', 'prefix_patterns', 'group_names_to_nodes'])):
+        return patterns
+
+
+def _save_patterns(cache_file, patterns):
+    """
+    Write the patterns to the cache file. (Failing to do so is not an error,
+    the cache is only an optimization.)
+    """
+    directory = os.path.dirname(cache_file)
+
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # Write to a temporary file first, so that other processes never
+        # see an incomplete file.
+        fd, tmp_name = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(patterns).encode('utf-8'))
+            os.rename(tmp_name, cache_file)
+        except:
+            os.remove(tmp_name)
+            raise
+    except (IOError, OSError):
+        pass
@@ -78,7 +78,9 @@ class GrammarCompleter(Completer):
         same grammar, each yielding similar completions.)
         """
         result = []
+        seen = set()
         for i in items:
-            if i not in result:
+            if i not in seen:
+                seen.add(i)
                 result.append(i)
         return result
@@ -32,6 +32,7 @@ from codecs import getincrementaldecoder
 
 from prompt_toolkit.enums import DEFAULT_BUFFER
 from prompt_toolkit.eventloop.base import EventLoop
+from prompt_toolkit.eventloop.executor import ThreadPool, get_default_executor
 from prompt_toolkit.interface import CommandLineInterface, Application
 from prompt_toolkit.layout.screen import Size
 from prompt_toolkit.shortcuts import create_prompt_application
@@ -155,7 +156,7 @@ class TelnetConnection(object):
 
         # Create a parser, and parser callbacks.
         cb = self.cli.create_eventloop_callbacks()
-        inputstream = InputStream(cb.feed_key)
+        inputstream = InputStream(cb.feed_key, cb.feed_keys)
 
         # Input decoder for stdin. (Required when working with multibyte
         # characters, like chinese input.)
@@ -235,7 +236,9 @@ class TelnetConnection(object):
                 self.vt100_output.flush()
                 self.cli._redraw()
 
-        self.server.run_in_executor(in_executor)
+        # (A command can run as long as the session, so it gets a thread of
+        # its own, instead of a worker of the executor.)
+        threading.Thread(target=in_executor).start()
 
     def erase_screen(self):
         """
@@ -280,8 +283,8 @@ class _TelnetEventLoopInterface(EventLoop):
     def stop(self):
         " Ignore. "
 
-    def run_in_executor(self, callback):
-        self._server.run_in_executor(callback)
+    def run_in_executor(self, callback, dropped_callback=None):
+        self._server.run_in_executor(callback, dropped_callback=dropped_callback)
 
     def call_from_executor(self, callback, _max_postpone_until=None):
         self._server.call_from_executor(callback)
@@ -296,17 +299,24 @@ class _TelnetEventLoopInterface(EventLoop):
 class TelnetServer(object):
     """
     Telnet server implementation.
+
+    :param executor: :class:`~prompt_toolkit.eventloop.executor.ThreadPool`
+        for completion and auto suggestion. (By default, the shared executor.)
+        Commands run in a thread of their own.
     """
-    def __init__(self, host='127.0.0.1', port=23, application=None, encoding='utf-8'):
+    def __init__(self, host='127.0.0.1', port=23, application=None, encoding='utf-8',
+                 executor=None):
         assert isinstance(host, text_type)
         assert isinstance(port, int)
         assert isinstance(application, TelnetApplication)
         assert isinstance(encoding, text_type)
+        assert executor is None or isinstance(executor, ThreadPool)
 
         self.host = host
         self.port = port
         self.application = application
         self.encoding = encoding
+        self.executor = executor
 
         self.connections = set()
 
@@ -326,8 +336,9 @@ class TelnetServer(object):
         s.listen(4)
         return s
 
-    def run_in_executor(self, callback):
-        threading.Thread(target=callback).start()
+    def run_in_executor(self, callback, dropped_callback=None):
+        (self.executor or get_default_executor()).submit(
+            callback, dropped_callback=dropped_callback)
 
     def call_from_executor(self, callback):
         self._calls_from_executor.append(callback)
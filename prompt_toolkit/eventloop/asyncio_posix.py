@@ -18,6 +18,8 @@ __all__ = (
 
 
 class PosixAsyncioEventLoop(EventLoop):
+    supports_coroutines = True
+
     def __init__(self, loop=None):
         self.loop = loop or asyncio.get_event_loop()
         self.closed = False
@@ -37,7 +39,7 @@ class PosixAsyncioEventLoop(EventLoop):
         if self.closed:
             raise Exception('Event loop already closed.')
 
-        inputstream = InputStream(callbacks.feed_key)
+        inputstream = InputStream(callbacks.feed_key, callbacks.feed_keys)
 
         try:
             # Create a new Future every time.
@@ -94,9 +96,13 @@ class PosixAsyncioEventLoop(EventLoop):
         # was not created here.
         self.closed = True
 
-    def run_in_executor(self, callback):
+    def run_in_executor(self, callback, dropped_callback=None):
+        # (The executor of asyncio doesn't drop callbacks.)
         self.loop.run_in_executor(None, callback)
 
+    def create_task(self, coroutine):
+        return asyncio.ensure_future(coroutine, loop=self.loop)
+
     def call_from_executor(self, callback, _max_postpone_until=None):
         """
         Call this function in the main event loop.
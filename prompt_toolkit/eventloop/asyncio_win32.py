@@ -19,6 +19,8 @@ __all__ = (
 
 
 class Win32AsyncioEventLoop(EventLoop):
+    supports_coroutines = True
+
     def __init__(self, loop=None):
         self._console_input_reader = ConsoleInputReader()
         self.running = False
@@ -53,8 +55,7 @@ class Win32AsyncioEventLoop(EventLoop):
                     keys = e.args[0]
 
                 # Feed keys to input processor.
-                for k in keys:
-                    callbacks.feed_key(k)
+                callbacks.feed_keys(keys)
         finally:
             timeout.stop()
 
@@ -68,9 +69,13 @@ class Win32AsyncioEventLoop(EventLoop):
 
         self._console_input_reader.close()
 
-    def run_in_executor(self, callback):
+    def run_in_executor(self, callback, dropped_callback=None):
+        # (The executor of asyncio doesn't drop callbacks.)
         self.loop.run_in_executor(None, callback)
 
+    def create_task(self, coroutine):
+        return asyncio.ensure_future(coroutine, loop=self.loop)
+
     def call_from_executor(self, callback, _max_postpone_until=None):
         self.loop.call_soon_threadsafe(callback)
 
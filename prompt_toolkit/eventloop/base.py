@@ -16,6 +16,9 @@ class EventLoop(with_metaclass(ABCMeta, object)):
     """
     Eventloop interface.
     """
+    #: True when this event loop can run coroutines. (See :meth:`create_task`.)
+    supports_coroutines = False
+
     def run(self, stdin, callbacks):
         """
         Run the eventloop until stop() is called. Report all
@@ -61,12 +64,24 @@ class EventLoop(with_metaclass(ABCMeta, object)):
         """
 
     @abstractmethod
-    def run_in_executor(self, callback):
+    def run_in_executor(self, callback, dropped_callback=None):
         """
         Run a long running function in a background thread. (This is
         recommended for code that could block the event loop.)
         Similar to Twisted's ``deferToThread``.
+
+        :param dropped_callback: Called in the event loop instead of
+            `callback`, when the executor drops `callback` because its queue
+            is full. (Only executors with a `max_queue_size` drop callbacks.)
+        """
+
+    def create_task(self, coroutine):
+        """
+        Schedule a coroutine in this event loop. Returns a future, which has
+        `add_done_callback` and `cancel` methods. (Only for event loops that
+        have `supports_coroutines` set, like the asyncio event loops.)
         """
+        raise NotImplementedError("This eventloop doesn't run coroutines.")
 
     @abstractmethod
     def call_from_executor(self, callback, _max_postpone_until=None):
@@ -27,3 +27,15 @@ class EventLoopCallbacks(with_metaclass(ABCMeta, object)):
     @abstractmethod
     def feed_key(self, key):
         pass
+
+    def feed_keys(self, keys):
+        """
+        Feed a list of key presses that were received at once. (This allows
+        the interface to handle typed text in one go.)
+
+        Implementations can insert a run of typed characters at once. Then the
+        `beforeKeyPress` and `afterKeyPress` events of the input processor
+        fire once for the whole run, instead of once for every key press.
+        """
+        for k in keys:
+            self.feed_key(k)
@@ -0,0 +1,266 @@
+"""
+Bounded thread pool, used by the event loops for `run_in_executor`.
+
+Completion and auto suggestion run their work in the background. Instead of
+starting a new thread for every call, the work is queued and picked up by a
+limited number of worker threads.
+
+There are two lanes: interactive work (like completion) is always taken
+first, and background work can only occupy part of the workers, so that the
+interactive lane never starves.
+"""
+from __future__ import unicode_literals
+from collections import deque
+
+import threading
+import time
+import traceback
+
+__all__ = (
+    'ExecutorPriority',
+    'ExecutorMetrics',
+    'ThreadPool',
+    'get_default_executor',
+    'set_default_executor',
+)
+
+
+class ExecutorPriority(object):
+    " Lane in which a callback is queued. "
+    #: Work that the user is waiting for. (Completion, auto suggestion.)
+    INTERACTIVE = 'INTERACTIVE'
+
+    #: Work that can wait.
+    BACKGROUND = 'BACKGROUND'
+
+
+class ExecutorMetrics(object):
+    """
+    Snapshot of the state of a :class:`.ThreadPool`.
+
+    The latency (the time between submitting and starting a callback) and the
+    run time are given in seconds.
+    """
+    def __init__(self, workers, busy_workers, queue_depth, submitted,
+                 completed, dropped, average_latency, max_latency,
+                 average_run_time):
+        self.workers = workers
+        self.busy_workers = busy_workers
+        self.queue_depth = queue_depth  # Maps priority to queue length.
+        self.submitted = submitted
+        self.completed = completed
+        self.dropped = dropped
+        self.average_latency = average_latency
+        self.max_latency = max_latency
+        self.average_run_time = average_run_time
+
+    def __repr__(self):
+        return ('%s(workers=%r, busy_workers=%r, queue_depth=%r, submitted=%r, '
+                'completed=%r, dropped=%r, average_latency=%r, max_latency=%r, '
+                'average_run_time=%r)' % (
+                    self.__class__.__name__, self.workers, self.busy_workers,
+                    self.queue_depth, self.submitted, self.completed,
+                    self.dropped, self.average_latency, self.max_latency,
+                    self.average_run_time))
+
+
+class ThreadPool(object):
+    """
+    Thread pool with a bounded number of worker threads.
+
+    Workers are started on demand and stay alive afterwards. (They are daemon
+    threads, so they won't keep the process alive.)
+
+    :param max_workers: Maximum number of worker threads.
+    :param max_background_workers: Maximum number of workers that can run
+        background work at the same time. (By default, half of the workers.)
+    :param max_queue_size: Maximum number of pending callbacks per lane.
+        When a lane is full, the oldest pending callback is dropped. (It's
+        most likely stale anyway.) Its `dropped_callback` is called instead.
+        `None` means unbounded.
+    """
+    def __init__(self, max_workers=8, max_background_workers=None, max_queue_size=None):
+        if max_background_workers is None:
+            max_background_workers = max(1, max_workers // 2)
+
+        assert isinstance(max_workers, int) and max_workers > 0
+        assert isinstance(max_background_workers, int) and 0 < max_background_workers <= max_workers
+        assert max_queue_size is None or (isinstance(max_queue_size, int) and max_queue_size > 0)
+
+        self.max_workers = max_workers
+        self.max_background_workers = max_background_workers
+        self.max_queue_size = max_queue_size
+
+        self._condition = threading.Condition()
+        self._queues = {
+            ExecutorPriority.INTERACTIVE: deque(),
+            ExecutorPriority.BACKGROUND: deque(),
+        }
+        self._workers = []
+        self._idle_workers = 0
+        self._busy_background_workers = 0
+        self._shutdown = False
+
+        # Statistics.
+        self._submitted = 0
+        self._completed = 0
+        self._dropped = 0
+        self._total_latency = 0.
+        self._max_latency = 0.
+        self._total_run_time = 0.
+
+    def submit(self, callback, priority=ExecutorPriority.INTERACTIVE,
+               dropped_callback=None):
+        """
+        Queue `callback` for execution in one of the worker threads.
+
+        :param dropped_callback: Called instead of `callback` when it is
+            dropped, because the lane is full. (This happens in the thread that
+            submits the callback that takes its place.)
+        """
+        assert callable(callback)
+        assert priority in self._queues
+        assert dropped_callback is None or callable(dropped_callback)
+
+        dropped = None
+
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError('Executor has been shut down.')
+
+            queue = self._queues[priority]
+            queue.append((callback, time.time(), dropped_callback))
+            self._submitted += 1
+
+            if self.max_queue_size is not None and len(queue) > self.max_queue_size:
+                dropped = queue.popleft()[2]
+                self._dropped += 1
+
+            # Start a new worker when all the others are busy.
+            pending = sum(len(q) for q in self._queues.values())
+            if pending > self._idle_workers and len(self._workers) < self.max_workers:
+                t = threading.Thread(target=self._worker)
+                t.daemon = True
+                self._workers.append(t)
+                t.start()
+
+            self._condition.notify()
+
+        # Tell the submitter of the dropped callback. (Outside the lock, it
+        # could submit new work.)
+        if dropped is not None:
+            dropped()
+
+    def _get_task(self):
+        """
+        Return the next (callback, submit_time, priority) tuple to execute, or
+        `None` when nothing can be done. (Caller should hold the lock.)
+        """
+        interactive = self._queues[ExecutorPriority.INTERACTIVE]
+        background = self._queues[ExecutorPriority.BACKGROUND]
+
+        if interactive:
+            return interactive.popleft()[:2] + (ExecutorPriority.INTERACTIVE, )
+
+        if background and self._busy_background_workers < self.max_background_workers:
+            return background.popleft()[:2] + (ExecutorPriority.BACKGROUND, )
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                task = self._get_task()
+                while task is None:
+                    if self._shutdown:
+                        return
+
+                    self._idle_workers += 1
+                    self._condition.wait()
+                    self._idle_workers -= 1
+                    task = self._get_task()
+
+                callback, submit_time, priority = task
+                if priority == ExecutorPriority.BACKGROUND:
+                    self._busy_background_workers += 1
+
+            start = time.time()
+            try:
+                callback()
+            except Exception:
+                # Don't let the worker die. (Print the exception, like
+                # `threading.Thread` would do.)
+                traceback.print_exc()
+            end = time.time()
+
+            with self._condition:
+                if priority == ExecutorPriority.BACKGROUND:
+                    self._busy_background_workers -= 1
+
+                    # A background slot became available.
+                    self._condition.notify()
+
+                latency = start - submit_time
+                self._completed += 1
+                self._total_latency += latency
+                self._max_latency = max(self._max_latency, latency)
+                self._total_run_time += end - start
+
+    @property
+    def metrics(self):
+        """
+        Return an :class:`.ExecutorMetrics` instance.
+        """
+        with self._condition:
+            completed = self._completed
+
+            return ExecutorMetrics(
+                workers=len(self._workers),
+                busy_workers=len(self._workers) - self._idle_workers,
+                queue_depth=dict((p, len(q)) for p, q in self._queues.items()),
+                submitted=self._submitted,
+                completed=completed,
+                dropped=self._dropped,
+                average_latency=self._total_latency / completed if completed else 0.,
+                max_latency=self._max_latency,
+                average_run_time=self._total_run_time / completed if completed else 0.)
+
+    def shutdown(self, wait=True):
+        """
+        Stop the workers after the pending callbacks have been executed.
+        """
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+            workers = list(self._workers)
+
+        if wait:
+            for t in workers:
+                if t is not threading.current_thread():
+                    t.join()
+
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def get_default_executor():
+    """
+    Return the :class:`.ThreadPool` that is shared by all event loops which
+    didn't receive an executor of their own.
+    """
+    global _default_executor
+
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPool()
+        return _default_executor
+
+
+def set_default_executor(executor):
+    """
+    Replace the shared :class:`.ThreadPool`. (E.g. to configure its size.)
+    """
+    assert isinstance(executor, ThreadPool)
+    global _default_executor
+
+    with _default_executor_lock:
+        _default_executor = executor
@@ -3,7 +3,6 @@ import fcntl
 import os
 import random
 import signal
-import threading
 import time
 
 from prompt_toolkit.terminal.vt100_input import InputStream
@@ -11,6 +10,7 @@ from prompt_toolkit.utils import DummyContext, in_main_thread
 from prompt_toolkit.input import Input
 from .base import EventLoop, INPUT_TIMEOUT
 from .callbacks import EventLoopCallbacks
+from .executor import ThreadPool, get_default_executor
 from .inputhook import InputHookContext
 from .posix_utils import PosixStdinReader
 from .utils import TimeIt
@@ -26,10 +26,16 @@ _now = time.time
 class PosixEventLoop(EventLoop):
     """
     Event loop for posix systems (Linux, Mac os X).
+
+    :param executor: :class:`~prompt_toolkit.eventloop.executor.ThreadPool`
+        for `run_in_executor`. (By default, the shared executor.)
     """
-    def __init__(self, inputhook=None, selector=AutoSelector):
+    def __init__(self, inputhook=None, selector=AutoSelector, executor=None):
         assert inputhook is None or callable(inputhook)
         assert issubclass(selector, Selector)
+        assert executor is None or isinstance(executor, ThreadPool)
+
+        self.executor = executor
 
         self.running = False
         self.closed = False
@@ -61,7 +67,7 @@ class PosixEventLoop(EventLoop):
         self._running = True
         self._callbacks = callbacks
 
-        inputstream = InputStream(callbacks.feed_key)
+        inputstream = InputStream(callbacks.feed_key, callbacks.feed_keys)
         current_timeout = [INPUT_TIMEOUT]  # Nonlocal
 
         # Create reader class.
@@ -211,11 +217,15 @@ class PosixEventLoop(EventLoop):
 
         self.call_from_executor(process_winch)
 
-    def run_in_executor(self, callback):
+    def run_in_executor(self, callback, dropped_callback=None):
         """
         Run a long running function in a background thread.
         (This is recommended for code that could block the event loop.)
         Similar to Twisted's ``deferToThread``.
+
+        The function runs in a worker thread of the executor, instead of a
+        thread of its own. When the executor drops it, `dropped_callback` is
+        called instead.
         """
         # Wait until the main thread is idle.
         # We start the thread by using `call_from_executor`. The event loop
@@ -227,7 +237,8 @@ class PosixEventLoop(EventLoop):
         # It is mostly noticable when pasting large portions of text while
         # having real time autocompletion while typing on.
         def start_executor():
-            threading.Thread(target=callback).start()
+            (self.executor or get_default_executor()).submit(
+                callback, dropped_callback=dropped_callback)
         self.call_from_executor(start_executor)
 
     def call_from_executor(self, callback, _max_postpone_until=None):
@@ -9,6 +9,7 @@ from __future__ import unicode_literals
 from ..terminal.win32_input import ConsoleInputReader
 from ..win32_types import SECURITY_ATTRIBUTES
 from .base import EventLoop, INPUT_TIMEOUT
+from .executor import ThreadPool, get_default_executor
 from .inputhook import InputHookContext
 from .utils import TimeIt
 
@@ -16,7 +17,6 @@ from ctypes import windll, pointer
 from ctypes.wintypes import DWORD, BOOL, HANDLE
 
 import msvcrt
-import threading
 
 __all__ = (
     'Win32EventLoop',
@@ -32,9 +32,14 @@ class Win32EventLoop(EventLoop):
 
     :param recognize_paste: When True, try to discover paste actions and turn
         the event into a BracketedPaste.
+    :param executor: :class:`~prompt_toolkit.eventloop.executor.ThreadPool`
+        for `run_in_executor`. (By default, the shared executor.)
     """
-    def __init__(self, inputhook=None, recognize_paste=True):
+    def __init__(self, inputhook=None, recognize_paste=True, executor=None):
         assert inputhook is None or callable(inputhook)
+        assert executor is None or isinstance(executor, ThreadPool)
+
+        self.executor = executor
 
         self._event = _create_event()
         self._console_input_reader = ConsoleInputReader(recognize_paste=recognize_paste)
@@ -77,8 +82,7 @@ class Win32EventLoop(EventLoop):
             if handle == self._console_input_reader.handle:
                 # When stdin is ready, read input and reset timeout timer.
                 keys = self._console_input_reader.read()
-                for k in keys:
-                    callbacks.feed_key(k)
+                callbacks.feed_keys(keys)
                 current_timeout = INPUT_TIMEOUT_MS
 
             elif handle == self._event:
@@ -116,7 +120,7 @@ class Win32EventLoop(EventLoop):
 
         self._console_input_reader.close()
 
-    def run_in_executor(self, callback):
+    def run_in_executor(self, callback, dropped_callback=None):
         """
         Run a long running function in a background thread.
         (This is recommended for code that could block the event loop.)
@@ -126,7 +130,8 @@ class Win32EventLoop(EventLoop):
         # executor. (Like in eventloop/posix.py, we start the executor using
         # `call_from_executor`.)
         def start_executor():
-            threading.Thread(target=callback).start()
+            (self.executor or get_default_executor()).submit(
+                callback, dropped_callback=dropped_callback)
         self.call_from_executor(start_executor)
 
     def call_from_executor(self, callback, _max_postpone_until=None):
@@ -32,5 +32,6 @@ from __future__ import unicode_literals
 
 from .base import *
 from .cli import *
+from .evaluation import *
 from .types import *
 from .utils import *
@@ -18,6 +18,19 @@ class Filter(with_metaclass(ABCMeta, object)):
     Filter to activate/deactivate a feature, depending on a condition.
     The return value of ``__call__`` will tell if the feature should be active.
     """
+    #: True when the result of this filter doesn't change while the user
+    #: interface is rendered once. (Then the result can be cached for the
+    #: duration of one rendering. See
+    #: :class:`~prompt_toolkit.filters.RenderFilterCache`.)
+    pure_per_render = False
+
+    #: False when inserting text in the current buffer can't change the result
+    #: of this filter. (When that buffer has no selection, because inserting
+    #: text removes it.) Then the
+    #: :class:`~prompt_toolkit.key_binding.input_processor.InputProcessor` can
+    #: insert several typed characters at once.
+    changes_on_text_insert = True
+
     @abstractmethod
     def __call__(self, *a, **kw):
         """
@@ -130,12 +143,18 @@ class _AndList(Filter):
                 all_filters.append(f)
 
         self.filters = all_filters
+        self.pure_per_render = all(f.pure_per_render for f in all_filters)
+        self.changes_on_text_insert = any(f.changes_on_text_insert for f in all_filters)
 
     def test_args(self, *args):
         return all(f.test_args(*args) for f in self.filters)
 
     def __call__(self, *a, **kw):
-        return all(f(*a, **kw) for f in self.filters)
+        # (A plain loop is faster than `all` with a generator.)
+        for f in self.filters:
+            if not f(*a, **kw):
+                return False
+        return True
 
     def __repr__(self):
         return '&'.join(repr(f) for f in self.filters)
@@ -155,12 +174,17 @@ class _OrList(Filter):
                 all_filters.append(f)
 
         self.filters = all_filters
+        self.pure_per_render = all(f.pure_per_render for f in all_filters)
+        self.changes_on_text_insert = any(f.changes_on_text_insert for f in all_filters)
 
     def test_args(self, *args):
         return all(f.test_args(*args) for f in self.filters)
 
     def __call__(self, *a, **kw):
-        return any(f(*a, **kw) for f in self.filters)
+        for f in self.filters:
+            if f(*a, **kw):
+                return True
+        return False
 
     def __repr__(self):
         return '|'.join(repr(f) for f in self.filters)
@@ -172,6 +196,8 @@ class _Invert(Filter):
     """
     def __init__(self, filter):
         self.filter = filter
+        self.pure_per_render = filter.pure_per_render
+        self.changes_on_text_insert = filter.changes_on_text_insert
 
     def __call__(self, *a, **kw):
         return not self.filter(*a, **kw)
@@ -187,6 +213,9 @@ class Always(Filter):
     """
     Always enable feature.
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, *a, **kw):
         return True
 
@@ -198,6 +227,9 @@ class Never(Filter):
     """
     Never enable feature.
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, *a, **kw):
         return False
 
@@ -219,10 +251,16 @@ class Condition(Filter):
         :class:`~prompt_toolkit.interface.CommandLineInterface` or nothing and
         returns a boolean. (Depending on what it takes, this will become a
         :class:`.Filter` or :class:`~prompt_toolkit.filters.CLIFilter`.)
+    :param pure_per_render: True when the result doesn't change while the
+        user interface is rendered once. (See :attr:`.Filter.pure_per_render`.)
+    :param changes_on_text_insert: False when inserting text can't change the
+        result. (See :attr:`.Filter.changes_on_text_insert`.)
     """
-    def __init__(self, func):
+    def __init__(self, func, pure_per_render=False, changes_on_text_insert=True):
         assert callable(func)
         self.func = func
+        self.pure_per_render = pure_per_render
+        self.changes_on_text_insert = changes_on_text_insert
 
     def __call__(self, *a, **kw):
         return self.func(*a, **kw)
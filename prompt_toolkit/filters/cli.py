@@ -45,6 +45,9 @@ class HasFocus(Filter):
     """
     Enable when this buffer has the focus.
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __init__(self, buffer_name):
         self._buffer_name = buffer_name
 
@@ -65,6 +68,9 @@ class InFocusStack(Filter):
     """
     Enable when this buffer appears on the focus stack.
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __init__(self, buffer_name):
         self._buffer_name = buffer_name
 
@@ -85,6 +91,9 @@ class HasSelection(Filter):
     """
     Enable when the current buffer has a selection.
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return bool(cli.current_buffer.selection_state)
 
@@ -97,6 +106,8 @@ class HasCompletions(Filter):
     """
     Enable when the current buffer has completions.
     """
+    pure_per_render = True
+
     def __call__(self, cli):
         return cli.current_buffer.complete_state is not None
 
@@ -121,6 +132,8 @@ class IsReadOnly(Filter):
     """
     True when the current buffer is read only.
     """
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return cli.current_buffer.read_only()
 
@@ -133,6 +146,8 @@ class HasValidationError(Filter):
     """
     Current buffer has validation error.
     """
+    pure_per_render = True
+
     def __call__(self, cli):
         return cli.current_buffer.validation_error is not None
 
@@ -145,6 +160,9 @@ class HasArg(Filter):
     """
     Enable when the input processor has an 'arg'.
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return cli.input_processor.arg is not None
 
@@ -157,6 +175,9 @@ class HasSearch(Filter):
     """
     Incremental search is active.
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return cli.is_searching
 
@@ -169,6 +190,9 @@ class IsReturning(Filter):
     """
     When a return value has been set.
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return cli.is_returning
 
@@ -181,6 +205,9 @@ class IsAborting(Filter):
     """
     True when aborting. (E.g. Control-C pressed.)
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return cli.is_aborting
 
@@ -193,6 +220,9 @@ class IsExiting(Filter):
     """
     True when exiting. (E.g. Control-D pressed.)
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return cli.is_exiting
 
@@ -205,6 +235,9 @@ class IsDone(Filter):
     """
     True when the CLI is returning, aborting or exiting.
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return cli.is_done
 
@@ -223,6 +256,9 @@ class RendererHeightIsKnown(Filter):
     until we receive the height, in order to avoid flickering -- first drawing
     somewhere in the middle, and then again at the bottom.)
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return cli.renderer.height_is_known
 
@@ -235,6 +271,9 @@ class InEditingMode(Filter):
     """
     Check whether a given editing mode is active. (Vi or Emacs.)
     """
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __init__(self, editing_mode):
         self._editing_mode = editing_mode
 
@@ -252,6 +291,9 @@ class InEditingMode(Filter):
 
 @memoized()
 class ViMode(Filter):
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return cli.editing_mode == EditingMode.VI
 
@@ -264,6 +306,8 @@ class ViNavigationMode(Filter):
     """
     Active when the set for Vi navigation key bindings are active.
     """
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         if (cli.editing_mode != EditingMode.VI
                 or cli.vi_state.operator_func
@@ -280,6 +324,8 @@ class ViNavigationMode(Filter):
 
 @memoized()
 class ViInsertMode(Filter):
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         if (cli.editing_mode != EditingMode.VI
                 or cli.vi_state.operator_func
@@ -296,6 +342,8 @@ class ViInsertMode(Filter):
 
 @memoized()
 class ViInsertMultipleMode(Filter):
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         if (cli.editing_mode != EditingMode.VI
                 or cli.vi_state.operator_func
@@ -312,6 +360,8 @@ class ViInsertMultipleMode(Filter):
 
 @memoized()
 class ViReplaceMode(Filter):
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         if (cli.editing_mode != EditingMode.VI
                 or cli.vi_state.operator_func
@@ -328,6 +378,9 @@ class ViReplaceMode(Filter):
 
 @memoized()
 class ViSelectionMode(Filter):
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         if cli.editing_mode != EditingMode.VI:
             return False
@@ -340,6 +393,9 @@ class ViSelectionMode(Filter):
 
 @memoized()
 class ViWaitingForTextObjectMode(Filter):
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         if cli.editing_mode != EditingMode.VI:
             return False
@@ -352,6 +408,9 @@ class ViWaitingForTextObjectMode(Filter):
 
 @memoized()
 class ViDigraphMode(Filter):
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         if cli.editing_mode != EditingMode.VI:
             return False
@@ -365,6 +424,9 @@ class ViDigraphMode(Filter):
 @memoized()
 class EmacsMode(Filter):
     " When the Emacs bindings are active. "
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return cli.editing_mode == EditingMode.EMACS
 
@@ -374,6 +436,8 @@ class EmacsMode(Filter):
 
 @memoized()
 class EmacsInsertMode(Filter):
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         if (cli.editing_mode != EditingMode.EMACS
                 or cli.current_buffer.selection_state
@@ -387,6 +451,9 @@ class EmacsInsertMode(Filter):
 
 @memoized()
 class EmacsSelectionMode(Filter):
+    pure_per_render = True
+    changes_on_text_insert = False
+
     def __call__(self, cli):
         return (cli.editing_mode == EditingMode.EMACS
                 and cli.current_buffer.selection_state)
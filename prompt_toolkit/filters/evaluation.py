@@ -0,0 +1,182 @@
+"""
+Evaluation of many filters at once.
+
+Key bindings often share parts of their filters. (Many of them are something
+like ``ViNavigationMode() & ~IsReadOnly()``.) A :class:`FilterEvaluator`
+remembers the result of every filter and sub-filter that it evaluated, so that
+each of them is called only once, and it counts the calls, so that expensive
+filters can be found.
+
+A :class:`RenderFilterCache` does the same for the filters that are evaluated
+while rendering the layout.
+"""
+from __future__ import unicode_literals
+from .base import Filter, Always, Never, _AndList, _OrList, _Invert
+
+__all__ = (
+    'FilterEvaluator',
+    'RenderFilterCache',
+    'evaluate_for_render',
+)
+
+# How to evaluate a filter of a given type. All other filters are called.
+_CALL, _AND, _OR, _INVERT, _TRUE, _FALSE = range(6)
+
+_OPERATIONS = {
+    _AndList: _AND,
+    _OrList: _OR,
+    _Invert: _INVERT,
+    Always: _TRUE,
+    Never: _FALSE,
+}
+
+
+class FilterEvaluator(object):
+    """
+    Evaluate filters for the given arguments, and remember the results.
+
+    ``&``, ``|`` and ``~`` combinations are evaluated by the evaluator itself,
+    so that sub-filters that are shared between several filters are only
+    called once. The results are only valid as long as the state that the
+    filters look at doesn't change. (Call :meth:`clear` when it does.)
+
+    ::
+
+        evaluator = FilterEvaluator(cli)
+        active = [b for b in bindings if evaluator(b.filter)]
+
+    :param args: The arguments for the filters. (E.g. the
+        :class:`~prompt_toolkit.interface.CommandLineInterface`.)
+    """
+    def __init__(self, *args):
+        self.args = args
+        self._results = {}
+
+        #: Number of filters that were actually called.
+        self.call_count = 0
+
+        #: The filters that were actually called, in that order. (Filters that
+        #: are called again after `clear` appear more than once.)
+        self.calls = []
+
+    def __repr__(self):
+        return '%s(call_count=%r)' % (self.__class__.__name__, self.call_count)
+
+    def clear(self):
+        """
+        Forget the results. (Keep the call statistics.)
+        """
+        self._results.clear()
+
+    def __call__(self, filter):
+        assert isinstance(filter, Filter)
+
+        try:
+            return self._results[filter]
+        except KeyError:
+            pass
+
+        operation = _OPERATIONS.get(type(filter), _CALL)
+
+        if operation == _CALL:
+            self.call_count += 1
+            self.calls.append(filter)
+            result = bool(filter(*self.args))
+
+        elif operation == _AND:
+            result = True
+            for f in filter.filters:
+                if not self(f):
+                    result = False
+                    break
+
+        elif operation == _OR:
+            result = False
+            for f in filter.filters:
+                if self(f):
+                    result = True
+                    break
+
+        elif operation == _INVERT:
+            result = not self(filter.filter)
+
+        else:
+            result = (operation == _TRUE)
+
+        self._results[filter] = result
+        return result
+
+
+class RenderFilterCache(object):
+    """
+    Cache for the results of filters during one rendering of a
+    :class:`~prompt_toolkit.interface.CommandLineInterface`.
+
+    While rendering, the layout evaluates the same filters many times.
+    (`ConditionalContainer`, `ConditionalMargin`, the options of `Window`,
+    ...) Filters that declare `pure_per_render` are evaluated only once per
+    value of `cli.render_counter`. Other filters are always called.
+
+    To enable it::
+
+        cli.render_filter_cache = RenderFilterCache()
+
+    :param debug: When True, the filters are still called every time, and
+        filters that declare `pure_per_render` but return a different result
+        during the same rendering are added to `changed_filters`.
+    """
+    def __init__(self, debug=False):
+        self.debug = debug
+
+        #: List of (render_counter, filter) tuples. (Only in debug mode.)
+        self.changed_filters = []
+
+        self._render_counter = None  # Only set while rendering.
+        self._results = {}
+
+    def __repr__(self):
+        return '%s(debug=%r)' % (self.__class__.__name__, self.debug)
+
+    def begin(self, render_counter):
+        " Called when a rendering starts. "
+        self._render_counter = render_counter
+        self._results.clear()
+
+    def end(self):
+        " Called when the rendering is done. (Outside of it, nothing is cached.) "
+        self._render_counter = None
+        self._results.clear()
+
+    def __call__(self, filter, cli):
+        if (self._render_counter is None or not filter.pure_per_render or
+                cli.render_counter != self._render_counter):
+            return filter(cli)
+
+        try:
+            result = self._results[filter]
+        except KeyError:
+            result = self._results[filter] = filter(cli)
+        else:
+            if self.debug:
+                new_result = filter(cli)
+
+                if bool(new_result) != bool(result):
+                    self.changed_filters.append((self._render_counter, filter))
+                    self._results[filter] = new_result
+
+                result = new_result
+
+        return result
+
+
+def evaluate_for_render(filter, cli):
+    """
+    Call `filter` with `cli`, using the `render_filter_cache` of `cli` when it
+    has one. (For filters that are evaluated during a rendering.)
+    """
+    cache = cli.render_filter_cache
+
+    if cache is None:
+        return filter(cli)
+    else:
+        return cache(filter, cli)
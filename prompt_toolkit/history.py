@@ -1,14 +1,24 @@
 from __future__ import unicode_literals
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
 from six import with_metaclass
 
 import datetime
+import io
 import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows.
 
 __all__ = (
     'FileHistory',
     'History',
     'InMemoryHistory',
+    'SharedFileHistory',
 )
 
 
@@ -76,45 +86,192 @@ class FileHistory(History):
         self._load()
 
     def _load(self):
-        lines = []
-
-        def add():
-            if lines:
-                # Join and drop trailing newline.
-                string = ''.join(lines)[:-1]
-
-                self.strings.append(string)
-
         if os.path.exists(self.filename):
             with open(self.filename, 'rb') as f:
-                for line in f:
-                    line = line.decode('utf-8')
-
-                    if line.startswith('+'):
-                        lines.append(line[1:])
-                    else:
-                        add()
-                        lines = []
-
-                add()
+                self.strings.extend(_parse_history_file(f))
 
     def append(self, string):
         self.strings.append(string)
 
         # Save to file.
         with open(self.filename, 'ab') as f:
-            def write(t):
-                f.write(t.encode('utf-8'))
+            f.write(_format_history_entry(string))
+
+    def __getitem__(self, key):
+        return self.strings[key]
+
+    def __iter__(self):
+        return iter(self.strings)
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class SharedFileHistory(FileHistory):
+    """
+    :class:`.FileHistory` that can be shared between several processes at the
+    same time.
+
+    Writes are done while holding an advisory lock on the file (on systems
+    that have `fcntl`), and entries written by other processes are picked up
+    while we are running, by reading only the part of the file that was added
+    since the last read.
+
+    :param flush_every: Buffer this many entries before writing them to the
+        file. (1 means: write every entry immediately.) When this is bigger
+        than 1, call :meth:`.flush` before exiting.
+    :param refresh_interval: Minimum amount of seconds between two checks for
+        entries that were written by other processes.
+    """
+    def __init__(self, filename, flush_every=1, refresh_interval=1.):
+        assert isinstance(flush_every, int) and flush_every > 0
+
+        self.flush_every = flush_every
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.RLock()
+        self._pending = []  # Entries that were not yet written to the file.
+        self._offset = 0  # Position in the file, up to where we have read.
+        self._last_refresh = 0
+
+        super(SharedFileHistory, self).__init__(filename)
+
+    def _load(self):
+        self.refresh()
+
+    def _read_tail(self, f):
+        """
+        Read the entries that were added to the file since the last read.
+        (The caller should hold a lock on the file.)
+        """
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+
+        if size < self._offset:
+            # The file was truncated or replaced. Only read what is added
+            # from now on.
+            self._offset = size
+
+        elif size > self._offset:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+
+            # Only consume complete lines.
+            data = data[:data.rfind(b'\n') + 1]
+            self._offset += len(data)
 
-            write('\n# %s\n' % datetime.datetime.now())
-            for line in string.split('\n'):
-                write('+%s\n' % line)
+            self.strings.extend(_parse_history_file(io.BytesIO(data)))
+
+    def refresh(self):
+        """
+        Read the entries that were appended to the file by other processes.
+        """
+        with self._lock:
+            self._last_refresh = time.time()
+
+            try:
+                # Cheap check first, to avoid opening the file.
+                if os.path.getsize(self.filename) == self._offset:
+                    return
+
+                with open(self.filename, 'rb') as f:
+                    with _locked_file(f, exclusive=False):
+                        self._read_tail(f)
+            except (IOError, OSError):
+                pass  # File does not exist (yet).
+
+    def _maybe_refresh(self):
+        if time.time() - self._last_refresh >= self.refresh_interval:
+            self.refresh()
+
+    def append(self, string):
+        with self._lock:
+            self.strings.append(string)
+            self._pending.append(string)
+
+            if len(self._pending) >= self.flush_every:
+                self.flush()
+
+    def flush(self):
+        """
+        Write all the pending entries to the file.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+
+            with open(self.filename, 'a+b') as f:
+                with _locked_file(f, exclusive=True):
+                    # Take the entries of other processes first, so that we
+                    # won't read our own entries back afterwards.
+                    self._read_tail(f)
+
+                    f.seek(0, os.SEEK_END)
+                    for string in self._pending:
+                        f.write(_format_history_entry(string))
+                    f.flush()
+
+                    self._offset = f.tell()
+
+            self._pending = []
 
     def __getitem__(self, key):
+        self._maybe_refresh()
         return self.strings[key]
 
     def __iter__(self):
+        self._maybe_refresh()
         return iter(self.strings)
 
     def __len__(self):
+        self._maybe_refresh()
         return len(self.strings)
+
+
+def _parse_history_file(f):
+    """
+    Parse the lines of a history file. Yield the history entries.
+
+    :param f: File-like object that yields lines as bytes.
+    """
+    lines = []
+
+    for line in f:
+        line = line.decode('utf-8')
+
+        if line.startswith('+'):
+            lines.append(line[1:])
+        else:
+            if lines:
+                # Join and drop trailing newline.
+                yield ''.join(lines)[:-1]
+            lines = []
+
+    if lines:
+        yield ''.join(lines)[:-1]
+
+
+def _format_history_entry(string):
+    """
+    Return the bytes that represent this entry in a history file.
+    """
+    result = ['\n# %s\n' % datetime.datetime.now()]
+    for line in string.split('\n'):
+        result.append('+%s\n' % line)
+    return ''.join(result).encode('utf-8')
+
+
+@contextmanager
+def _locked_file(f, exclusive):
+    """
+    Hold an advisory lock on this file. (Does nothing when `fcntl` is not
+    available.)
+    """
+    if fcntl is None:
+        yield
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,192 @@
+"""
+Fuzzy search through the history, ranked by frecency.
+
+Entries are matched on character bigrams, so that a query matches even when
+the characters are not typed in exactly the same way as they appear in the
+history. Matches are ranked by a combination of how similar they are to the
+query and how often and how recently they were used.
+"""
+from __future__ import unicode_literals
+from six.moves import range
+
+from collections import defaultdict
+import heapq
+import math
+import threading
+
+from .history import History
+
+__all__ = (
+    'HistoryMatch',
+    'FuzzyHistorySearch',
+)
+
+
+class HistoryMatch(object):
+    """
+    Result returned by :meth:`.FuzzyHistorySearch.find`.
+
+    :param text: The history entry.
+    :param score: Rank of this match. (Higher is better.)
+    :param count: How many times this entry appears in the history.
+    """
+    def __init__(self, text, score, count):
+        self.text = text
+        self.score = score
+        self.count = count
+
+    def __repr__(self):
+        return '%s(%r, score=%r, count=%r)' % (
+            self.__class__.__name__, self.text, self.score, self.count)
+
+
+def _bigrams(text):
+    """
+    Return the set of lower case character bigrams in `text`. Every word is
+    padded with a space at the start, so that the first character of a word
+    forms a bigram as well.
+    """
+    result = set()
+    for word in text.lower().split():
+        word = ' ' + word
+        for i in range(len(word) - 1):
+            result.add(word[i:i + 2])
+    return result
+
+
+def _remove_old_occurrences(entry_ids):
+    " Keep only the last occurrence of every entry id in this list. "
+    seen = set()
+    result = []
+    for entry_id in reversed(entry_ids):
+        if entry_id not in seen:
+            seen.add(entry_id)
+            result.append(entry_id)
+    result.reverse()
+    return result
+
+
+class FuzzyHistorySearch(object):
+    """
+    Fuzzy search index over the entries of a
+    :class:`~prompt_toolkit.history.History`.
+
+    Identical entries are stored only once, together with how many times they
+    were entered and when they were entered for the last time. The index is
+    built on the first query, and catches up with new history entries after
+    that. (The history is append-only.)
+
+    :param history: :class:`~prompt_toolkit.history.History` instance.
+    :param min_similarity: Fraction of the query bigrams that an entry should
+        contain to be considered a match.
+    :param half_life: Amount of history entries after which the recency
+        weight of an entry is reduced by half.
+    :param max_postings: Maximum number of entries that are considered for
+        one bigram. For bigrams that appear in more entries (like the ones
+        in a short command that is used everywhere), only the most recently
+        used entries are considered.
+    """
+    def __init__(self, history, min_similarity=.5, half_life=1000, max_postings=10000):
+        assert isinstance(history, History)
+        assert 0 < min_similarity <= 1
+        assert isinstance(max_postings, int) and max_postings > 0
+
+        self.history = history
+        self.min_similarity = min_similarity
+        self.half_life = half_life
+        self.max_postings = max_postings
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._texts = []  # Entry id -> text.
+        self._counts = []  # Entry id -> number of uses.
+        self._last_used = []  # Entry id -> position in the history.
+        self._ids = {}  # Text -> entry id.
+        self._index = {}  # Bigram -> list of entry ids, least recently used first.
+        self._distinct = {}  # Bigram -> number of different entry ids in its list.
+        self._count = 0  # Number of history entries in the index.
+
+    def _update(self):
+        " Add the history entries that were appended since the last call. "
+        history = self.history
+        count = len(history)
+
+        # Rebuild when the history shrunk. (It was replaced or cleared.)
+        if count < self._count:
+            self._reset()
+
+        for i in range(self._count, count):
+            self._add(history[i], i)
+
+        self._count = count
+
+    def _add(self, text, position):
+        try:
+            entry_id = self._ids[text]
+        except KeyError:
+            entry_id = len(self._texts)
+            self._ids[text] = entry_id
+            self._texts.append(text)
+            self._counts.append(1)
+            self._last_used.append(position)
+
+            for bigram in _bigrams(text):
+                self._index.setdefault(bigram, []).append(entry_id)
+                self._distinct[bigram] = self._distinct.get(bigram, 0) + 1
+        else:
+            self._counts[entry_id] += 1
+            self._last_used[entry_id] = position
+
+            # Move the entry to the end of the posting lists. (The old
+            # occurrences are removed when a list has grown too much.)
+            for bigram in _bigrams(text):
+                postings = self._index[bigram]
+                if postings[-1] != entry_id:
+                    postings.append(entry_id)
+
+                    if len(postings) > 2 * self._distinct[bigram]:
+                        self._index[bigram] = _remove_old_occurrences(postings)
+
+    def _frecency(self, entry_id):
+        """
+        Weight of an entry, according to how often and how recently it was
+        used.
+        """
+        age = self._count - 1 - self._last_used[entry_id]
+        return (1 + math.log(self._counts[entry_id])) * .5 ** (float(age) / self.half_life)
+
+    def find(self, query, max_results=20):
+        """
+        Return a list of at most `max_results` :class:`.HistoryMatch`
+        instances, best match first.
+        """
+        with self._lock:
+            self._update()
+
+            query_bigrams = _bigrams(query)
+            if not query_bigrams:
+                return []
+
+            # Count for every entry how many of the query bigrams it contains,
+            # in one pass over the posting lists.
+            max_postings = self.max_postings
+            counts = defaultdict(int)
+
+            for bigram in query_bigrams:
+                postings = self._index.get(bigram)
+                if postings:
+                    for entry_id in set(postings[-max_postings:]):
+                        counts[entry_id] += 1
+
+            required = int(math.ceil(self.min_similarity * len(query_bigrams)))
+
+            def get_matches():
+                for entry_id, matched in counts.items():
+                    if matched >= required:
+                        similarity = float(matched) / len(query_bigrams)
+                        yield similarity * self._frecency(entry_id), entry_id
+
+            return [HistoryMatch(self._texts[entry_id], score, self._counts[entry_id])
+                    for score, entry_id in heapq.nlargest(max_results, get_matches())]
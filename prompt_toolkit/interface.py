@@ -14,6 +14,7 @@ import time
 import types
 import weakref
 
+from collections import deque
 from subprocess import Popen
 
 from .application import Application, AbortAction
@@ -106,10 +107,21 @@ class CommandLineInterface(object):
         #: rendering.
         self.render_counter = 0
 
+        #: Optional :class:`~prompt_toolkit.filters.RenderFilterCache`. When
+        #: set, filters that are evaluated while rendering and that declare
+        #: `pure_per_render` are called only once per rendering.
+        self.render_filter_cache = None
+
         #: When there is high CPU, postpone the renderering max x seconds.
         #: '0' means: don't postpone. '.5' means: try to draw at least twice a second.
         self.max_render_postpone_time = 0  # E.g. .5
 
+        #: When a completer is slow, show the completions that were already
+        #: found in batches, while the completer is still running. This is
+        #: the minimum amount of seconds between two batches. `None` means:
+        #: wait until all completions are known.
+        self.completion_batch_interval = .1
+
         # Invalidate flag. When 'True', a repaint has been scheduled.
         self._invalidated = False
 
@@ -355,7 +367,16 @@ class CommandLineInterface(object):
         # Only draw when no sub application was started.
         if self._is_running and self._sub_cli is None:
             self.render_counter += 1
-            self.renderer.render(self, self.layout, is_done=self.is_done)
+
+            cache = self.render_filter_cache
+            if cache is not None:
+                cache.begin(self.render_counter)
+
+            try:
+                self.renderer.render(self, self.layout, is_done=self.is_done)
+            finally:
+                if cache is not None:
+                    cache.end()
 
             # Fire render event.
             self.on_render.fire()
@@ -828,7 +849,9 @@ class CommandLineInterface(object):
         Create function for asynchronous autocompletion.
         (Autocomplete in other thread.)
         """
-        complete_thread_running = [False]  # By ref.
+        # (`CompleteEvent`, `Document`, task) of the running completion, or
+        # `None`. (The task is only set when `get_completions_async` is used.)
+        running_completion = [None]  # By ref.
 
         def completion_does_nothing(document, completion):
             """
@@ -845,82 +868,224 @@ class CommandLineInterface(object):
             document = buffer.document
             complete_event = complete_event or CompleteEvent(text_inserted=True)
 
-            # Don't start two threads at the same time.
-            if complete_thread_running[0]:
-                return
-
             # Don't complete when we already have completions.
             if buffer.complete_state or not buffer.completer:
                 return
 
-            # Otherwise, get completions in other thread.
-            complete_thread_running[0] = True
+            # Don't start two threads at the same time for the same input.
+            # When the input was changed, cancel the running completion.
+            if running_completion[0]:
+                running_event, running_document, running_task = running_completion[0]
+                if running_document.text == document.text and \
+                        running_document.cursor_position == document.cursor_position:
+                    return
+                running_event.cancel()
+                if running_task:
+                    running_task.cancel()
+                running_completion[0] = None
 
-            def run():
-                completions = list(buffer.completer.get_completions(document, complete_event))
-
-                def callback():
-                    """
-                    Set the new complete_state in a safe way. Don't replace an
-                    existing complete_state if we had one. (The user could have
-                    pressed 'Tab' in the meantime. Also don't set it if the text
-                    was changed in the meantime.
-                    """
-                    complete_thread_running[0] = False
-
-                    # When there is only one completion, which has nothing to add, ignore it.
-                    if (len(completions) == 1 and
-                            completion_does_nothing(document, completions[0])):
-                        del completions[:]
-
-                    # Set completions if the text was not yet changed.
+            # Otherwise, get completions in other thread.
+            running_completion[0] = (complete_event, document, None)
+
+            def done():
+                " Mark this completion as finished. "
+                if running_completion[0] and running_completion[0][0] is complete_event:
+                    running_completion[0] = None
+
+            # Completions that are shown while the completer is still running.
+            # (Only accessed from the event loop thread.)
+            streamed_completions = [None]  # By ref.
+            streaming_stopped = [False]  # By ref.
+
+            def stream_completions(batch):
+                """
+                Show a batch of completions while the completer is still
+                running. The menu is created for the first batch and extended
+                for the following ones, even when the user already selected one
+                of the completions.
+                """
+                if streaming_stopped[0] or complete_event.cancelled:
+                    return
+
+                if streamed_completions[0] is None:
                     if buffer.text == document.text and \
                             buffer.cursor_position == document.cursor_position and \
                             not buffer.complete_state:
+                        buffer.set_completions(
+                            completions=batch, go_to_first=select_first, go_to_last=False)
+                        streamed_completions[0] = buffer.complete_state.current_completions
+                        self.invalidate()
+                    else:
+                        streaming_stopped[0] = True
 
-                        set_completions = True
-                        select_first_anyway = False
+                elif buffer.complete_state and \
+                        buffer.complete_state.current_completions is streamed_completions[0]:
+                    streamed_completions[0].extend(batch)
+                    self.invalidate()
+                else:
+                    # The menu was closed, or the text changed.
+                    streaming_stopped[0] = True
+
+            # Streaming is not possible when the common part has to be
+            # inserted, when the last completion has to be selected or when the
+            # completions are sorted. For that, we need all the completions.
+            stream = (self.completion_batch_interval is not None and
+                      not insert_common_part and not select_last and
+                      buffer.completion_sort_key is None)
+
+            def show_completions(completions, hidden_count=0):
+                """
+                Set the new complete_state in a safe way. Don't replace an
+                existing complete_state if we had one. (The user could have
+                pressed 'Tab' in the meantime. Also don't set it if the text
+                was changed in the meantime.
+                """
+                done()
 
-                        # When the common part has to be inserted, and there
-                        # is a common part.
-                        if insert_common_part:
+                if complete_event.cancelled:
+                    return
+
+                # When there is only one completion, which has nothing to add, ignore it.
+                if (len(completions) == 1 and
+                        completion_does_nothing(document, completions[0])):
+                    del completions[:]
+
+                # Set completions if the text was not yet changed.
+                if buffer.text == document.text and \
+                        buffer.cursor_position == document.cursor_position and \
+                        not buffer.complete_state:
+
+                    set_completions = True
+                    select_first_anyway = False
+
+                    # When the common part has to be inserted, and there
+                    # is a common part.
+                    if insert_common_part:
+                        # (Not when some completions were left out. They
+                        # could have a shorter common part.)
+                        if hidden_count:
+                            common_part = ''
+                        else:
                             common_part = get_common_complete_suffix(document, completions)
-                            if common_part:
-                                # Insert the common part, update completions.
-                                buffer.insert_text(common_part)
-                                if len(completions) > 1:
-                                    # (Don't call `async_completer` again, but
-                                    # recalculate completions. See:
-                                    # https://github.com/ipython/ipython/issues/9658)
-                                    completions[:] = [
-                                        c.new_completion_from_position(len(common_part))
-                                        for c in completions]
-                                else:
-                                    set_completions = False
+                        if common_part:
+                            # Insert the common part, update completions.
+                            buffer.insert_text(common_part)
+                            if len(completions) > 1:
+                                # (Don't call `async_completer` again, but
+                                # recalculate completions. See:
+                                # https://github.com/ipython/ipython/issues/9658)
+                                completions[:] = [
+                                    c.new_completion_from_position(len(common_part))
+                                    for c in completions]
                             else:
-                                # When we were asked to insert the "common"
-                                # prefix, but there was no common suffix but
-                                # still exactly one match, then select the
-                                # first. (It could be that we have a completion
-                                # which does * expansion, like '*.py', with
-                                # exactly one match.)
-                                if len(completions) == 1:
-                                    select_first_anyway = True
-
-                        if set_completions:
-                            buffer.set_completions(
-                                completions=completions,
-                                go_to_first=select_first or select_first_anyway,
-                                go_to_last=select_last)
-                        self.invalidate()
-                    elif not buffer.complete_state:
-                        # Otherwise, restart thread.
-                        async_completer()
+                                set_completions = False
+                        else:
+                            # When we were asked to insert the "common"
+                            # prefix, but there was no common suffix but
+                            # still exactly one match, then select the
+                            # first. (It could be that we have a completion
+                            # which does * expansion, like '*.py', with
+                            # exactly one match.)
+                            if len(completions) == 1:
+                                select_first_anyway = True
+
+                    if set_completions:
+                        buffer.set_completions(
+                            completions=completions,
+                            go_to_first=select_first or select_first_anyway,
+                            go_to_last=select_last,
+                            hidden_count=hidden_count)
+                    self.invalidate()
+                elif not buffer.complete_state:
+                    # Otherwise, restart thread.
+                    async_completer()
+
+            def run():
+                # (Keeps at most `buffer.max_completions` completions.)
+                collector = buffer.create_completion_collector()
+                delivered = 0  # Number of completions passed to `stream_completions`.
+                last_delivery = time.time()
+
+                for c in buffer.completer.get_completions(document, complete_event):
+                    # Stop as soon as the result is no longer needed. (A new
+                    # completion was started for the changed input.)
+                    if complete_event.cancelled:
+                        return
+
+                    collector.add(c)
+
+                    if stream and time.time() - last_delivery >= self.completion_batch_interval:
+                        completions = collector.completions
+                        batch = completions[delivered:]
+                        delivered = len(completions)
+                        last_delivery = time.time()
+                        self.eventloop.call_from_executor(
+                            functools.partial(stream_completions, batch))
+
+                completions = collector.completions
+                hidden_count = collector.hidden_count
+
+                if delivered:
+                    # We already started streaming. Add the rest.
+                    remaining = completions[delivered:]
+
+                    def callback():
+                        done()
+
+                        if complete_event.cancelled:
+                            return
+
+                        if remaining:
+                            stream_completions(remaining)
+
+                        if hidden_count and not streaming_stopped[0] and \
+                                buffer.complete_state and \
+                                buffer.complete_state.current_completions is streamed_completions[0]:
+                            buffer.complete_state.hidden_count = hidden_count
+                            self.invalidate()
+
+                        if streaming_stopped[0]:
+                            # Restart when the text was changed in the meantime.
+                            if (buffer.text != document.text or
+                                    buffer.cursor_position != document.cursor_position) and \
+                                    not buffer.complete_state:
+                                async_completer()
+
+                        # When there is only one completion, which has nothing
+                        # to add, ignore it.
+                        elif (len(completions) == 1 and
+                                completion_does_nothing(document, completions[0]) and
+                                buffer.complete_state and
+                                buffer.complete_state.complete_index is None):
+                            buffer.complete_state = None
+                            self.invalidate()
+
+                    if self.eventloop:
+                        self.eventloop.call_from_executor(callback)
+                    return
 
                 if self.eventloop:
-                    self.eventloop.call_from_executor(callback)
+                    self.eventloop.call_from_executor(
+                        lambda: show_completions(completions, hidden_count))
+
+            # Use the coroutine of the completer when we run on asyncio.
+            get_completions_async = buffer.completer.get_completions_async
+
+            if get_completions_async is not None and self.eventloop.supports_coroutines:
+                task = self.eventloop.create_task(get_completions_async(document, complete_event))
+                running_completion[0] = (complete_event, document, task)
 
-            self.eventloop.run_in_executor(run)
+                def task_done(_):
+                    done()
+                    if not task.cancelled():
+                        collector = buffer.create_completion_collector()
+                        for c in task.result():
+                            collector.add(c)
+                        show_completions(collector.completions, collector.hidden_count)
+
+                task.add_done_callback(task_done)
+            else:
+                self.eventloop.run_in_executor(run, dropped_callback=done)
         return async_completer
 
     def _create_auto_suggest_function(self, buffer):
@@ -928,13 +1093,21 @@ class CommandLineInterface(object):
         Create function for asynchronous auto suggestion.
         (AutoSuggest in other thread.)
         """
-        suggest_thread_running = [False]  # By ref.
+        # `Document` of the running suggestion, or `None`.
+        running_suggestion = [None]  # By ref.
+
+        # Task of the running `get_suggestion_async` call, or `None`.
+        running_task = [None]  # By ref.
 
         def async_suggestor():
             document = buffer.document
 
-            # Don't start two threads at the same time.
-            if suggest_thread_running[0]:
+            # Don't start two threads at the same time for the same input.
+            # When the input was changed, the running suggestion becomes stale.
+            # Don't wait for it, but start a new one right away.
+            if running_suggestion[0] and \
+                    running_suggestion[0].text == document.text and \
+                    running_suggestion[0].cursor_position == document.cursor_position:
                 return
 
             # Don't suggest when we already have a suggestion.
@@ -942,29 +1115,59 @@ class CommandLineInterface(object):
                 return
 
             # Otherwise, get completions in other thread.
-            suggest_thread_running[0] = True
+            running_suggestion[0] = document
+
+            def show_suggestion(suggestion):
+                # Ignore the result when a newer suggestion was started.
+                if running_suggestion[0] is not document:
+                    return
+
+                running_suggestion[0] = None
+
+                # Set suggestion only if the text was not yet changed.
+                if buffer.text == document.text and \
+                        buffer.cursor_position == document.cursor_position:
+
+                    # Set suggestion and redraw interface.
+                    buffer.suggestion = suggestion
+                    self.invalidate()
+                else:
+                    # Otherwise, restart thread.
+                    async_suggestor()
+
+            def dropped():
+                " The executor didn't run `run`. "
+                if running_suggestion[0] is document:
+                    running_suggestion[0] = None
 
             def run():
                 suggestion = buffer.auto_suggest.get_suggestion(self, buffer, document)
 
-                def callback():
-                    suggest_thread_running[0] = False
+                if self.eventloop:
+                    self.eventloop.call_from_executor(lambda: show_suggestion(suggestion))
 
-                    # Set suggestion only if the text was not yet changed.
-                    if buffer.text == document.text and \
-                            buffer.cursor_position == document.cursor_position:
+            # Use the coroutine of the auto suggest when we run on asyncio.
+            # (A running task for an older input is cancelled.)
+            get_suggestion_async = buffer.auto_suggest.get_suggestion_async
 
-                        # Set suggestion and redraw interface.
-                        buffer.suggestion = suggestion
-                        self.invalidate()
-                    else:
-                        # Otherwise, restart thread.
-                        async_suggestor()
+            if running_task[0]:
+                running_task[0].cancel()
+                running_task[0] = None
 
-                if self.eventloop:
-                    self.eventloop.call_from_executor(callback)
+            if get_suggestion_async is not None and self.eventloop.supports_coroutines:
+                task = self.eventloop.create_task(get_suggestion_async(self, buffer, document))
+                running_task[0] = task
+
+                def task_done(_):
+                    if running_task[0] is task:
+                        running_task[0] = None
+
+                    if not task.cancelled():
+                        show_suggestion(task.result())
 
-            self.eventloop.run_in_executor(run)
+                task.add_done_callback(task_done)
+            else:
+                self.eventloop.run_in_executor(run, dropped_callback=dropped)
         return async_suggestor
 
     def stdout_proxy(self, raw=False):
@@ -1042,6 +1245,25 @@ class _InterfaceEventLoopCallbacks(EventLoopCallbacks):
             cli.input_processor.feed(key_press)
             cli.input_processor.process_keys()
 
+    def feed_keys(self, key_presses):
+        """
+        Feed a list of key presses to the CommandLineInterface. This does the
+        same as calling `feed_key` for each of them, but characters that are
+        typed after each other can be inserted at once. (In that case,
+        `beforeKeyPress` and `afterKeyPress` fire once for the whole run of
+        characters. See :meth:`.InputProcessor.process_key_presses`.)
+        """
+        key_presses = deque(key_presses)
+
+        while key_presses:
+            cli = self._active_cli
+
+            # (Like `feed_key`, ignore the key presses when the CLI is done.)
+            if cli.is_done:
+                key_presses.popleft()
+            else:
+                cli.input_processor.process_key_presses(key_presses)
+
 
 class _PatchStdoutContext(object):
     def __init__(self, new_stdout, patch_stdout=True, patch_stderr=True):
@@ -1171,8 +1393,8 @@ class _SubApplicationEventLoop(EventLoop):
     def close(self):
         pass
 
-    def run_in_executor(self, callback):
-        self.cli.eventloop.run_in_executor(callback)
+    def run_in_executor(self, callback, dropped_callback=None):
+        self.cli.eventloop.run_in_executor(callback, dropped_callback=dropped_callback)
 
     def call_from_executor(self, callback, _max_postpone_until=None):
         self.cli.eventloop.call_from_executor(
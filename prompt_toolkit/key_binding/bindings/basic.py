@@ -221,7 +221,9 @@ def load_basic_bindings():
 
         event.current_buffer.insert_text(data)
 
-    @handle(Keys.Any, filter=Condition(lambda cli: cli.quoted_insert), eager=True)
+    quoted_insert = Condition(lambda cli: cli.quoted_insert, changes_on_text_insert=False)
+
+    @handle(Keys.Any, filter=quoted_insert, eager=True)
     def _(event):
         """
         Handle quoted insert.
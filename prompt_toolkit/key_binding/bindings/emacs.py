@@ -117,7 +117,8 @@ def load_emacs_bindings():
         if event._arg is None:
             event.append_to_arg_count('-')
 
-    @handle('-', filter=Condition(lambda cli: cli.input_processor.arg == '-'))
+    @handle('-', filter=Condition(lambda cli: cli.input_processor.arg == '-',
+                                  changes_on_text_insert=False))
     def _(event):
         """
         When '-' is typed again, after exactly '-' has been given as an
@@ -345,7 +345,8 @@ def load_vi_bindings(get_search_state=None):
 
         # Swap case.
         (('g', '~'), Always(), lambda string: string.swapcase()),
-        (('~', ), Condition(lambda cli: cli.vi_state.tilde_operator), lambda string: string.swapcase()),
+        (('~', ), Condition(lambda cli: cli.vi_state.tilde_operator, changes_on_text_insert=False),
+         lambda string: string.swapcase()),
     ]
 
     # Insert a character literally (quoted insert).
@@ -571,11 +572,12 @@ def load_vi_bindings(get_search_state=None):
         event.current_buffer.cursor_position += \
             event.current_buffer.document.get_start_of_line_position(after_whitespace=True)
 
-    @Condition
     def in_block_selection(cli):
         buff = cli.current_buffer
         return buff.selection_state and buff.selection_state.type == SelectionType.BLOCK
 
+    in_block_selection = Condition(in_block_selection, changes_on_text_insert=False)
+
     @handle('I', filter=in_block_selection & ~IsReadOnly())
     def go_to_block_selection(event, after=False):
         " Insert in block selection mode. "
@@ -1675,9 +1677,9 @@ def load_vi_bindings(get_search_state=None):
         " Go into digraph mode. "
         event.cli.vi_state.waiting_for_digraph = True
 
-    @Condition
-    def digraph_symbol_1_given(cli):
-        return cli.vi_state.digraph_symbol1 is not None
+    digraph_symbol_1_given = Condition(
+        lambda cli: cli.vi_state.digraph_symbol1 is not None,
+        changes_on_text_insert=False)
 
     @handle(Keys.Any, filter=digraph_mode & ~digraph_symbol_1_given)
     def _(event):
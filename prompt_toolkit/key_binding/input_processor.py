@@ -9,6 +9,7 @@ correct callbacks when new key presses are feed through `feed`.
 from __future__ import unicode_literals
 from prompt_toolkit.buffer import EditReadOnlyBuffer
 from prompt_toolkit.filters.cli import ViNavigationMode
+from prompt_toolkit.filters.evaluation import FilterEvaluator
 from prompt_toolkit.keys import Keys, Key
 from prompt_toolkit.utils import Event
 
@@ -90,6 +91,16 @@ class InputProcessor(object):
         self.record_macro = False
         self.macro = []
 
+        #: :class:`~prompt_toolkit.filters.FilterEvaluator` for the key press
+        #: that is (or was last) processed. Every filter is called at most
+        #: once per key press, until a handler is called. Its `call_count` and
+        #: `calls` tell which filters were called for this key press.
+        self.filter_evaluator = FilterEvaluator(None)
+
+        # Cache for `_is_insert_safe`. (Cleared when the registry changes.)
+        self._insert_safe_keys = {}
+        self._insert_safe_version = None
+
         self.reset()
 
     def reset(self):
@@ -122,10 +133,10 @@ class InputProcessor(object):
         that would handle this.
         """
         keys = tuple(k.key for k in key_presses)
-        cli = self._cli_ref()
+        evaluator = self.filter_evaluator
 
         # Try match, with mode flag
-        return [b for b in self._registry.get_bindings_for_keys(keys) if b.filter(cli)]
+        return [b for b in self._registry.get_bindings_for_keys(keys) if evaluator(b.filter)]
 
     def _is_prefix_of_longer_match(self, key_presses):
         """
@@ -133,16 +144,15 @@ class InputProcessor(object):
         handler that is bound to a suffix of this keys.
         """
         keys = tuple(k.key for k in key_presses)
-        cli = self._cli_ref()
+        evaluator = self.filter_evaluator
 
-        # Get the filters for all the key bindings that have a longer match.
-        # Note that we transform it into a `set`, because we don't care about
-        # the actual bindings and executing it more than once doesn't make
-        # sense. (Many key bindings share the same filter.)
-        filters = set(b.filter for b in self._registry.get_bindings_starting_with_keys(keys))
-
-        # When any key binding is active, return True.
-        return any(f(cli) for f in filters)
+        # When any key binding is active, return True. (The evaluator
+        # doesn't execute a filter more than once. Many key bindings share the
+        # same filter.)
+        for b in self._registry.get_bindings_starting_with_keys(keys):
+            if evaluator(b.filter):
+                return True
+        return False
 
     def _process(self):
         """
@@ -165,7 +175,7 @@ class InputProcessor(object):
 
                 # When eager matches were found, give priority to them and also
                 # ignore all the longer matches.
-                eager_matches = [m for m in matches if m.eager(self._cli_ref())]
+                eager_matches = [m for m in matches if self.filter_evaluator(m.eager)]
 
                 if eager_matches:
                     matches = eager_matches
@@ -201,6 +211,13 @@ class InputProcessor(object):
         assert isinstance(key_press, KeyPress)
         self.input_queue.append(key_press)
 
+    def feed_multiple(self, key_presses):
+        """
+        Add a list of :class:`KeyPress` instances to the input queue.
+        """
+        assert all(isinstance(k, KeyPress) for k in key_presses)
+        self.input_queue.extend(key_presses)
+
     def process_keys(self):
         """
         Process all the keys in the `input_queue`.
@@ -212,9 +229,11 @@ class InputProcessor(object):
         """
         while self.input_queue:
             key_press = self.input_queue.popleft()
+            self.filter_evaluator = FilterEvaluator(self._cli_ref())
 
             if key_press.key != Keys.CPRResponse:
                 self.beforeKeyPress.fire()
+                self.filter_evaluator.clear()  # (The event handlers can change the state.)
 
             self._process_coroutine.send(key_press)
 
@@ -226,7 +245,151 @@ class InputProcessor(object):
         if cli:
             cli.invalidate()
 
-    def _call_handler(self, handler, key_sequence=None):
+    def process_key_presses(self, key_presses):
+        """
+        Process the first :class:`KeyPress` of the `key_presses` deque, like
+        `feed` followed by `process_keys` would do, and remove it from the
+        deque.
+
+        When it's a character that is handled by the `self-insert` command,
+        the characters that follow it in the deque and that are handled by the
+        same binding are inserted at once, and removed as well. This is only
+        done when none of the filters of the key bindings for these characters
+        can change by inserting text. (See
+        :attr:`~prompt_toolkit.filters.Filter.changes_on_text_insert`.)
+
+        Note that `beforeKeyPress` and `afterKeyPress` are fired once for such
+        a run of characters, not once for every key press like `process_keys`
+        does. Handlers of these events that count key presses, or that expect
+        to see the text after every character, see fewer events.
+        """
+        assert isinstance(key_presses, deque)
+
+        if not self._can_insert_at_once(key_presses):
+            self.feed(key_presses.popleft())
+            self.process_keys()
+            return
+
+        key_press = key_presses.popleft()
+        self.filter_evaluator = FilterEvaluator(self._cli_ref())
+
+        self.beforeKeyPress.fire()
+        self.filter_evaluator.clear()  # (The event handlers can change the state.)
+
+        binding = self._get_self_insert_binding(key_press)
+
+        if binding:
+            key_sequence = self._pop_characters(binding, key_press, key_presses)
+            text = ''.join(k.data for k in key_sequence)
+            self._call_handler(binding, key_sequence=key_sequence,
+                               call=lambda event: event.current_buffer.insert_text(text))
+        else:
+            self._process_coroutine.send(key_press)
+
+        self.afterKeyPress.fire()
+
+        # Process the keys that were fed from the handler. (And invalidate the
+        # user interface.)
+        self.process_keys()
+
+    def _can_insert_at_once(self, key_presses):
+        """
+        True when the first key presses of the deque are characters that could
+        be inserted at once.
+        """
+        if (len(key_presses) < 2 or self.input_queue or self.key_buffer or
+                self.arg is not None or
+                not self._is_character(key_presses[0]) or
+                not self._is_character(key_presses[1]) or
+                not self._is_insert_safe(key_presses[0].key)):
+            return False
+
+        # Inserting text removes the selection. And the `read_only` filter of
+        # the buffer is used by the filters of the input modes.
+        cli = self._cli_ref()
+        return bool(cli and cli.current_buffer.selection_state is None and
+                    not cli.current_buffer.read_only.changes_on_text_insert)
+
+    def _is_insert_safe(self, key):
+        """
+        True when none of the filters of the key bindings that could handle
+        `key` can change by inserting text.
+        """
+        version = self._registry._version
+
+        if version != self._insert_safe_version:
+            self._insert_safe_version = version
+            self._insert_safe_keys.clear()
+
+        try:
+            return self._insert_safe_keys[key]
+        except KeyError:
+            bindings = (self._registry.get_bindings_for_keys((key, )) +
+                        self._registry.get_bindings_starting_with_keys((key, )))
+
+            result = not any(b.filter.changes_on_text_insert or b.eager.changes_on_text_insert
+                             for b in bindings)
+
+            self._insert_safe_keys[key] = result
+            return result
+
+    def _get_self_insert_binding(self, key_press):
+        """
+        When `key_press` would be handled by the `self-insert` command, return
+        that binding. Otherwise, return `None`.
+        """
+        binding = self._get_binding_for_single_key(key_press)
+
+        # (Imported here, because the named commands import this module.)
+        from .bindings.named_commands import get_by_name
+
+        if binding and binding.handler is get_by_name('self-insert'):
+            return binding
+
+    @staticmethod
+    def _is_character(key_press):
+        return not isinstance(key_press.key, Key) and key_press.key == key_press.data
+
+    def _get_binding_for_single_key(self, key_press):
+        """
+        Return the binding that `_process` would call for this key press, or
+        `None` when it would wait for more keys or find nothing.
+        """
+        key_presses = [key_press]
+        matches = self._get_matches(key_presses)
+        eager_matches = [m for m in matches if self.filter_evaluator(m.eager)]
+
+        if eager_matches:
+            return eager_matches[-1]
+        elif matches and not self._is_prefix_of_longer_match(key_presses):
+            return matches[-1]
+
+    def _pop_characters(self, binding, key_press, key_presses):
+        """
+        Return a list of `key_press`, followed by the characters from the
+        `key_presses` deque that are handled by the same binding. (These are
+        removed from the deque.)
+        """
+        key_sequence = [key_press]
+        bindings = {key_press.key: binding}  # Maps key to binding.
+
+        while key_presses and self._is_character(key_presses[0]):
+            key = key_presses[0].key
+
+            if key not in bindings:
+                if self._is_insert_safe(key):
+                    bindings[key] = self._get_binding_for_single_key(key_presses[0])
+                else:
+                    bindings[key] = None
+
+            if bindings[key] is not binding:
+                break
+
+            key_sequence.append(key_presses.popleft())
+
+        return key_sequence
+
+    def _call_handler(self, handler, key_sequence=None, call=None):
         was_recording = self.record_macro
         arg = self.arg
         self.arg = None
@@ -244,7 +407,10 @@ class InputProcessor(object):
 
         # Call handler.
         try:
-            handler.call(event)
+            if call:
+                call(event)
+            else:
+                handler.call(event)
             self._fix_vi_cursor_position(event)
 
         except EditReadOnlyBuffer:
@@ -252,6 +418,9 @@ class InputProcessor(object):
             # read-only, we can just silently ignore that.
             pass
 
+        # The handler can change the state that the filters look at.
+        self.filter_evaluator.clear()
+
         self._previous_key_sequence = key_sequence
         self._previous_handler = handler
 
@@ -32,6 +32,8 @@ from prompt_toolkit.keys import Key, Keys
 
 from six import text_type, with_metaclass
 
+import weakref
+
 __all__ = (
     'BaseRegistry',
     'Registry',
@@ -83,6 +85,21 @@ class BaseRegistry(with_metaclass(ABCMeta, object)):
     # interface.
 
 
+class _TrieNode(object):
+    """
+    Node in the trie of key bindings. There is a node for every prefix of a
+    key sequence. `Keys.Any` is stored as a normal edge.
+    """
+    __slots__ = ('children', 'bindings', 'descendants')
+
+    def __init__(self):
+        self.children = {}  # Maps key to `_TrieNode`.
+
+        # (index, binding) tuples, ordered by index.
+        self.bindings = []  # Bindings for exactly this key sequence.
+        self.descendants = []  # Bindings for longer key sequences.
+
+
 class Registry(BaseRegistry):
     """
     Key binding registry.
@@ -93,11 +110,59 @@ class Registry(BaseRegistry):
         self._get_bindings_starting_with_keys_cache = SimpleCache(maxsize=1000)
         self._version = 0  # For cache invalidation.
 
+        # Trie of all the key bindings. (Updated on every change, so that
+        # lookups don't have to go through all the bindings.)
+        self._trie = _TrieNode()
+        self._indexed_count = 0  # Number of bindings in the trie.
+        self._next_index = 0
+
     def _clear_cache(self):
         self._version += 1
         self._get_bindings_for_keys_cache.clear()
         self._get_bindings_starting_with_keys_cache.clear()
 
+    def _index_binding(self, binding):
+        " Add binding to the trie. "
+        entry = (self._next_index, binding)
+        self._next_index += 1
+        self._indexed_count += 1
+
+        node = self._trie
+        for k in binding.keys:
+            node.descendants.append(entry)
+            node = node.children.setdefault(k, _TrieNode())
+        node.bindings.append(entry)
+
+    def _unindex_binding(self, binding):
+        " Remove binding from the trie. "
+        def remove(entries):
+            for i, (_, b) in enumerate(entries):
+                if b is binding:
+                    del entries[i]
+                    return
+
+        self._indexed_count -= 1
+
+        node = self._trie
+        for k in binding.keys:
+            remove(node.descendants)
+            node = node.children[k]
+        remove(node.bindings)
+
+    def _get_trie(self):
+        """
+        Return the trie. (It's rebuilt when `key_bindings` was modified
+        directly.)
+        """
+        if self._indexed_count != len(self.key_bindings):
+            self._trie = _TrieNode()
+            self._indexed_count = 0
+            for b in self.key_bindings:
+                self._index_binding(b)
+            self._clear_cache()
+
+        return self._trie
+
     def add_binding(self, *keys, **kwargs):
         """
         Decorator for annotating key bindings.
@@ -132,9 +197,11 @@ class Registry(BaseRegistry):
                 return func
         else:
             def decorator(func):
-                self.key_bindings.append(
-                    _Binding(keys, func, filter=filter, eager=eager,
-                             save_before=save_before))
+                binding = _Binding(keys, func, filter=filter, eager=eager,
+                                   save_before=save_before)
+                self._get_trie()
+                self.key_bindings.append(binding)
+                self._index_binding(binding)
                 self._clear_cache()
 
                 return func
@@ -152,7 +219,9 @@ class Registry(BaseRegistry):
 
         for b in self.key_bindings:
             if b.handler == function:
+                self._get_trie()
                 self.key_bindings.remove(b)
+                self._unindex_binding(b)
                 self._clear_cache()
                 return
 
@@ -169,26 +238,15 @@ class Registry(BaseRegistry):
         """
         def get():
             result = []
-            for b in self.key_bindings:
-                if len(keys) == len(b.keys):
-                    match = True
-                    any_count = 0
-
-                    for i, j in zip(b.keys, keys):
-                        if i != j and i != Keys.Any:
-                            match = False
-                            break
-
-                        if i == Keys.Any:
-                            any_count += 1
-
-                    if match:
-                        result.append((any_count, b))
+            for node, any_count in self._get_nodes(keys):
+                for index, b in node.bindings:
+                    result.append((-any_count, index, b))
 
             # Place bindings that have more 'Any' occurences in them at the end.
-            result = sorted(result, key=lambda item: -item[0])
+            # (Otherwise, keep the order in which they were added.)
+            result.sort(key=lambda item: item[:2])
 
-            return [item[1] for item in result]
+            return [item[2] for item in result]
 
         return self._get_bindings_for_keys_cache.get(keys, get)
 
@@ -202,36 +260,77 @@ class Registry(BaseRegistry):
         :param keys: tuple of keys.
         """
         def get():
-            result = []
-            for b in self.key_bindings:
-                if len(keys) < len(b.keys):
-                    match = True
-                    for i, j in zip(b.keys, keys):
-                        if i != j and i != Keys.Any:
-                            match = False
-                            break
-                    if match:
-                        result.append(b)
-            return result
+            # (Every binding is below at most one of these nodes.)
+            entries = []
+            for node, _ in self._get_nodes(keys):
+                entries.extend(node.descendants)
+
+            entries.sort(key=lambda item: item[0])
+            return [b for _, b in entries]
 
         return self._get_bindings_starting_with_keys_cache.get(keys, get)
 
+    def _get_nodes(self, keys):
+        """
+        Return the trie nodes for the key sequences that match `keys`, as
+        (node, any_count) tuples. `any_count` is the number of `Keys.Any`
+        edges that were taken.
+        """
+        nodes = [(self._get_trie(), 0)]
+
+        for k in keys:
+            next_nodes = []
+
+            for node, any_count in nodes:
+                if k != Keys.Any:
+                    child = node.children.get(k)
+                    if child is not None:
+                        next_nodes.append((child, any_count))
+
+                child = node.children.get(Keys.Any)
+                if child is not None:
+                    next_nodes.append((child, any_count + 1))
+
+            nodes = next_nodes
+
+        return nodes
+
 
 class _AddRemoveMixin(BaseRegistry):
     """
     Common part for ConditionalRegistry and MergedRegistry.
+
+    Lookups are passed to the trie of the underlying registries and the
+    results are combined. So, adding a binding to one of them doesn't require
+    rebuilding anything.
     """
     def __init__(self):
-        # `Registry` to be synchronized with all the others.
-        self._registry2 = Registry()
         self._last_version = None
+        self._key_bindings = None
+        self._get_bindings_for_keys_cache = SimpleCache(maxsize=10000)
+        self._get_bindings_starting_with_keys_cache = SimpleCache(maxsize=1000)
 
         # The 'extra' registry. Mostly for backwards compatibility.
         self._extra_registry = Registry()
 
-    def _update_cache(self):
+    def _get_registries(self):
+        " Return the list of underlying registries. "
         raise NotImplementedError
 
+    def _wrap_binding(self, binding):
+        " Return the binding as it appears in this registry. "
+        return binding
+
+    def _update_cache(self):
+        " If one of the underlying registries was changed. Clear our cache. "
+        expected_version = tuple(r._version for r in self._get_registries())
+
+        if self._last_version != expected_version:
+            self._key_bindings = None
+            self._get_bindings_for_keys_cache.clear()
+            self._get_bindings_starting_with_keys_cache.clear()
+            self._last_version = expected_version
+
     # For backwards, compatibility, we allow adding bindings to both
     # ConditionalRegistry and MergedRegistry. This is however not the
     # recommended way. Better is to create a new registry and merge them
@@ -243,25 +342,45 @@ class _AddRemoveMixin(BaseRegistry):
     def remove_binding(self, *k, **kw):
         return self._extra_registry.remove_binding(*k, **kw)
 
-    # Proxy methods to self._registry2.
-
     @property
     def key_bindings(self):
         self._update_cache()
-        return self._registry2.key_bindings
+
+        if self._key_bindings is None:
+            self._key_bindings = [
+                self._wrap_binding(b)
+                for r in self._get_registries() for b in r.key_bindings]
+
+        return self._key_bindings
 
     @property
     def _version(self):
         self._update_cache()
         return self._last_version
 
-    def get_bindings_for_keys(self, *a, **kw):
+    def get_bindings_for_keys(self, keys):
         self._update_cache()
-        return self._registry2.get_bindings_for_keys(*a, **kw)
 
-    def get_bindings_starting_with_keys(self, *a, **kw):
+        def get():
+            result = [
+                self._wrap_binding(b)
+                for r in self._get_registries() for b in r.get_bindings_for_keys(keys)]
+
+            # Place bindings that have more 'Any' occurences in them at the end.
+            # (Like `Registry` does. The sort is stable.)
+            return sorted(result, key=lambda b: -b.keys.count(Keys.Any))
+
+        return self._get_bindings_for_keys_cache.get(keys, get)
+
+    def get_bindings_starting_with_keys(self, keys):
         self._update_cache()
-        return self._registry2.get_bindings_starting_with_keys(*a, **kw)
+
+        def get():
+            return [
+                self._wrap_binding(b)
+                for r in self._get_registries() for b in r.get_bindings_starting_with_keys(keys)]
+
+        return self._get_bindings_starting_with_keys_cache.get(keys, get)
 
 
 class ConditionalRegistry(_AddRemoveMixin):
@@ -290,26 +409,26 @@ class ConditionalRegistry(_AddRemoveMixin):
         self.registry = registry
         self.filter = to_cli_filter(filter)
 
-    def _update_cache(self):
-        " If the original registry was changed. Update our copy version. "
-        expected_version = (self.registry._version, self._extra_registry._version)
-
-        if self._last_version != expected_version:
-            registry2 = Registry()
-
-            # Copy all bindings from `self.registry`, adding our condition.
-            for reg in (self.registry, self._extra_registry):
-                for b in reg.key_bindings:
-                    registry2.key_bindings.append(
-                        _Binding(
-                            keys=b.keys,
-                            handler=b.handler,
-                            filter=self.filter & b.filter,
-                            eager=b.eager,
-                            save_before=b.save_before))
-
-            self._registry2 = registry2
-            self._last_version = expected_version
+        # Maps the original bindings to the bindings with our condition.
+        self._wrapped_bindings = weakref.WeakKeyDictionary()
+
+    def _get_registries(self):
+        return [self.registry, self._extra_registry]
+
+    def _wrap_binding(self, binding):
+        " Return a copy of the binding, with our condition added. "
+        try:
+            return self._wrapped_bindings[binding]
+        except KeyError:
+            result = _Binding(
+                keys=binding.keys,
+                handler=binding.handler,
+                filter=self.filter & binding.filter,
+                eager=binding.eager,
+                save_before=binding.save_before)
+
+            self._wrapped_bindings[binding] = result
+            return result
 
 
 class MergedRegistry(_AddRemoveMixin):
@@ -328,23 +447,5 @@ class MergedRegistry(_AddRemoveMixin):
 
         self.registries = registries
 
-    def _update_cache(self):
-        """
-        If one of the original registries was changed. Update our merged
-        version.
-        """
-        expected_version = (
-            tuple(r._version for r in self.registries) +
-            (self._extra_registry._version, ))
-
-        if self._last_version != expected_version:
-            registry2 = Registry()
-
-            for reg in self.registries:
-                registry2.key_bindings.extend(reg.key_bindings)
-
-            # Copy all bindings from `self._extra_registry`.
-            registry2.key_bindings.extend(self._extra_registry.key_bindings)
-
-            self._registry2 = registry2
-            self._last_version = expected_version
+    def _get_registries(self):
+        return list(self.registries) + [self._extra_registry]
@@ -14,7 +14,7 @@ from .margins import Margin
 from .screen import Point, WritePosition, _CHAR_CACHE
 from .utils import token_list_to_text, explode_tokens
 from prompt_toolkit.cache import SimpleCache
-from prompt_toolkit.filters import to_cli_filter, ViInsertMode, EmacsInsertMode
+from prompt_toolkit.filters import to_cli_filter, evaluate_for_render, ViInsertMode, EmacsInsertMode
 from prompt_toolkit.mouse_events import MouseEvent, MouseEventType
 from prompt_toolkit.reactive import Integer
 from prompt_toolkit.token import Token
@@ -992,7 +992,7 @@ class Window(Container):
     def preferred_height(self, cli, width, max_available_height):
         total_margin_width = sum(self._get_margin_width(cli, m) for m in
                                  self.left_margins + self.right_margins)
-        wrap_lines = self.wrap_lines(cli)
+        wrap_lines = evaluate_for_render(self.wrap_lines, cli)
 
         return self._merge_dimensions(
             dimension=self._height(cli),
@@ -1070,7 +1070,7 @@ class Window(Container):
         assert isinstance(ui_content, UIContent)
 
         # Scroll content.
-        wrap_lines = self.wrap_lines(cli)
+        wrap_lines = evaluate_for_render(self.wrap_lines, cli)
         scroll_func = self._scroll_when_linewrapping if wrap_lines else self._scroll_without_linewrapping
 
         scroll_func(
@@ -1084,7 +1084,7 @@ class Window(Container):
             has_focus=self.content.has_focus(cli),
             wrap_lines=wrap_lines, highlight_lines=True,
             vertical_scroll_2=self.vertical_scroll_2,
-            always_hide_cursor=self.always_hide_cursor(cli))
+            always_hide_cursor=evaluate_for_render(self.always_hide_cursor, cli))
 
         # Remember render info. (Set before generating the margins. They need this.)
         x_offset=write_position.xpos + sum(left_margin_widths)
@@ -1374,7 +1374,7 @@ class Window(Container):
         data_buffer = new_screen.data_buffer
 
         # Highlight cursor line.
-        if self.cursorline(cli):
+        if evaluate_for_render(self.cursorline, cli):
             row = data_buffer[cpos.y]
             for x in range(x, x + width):
                 original_char = row[x]
@@ -1382,7 +1382,7 @@ class Window(Container):
                     original_char.char, original_char.token + cursor_line_token]
 
         # Highlight cursor column.
-        if self.cursorcolumn(cli):
+        if evaluate_for_render(self.cursorcolumn, cli):
             for y2 in range(y, y + height):
                 row = data_buffer[y2]
                 original_char = row[cpos.x]
@@ -1502,7 +1502,7 @@ class Window(Container):
         self.vertical_scroll = min(self.vertical_scroll, get_max_vertical_scroll())
 
         # Disallow scrolling beyond bottom?
-        if not self.allow_scroll_beyond_bottom(cli):
+        if not evaluate_for_render(self.allow_scroll_beyond_bottom, cli):
             self.vertical_scroll = min(self.vertical_scroll, topmost_visible)
 
     def _scroll_without_linewrapping(self, ui_content, width, height, cli):
@@ -1540,7 +1540,7 @@ class Window(Container):
                 current_scroll = 0
 
             # Scroll back if we scrolled to much and there's still space to show more of the document.
-            if (not self.allow_scroll_beyond_bottom(cli) and
+            if (not evaluate_for_render(self.allow_scroll_beyond_bottom, cli) and
                     current_scroll > content_size - window_size):
                 current_scroll = max(0, content_size - window_size)
 
@@ -1642,19 +1642,19 @@ class ConditionalContainer(Container):
         self.content.reset()
 
     def preferred_width(self, cli, max_available_width):
-        if self.filter(cli):
+        if evaluate_for_render(self.filter, cli):
             return self.content.preferred_width(cli, max_available_width)
         else:
             return LayoutDimension.exact(0)
 
     def preferred_height(self, cli, width, max_available_height):
-        if self.filter(cli):
+        if evaluate_for_render(self.filter, cli):
             return self.content.preferred_height(cli, width, max_available_height)
         else:
             return LayoutDimension.exact(0)
 
     def write_to_screen(self, cli, screen, mouse_handlers, write_position):
-        if self.filter(cli):
+        if evaluate_for_render(self.filter, cli):
             return self.content.write_to_screen(cli, screen, mouse_handlers, write_position)
 
     def walk(self, cli):
@@ -7,7 +7,7 @@ from abc import ABCMeta, abstractmethod
 from six import with_metaclass
 from six.moves import range
 
-from prompt_toolkit.filters import to_cli_filter
+from prompt_toolkit.filters import to_cli_filter, evaluate_for_render
 from prompt_toolkit.token import Token
 from prompt_toolkit.utils import get_cwidth
 from .utils import token_list_to_text
@@ -129,13 +129,13 @@ class ConditionalMargin(Margin):
         self.filter = to_cli_filter(filter)
 
     def get_width(self, cli, ui_content):
-        if self.filter(cli):
+        if evaluate_for_render(self.filter, cli):
             return self.margin.get_width(cli, ui_content)
         else:
             return 0
 
     def create_margin(self, cli, window_render_info, width, height):
-        if width and self.filter(cli):
+        if width and evaluate_for_render(self.filter, cli):
             return self.margin.create_margin(cli, window_render_info, width, height)
         else:
             return []
@@ -46,14 +46,20 @@ class CompletionsMenuControl(UIControl):
             menu_width = self._get_menu_width(500, complete_state)
             menu_meta_width = self._get_menu_meta_width(500, complete_state)
 
-            return menu_width + menu_meta_width
+            # Make room for the "more" line.
+            if complete_state.hidden_count:
+                more_width = get_cwidth(_get_more_text(complete_state)) + 2
+            else:
+                more_width = 0
+
+            return max(menu_width + menu_meta_width, more_width)
         else:
             return 0
 
     def preferred_height(self, cli, width, max_available_height, wrap_lines):
         complete_state = cli.current_buffer.complete_state
         if complete_state:
-            return len(complete_state.current_completions)
+            return len(complete_state.current_completions) + self._get_more_line_count(complete_state)
         else:
             return 0
 
@@ -72,6 +78,11 @@ class CompletionsMenuControl(UIControl):
             show_meta = self._show_meta(complete_state)
 
             def get_line(i):
+                if i == len(completions):
+                    more_width = get_cwidth(_get_more_text(complete_state)) + 2
+                    return _get_more_tokens(
+                        complete_state, max(menu_width + menu_meta_width, min(width, more_width)))
+
                 c = completions[i]
                 is_current_completion = (i == index)
                 result = self._get_menu_item_tokens(c, is_current_completion, menu_width)
@@ -82,11 +93,17 @@ class CompletionsMenuControl(UIControl):
 
             return UIContent(get_line=get_line,
                              cursor_position=Point(x=0, y=index or 0),
-                             line_count=len(completions),
+                             line_count=len(completions) + self._get_more_line_count(complete_state),
                              default_char=Char(' ', self.token))
 
         return UIContent()
 
+    def _get_more_line_count(self, complete_state):
+        """
+        Number of lines for the indicator of left out completions. (0 or 1.)
+        """
+        return 1 if complete_state.hidden_count else 0
+
     def _show_meta(self, complete_state):
         """
         Return ``True`` if we need to show a column with meta information.
@@ -118,7 +135,9 @@ class CompletionsMenuControl(UIControl):
 
         text, tw = _trim_text(completion.display, width - 2)
         padding = ' ' * (width - 2 - tw)
-        return [(token, ' %s%s ' % (text, padding))]
+        return ([(token, ' ')] +
+                _get_display_tokens(completion, text, token) +
+                [(token, '%s ' % padding)])
 
     def _get_menu_item_meta_tokens(self, completion, is_current_completion, width):
         if is_current_completion:
@@ -137,9 +156,10 @@ class CompletionsMenuControl(UIControl):
         b = cli.current_buffer
 
         if mouse_event.event_type == MouseEventType.MOUSE_UP:
-            # Select completion.
-            b.go_to_completion(mouse_event.position.y)
-            b.complete_state = None
+            # Select completion. (Not for the "more" line.)
+            if mouse_event.position.y < len(b.complete_state.current_completions):
+                b.go_to_completion(mouse_event.position.y)
+                b.complete_state = None
 
         elif mouse_event.event_type == MouseEventType.SCROLL_DOWN:
             # Scroll up.
@@ -178,6 +198,42 @@ def _trim_text(text, max_width):
         return text, width
 
 
+def _get_more_text(complete_state):
+    " Text that tells how many completions were left out. "
+    return '%i more...' % complete_state.hidden_count
+
+
+def _get_more_tokens(complete_state, width):
+    """
+    Tokens for the line that tells how many completions were left out.
+    """
+    text, tw = _trim_text(_get_more_text(complete_state), width - 2)
+    padding = ' ' * (width - 2 - tw)
+    return [(Token.Menu.Completions.More, ' %s%s ' % (text, padding))]
+
+
+def _get_display_tokens(completion, text, token):
+    """
+    Tokens for the (trimmed) display text of a completion. The characters at
+    the `highlighted_positions` of the completion get the `Match` token.
+    """
+    positions = completion.highlighted_positions
+
+    if not positions:
+        return [(token, text)]
+
+    positions = set(positions)
+
+    # Don't highlight the dots of trimmed text.
+    if text != completion.display:
+        visible = len(text) - 3
+    else:
+        visible = len(text)
+
+    return [(token.Match if i in positions and i < visible else token, c)
+            for i, c in enumerate(text)]
+
+
 class CompletionsMenu(ConditionalContainer):
     def __init__(self, max_height=None, scroll_offset=0, extra_filter=True, display_arrows=False):
         extra_filter = to_cli_filter(extra_filter)
@@ -258,6 +314,11 @@ class MultiColumnCompletionMenuControl(UIControl):
         # width.
         while result > column_width and result > max_available_width - self._required_margin:
             result -= column_width
+
+        # Make room for the "more" line.
+        if complete_state.hidden_count:
+            result = max(result, get_cwidth(_get_more_text(complete_state)) + 2 - self._required_margin)
+
         return result + self._required_margin
 
     def preferred_height(self, cli, width, max_available_height, wrap_lines):
@@ -268,7 +329,8 @@ class MultiColumnCompletionMenuControl(UIControl):
         column_width = self._get_column_width(complete_state)
         column_count = max(1, (width - self._required_margin) // column_width)
 
-        return int(math.ceil(len(complete_state.current_completions) / float(column_count)))
+        return (int(math.ceil(len(complete_state.current_completions) / float(column_count))) +
+                (1 if complete_state.hidden_count else 0))
 
     def create_content(self, cli, width, height):
         """
@@ -292,6 +354,12 @@ class MultiColumnCompletionMenuControl(UIControl):
         HORIZONTAL_MARGIN_REQUIRED = 3
 
         if complete_state:
+            # Keep the last line for telling how many completions were left
+            # out. (When there is room for it.)
+            show_more = bool(complete_state.hidden_count) and height > 1
+            if show_more:
+                height -= 1
+
             # There should be at least one column, but it cannot be wider than
             # the available width.
             column_width = min(width - HORIZONTAL_MARGIN_REQUIRED, column_width)
@@ -347,6 +415,12 @@ class MultiColumnCompletionMenuControl(UIControl):
                 # Newline.
                 tokens_for_line.append(tokens)
 
+            if show_more:
+                more_width = get_cwidth(_get_more_text(complete_state)) + 2
+                tokens_for_line.append(_get_more_tokens(complete_state, max(
+                    column_width * visible_columns + render_left_arrow + render_right_arrow + 1,
+                    min(width, more_width))))
+
         else:
             tokens = []
 
@@ -360,7 +434,7 @@ class MultiColumnCompletionMenuControl(UIControl):
         def get_line(i):
             return tokens_for_line[i]
 
-        return UIContent(get_line=get_line, line_count=len(rows_))
+        return UIContent(get_line=get_line, line_count=len(tokens_for_line))
 
     def _get_column_width(self, complete_state):
         """
@@ -377,7 +451,9 @@ class MultiColumnCompletionMenuControl(UIControl):
         text, tw = _trim_text(completion.display, width)
         padding = ' ' * (width - tw - 1)
 
-        return [(token, ' %s%s' % (text, padding))]
+        return ([(token, ' ')] +
+                _get_display_tokens(completion, text, token) +
+                [(token, padding)])
 
     def mouse_handler(self, cli, mouse_event):
         """
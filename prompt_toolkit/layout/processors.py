@@ -13,7 +13,7 @@ from six.moves import range
 from prompt_toolkit.cache import SimpleCache
 from prompt_toolkit.document import Document
 from prompt_toolkit.enums import SEARCH_BUFFER
-from prompt_toolkit.filters import to_cli_filter, ViInsertMultipleMode
+from prompt_toolkit.filters import to_cli_filter, evaluate_for_render, ViInsertMultipleMode
 from prompt_toolkit.layout.utils import token_list_to_text
 from prompt_toolkit.reactive import Integer
 from prompt_toolkit.token import Token
@@ -588,14 +588,14 @@ class ConditionalProcessor(Processor):
 
     def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
         # Run processor when enabled.
-        if self.filter(cli):
+        if evaluate_for_render(self.filter, cli):
             return self.processor.apply_transformation(
                 cli, document, lineno, source_to_display, tokens)
         else:
             return Transformation(tokens)
 
     def has_focus(self, cli):
-        if self.filter(cli):
+        if evaluate_for_render(self.filter, cli):
             return self.processor.has_focus(cli)
         else:
             return False
@@ -69,9 +69,12 @@ DEFAULT_STYLE_EXTENSIONS = {
     Token.Menu.Completions:                       'bg:#bbbbbb #000000',
     Token.Menu.Completions.Completion:            '',
     Token.Menu.Completions.Completion.Current:    'bg:#888888 #ffffff',
+    Token.Menu.Completions.Completion.Match:      '#0000aa',
+    Token.Menu.Completions.Completion.Current.Match: 'bold',
     Token.Menu.Completions.Meta:                  'bg:#999999 #000000',
     Token.Menu.Completions.Meta.Current:          'bg:#aaaaaa #000000',
     Token.Menu.Completions.MultiColumnMeta:       'bg:#aaaaaa #000000',
+    Token.Menu.Completions.More:                  'bg:#999999 #000000 italic',
 
     # Scrollbars.
     Token.Scrollbar:                              'bg:#888888',
@@ -217,6 +217,32 @@ class _IsPrefixOfLongerMatchCache(dict):
 _IS_PREFIX_OF_LONGER_MATCH_CACHE = _IsPrefixOfLongerMatchCache()
 
 
+# (Size of `ANSI_SEQUENCES`, regex) for `_get_plain_text_re`.
+_plain_text_re = (None, None)
+
+
+def _get_plain_text_re():
+    """
+    Return a regex that matches a run of characters that are not the start of
+    any escape sequence or control key. (Every such character is a key press
+    of its own, so a run of them can be handled at once.) This is created
+    again when the size of `ANSI_SEQUENCES` changed, so that sequences can
+    still be added after the first input was parsed.
+    """
+    global _plain_text_re
+
+    size, regex = _plain_text_re
+
+    if size != len(ANSI_SEQUENCES):
+        special = set(k[0] for k in ANSI_SEQUENCES)
+        special.update(['\x1b', '\r'])  # (CPR/mouse responses and '\r'.)
+        regex = re.compile(
+            '[^%s]+' % ''.join(re.escape(c) for c in sorted(special)))
+        _plain_text_re = (len(ANSI_SEQUENCES), regex)
+
+    return regex
+
+
 class InputStream(object):
     """
     Parser for VT100 input stream.
@@ -232,14 +258,24 @@ class InputStream(object):
         i.feed('data\x01...')
 
     :attr input_processor: :class:`~prompt_toolkit.key_binding.InputProcessor` instance.
+
+    :param feed_key_callback: Called for every key press.
+    :param feed_keys_callback: (Optional.) When given, this is called instead
+        with a list of all the key presses of one `feed` or `flush` call.
     """
     # Lookup table of ANSI escape sequences for a VT100 terminal
     # Hint: in order to know what sequences your terminal writes to stdin, run
     #       "od -c" and start typing.
-    def __init__(self, feed_key_callback):
+    def __init__(self, feed_key_callback, feed_keys_callback=None):
         assert callable(feed_key_callback)
+        assert feed_keys_callback is None or callable(feed_keys_callback)
 
         self.feed_key_callback = feed_key_callback
+        self.feed_keys_callback = feed_keys_callback
+
+        # Key presses of the current `feed` call.
+        self._key_presses = []
+
         self.reset()
 
         if _DEBUG_RENDERER_INPUT:
@@ -247,14 +283,9 @@ class InputStream(object):
 
     def reset(self, request=False):
         self._in_bracketed_paste = False
-        self._start_parser()
 
-    def _start_parser(self):
-        """
-        Start the parser coroutine.
-        """
-        self._input_parser = self._input_parser_generator()
-        self._input_parser.send(None)
+        # Received characters that could be the start of a longer sequence.
+        self._prefix = ''
 
     def _get_match(self, prefix):
         """
@@ -263,11 +294,12 @@ class InputStream(object):
         # (hard coded) If we match a CPR response, return Keys.CPRResponse.
         # (This one doesn't fit in the ANSI_SEQUENCES, because it contains
         # integer variables.)
-        if _cpr_response_re.match(prefix):
-            return Keys.CPRResponse
+        if prefix.startswith('\x1b['):  # (Both regexes require this.)
+            if _cpr_response_re.match(prefix):
+                return Keys.CPRResponse
 
-        elif _mouse_event_re.match(prefix):
-            return Keys.Vt100MouseEvent
+            elif _mouse_event_re.match(prefix):
+                return Keys.Vt100MouseEvent
 
         # Otherwise, use the mappings.
         try:
@@ -275,27 +307,21 @@ class InputStream(object):
         except KeyError:
             return None
 
-    def _input_parser_generator(self):
+    def _parse(self, c):
         """
-        Coroutine (state machine) for the input parser.
+        State machine for the input parser. Handle the next character, or
+        `_Flush`.
         """
-        prefix = ''
-        retry = False
+        prefix = self._prefix
         flush = False
 
-        while True:
-            flush = False
-
-            if retry:
-                retry = False
-            else:
-                # Get next character.
-                c = yield
+        if c == _Flush:
+            flush = True
+        else:
+            prefix += c
 
-                if c == _Flush:
-                    flush = True
-                else:
-                    prefix += c
+        while True:
+            retry = False
 
             # If we have some data, check for matches.
             if prefix:
@@ -325,6 +351,13 @@ class InputStream(object):
                         self._call_handler(prefix[0], prefix[0])
                         prefix = prefix[1:]
 
+            if not retry:
+                break
+
+            flush = False
+
+        self._prefix = prefix
+
     def _call_handler(self, key, insert_text):
         """
         Callback to handler.
@@ -337,7 +370,7 @@ class InputStream(object):
                 self._in_bracketed_paste = True
                 self._paste_buffer = ''
             else:
-                self.feed_key_callback(KeyPress(key, insert_text))
+                self._key_presses.append(KeyPress(key, insert_text))
 
     def feed(self, data):
         """
@@ -351,6 +384,21 @@ class InputStream(object):
             self.LOG.write(repr(data).encode('utf-8') + b'\n')
             self.LOG.flush()
 
+        self._feed(data)
+        self._send_key_presses()
+
+    def _send_key_presses(self):
+        " Pass the collected key presses to the callback. "
+        key_presses, self._key_presses = self._key_presses, []
+
+        if self.feed_keys_callback:
+            if key_presses:
+                self.feed_keys_callback(key_presses)
+        else:
+            for k in key_presses:
+                self.feed_key_callback(k)
+
+    def _feed(self, data):
         # Handle bracketed paste. (We bypass the parser that matches all other
         # key presses and keep reading input until we see the end mark.)
         # This is much faster then parsing character by character.
@@ -363,24 +411,40 @@ class InputStream(object):
 
                 # Feed content to key bindings.
                 paste_content = self._paste_buffer[:end_index]
-                self.feed_key_callback(KeyPress(Keys.BracketedPaste, paste_content))
+                self._key_presses.append(KeyPress(Keys.BracketedPaste, paste_content))
 
                 # Quit bracketed paste mode and handle remaining input.
                 self._in_bracketed_paste = False
                 remaining = self._paste_buffer[end_index + len(end_mark):]
                 self._paste_buffer = ''
 
-                self.feed(remaining)
+                self._feed(remaining)
 
         # Handle normal input character by character.
         else:
-            for i, c in enumerate(data):
+            plain_text_match = _get_plain_text_re().match
+            i = 0
+
+            while i < len(data):
                 if self._in_bracketed_paste:
                     # Quit loop and process from this position when the parser
                     # entered bracketed paste.
-                    self.feed(data[i:])
+                    self._feed(data[i:])
                     break
+
+                # Runs of plain text (not in the middle of an escape sequence)
+                # are turned into key presses without going through the
+                # parser.
+                m = None if self._prefix else plain_text_match(data, i)
+
+                if m:
+                    for c in m.group(0):
+                        self._key_presses.append(KeyPress(c, c))
+                    i = m.end()
                 else:
+                    c = data[i]
+                    i += 1
+
                     # Replace \r by \n. (Some clients send \r instead of \n
                     # when enter is pressed. E.g. telnet and some other
                     # terminals.)
@@ -395,7 +459,7 @@ class InputStream(object):
                     #      Enter=ControlM in keys.py.
                     if c == '\r':
                         c = '\n'
-                    self._input_parser.send(c)
+                    self._parse(c)
 
     def flush(self):
         """
@@ -409,7 +473,8 @@ class InputStream(object):
         timeout, and processes everything that's still in the buffer as-is, so
         without assuming any characters will folow.
         """
-        self._input_parser.send(_Flush)
+        self._parse(_Flush)
+        self._send_key_presses()
 
     def feed_and_flush(self, data):
         """
@@ -46,6 +46,13 @@ class Validator(with_metaclass(ABCMeta, object)):
         """
         pass
 
+    #: Optional coroutine method. It takes the same arguments as
+    #: :meth:`validate`, and raises :class:`.ValidationError` when the input
+    #: is invalid. When the interface runs on an asyncio event loop, this is
+    #: used for validating the input before accepting it. (See
+    #: :meth:`.Buffer.validate_and_call`.)
+    validate_async = None
+
 
 class ConditionalValidator(Validator):
     """
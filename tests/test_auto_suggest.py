@@ -0,0 +1,58 @@
+from __future__ import unicode_literals
+
+from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.document import Document
+from prompt_toolkit.history import InMemoryHistory
+
+import random
+
+
+def _suggest(auto_suggest, buffer, text):
+    suggestion = auto_suggest.get_suggestion(None, buffer, Document(text))
+    return suggestion.text if suggestion else None
+
+
+def _linear_suggest(history, text):
+    " The reference implementation: a linear scan through the history. "
+    for string in reversed(list(history)):
+        for line in reversed(string.splitlines()):
+            if line.startswith(text):
+                return line[len(text):]
+
+
+def test_auto_suggest_from_history():
+    history = InMemoryHistory()
+    history.append('import os')
+    history.append('import sys\nprint(sys.path)')
+    history.append('ls -l')
+
+    buffer = Buffer(history=history)
+    auto_suggest = AutoSuggestFromHistory()
+
+    assert _suggest(auto_suggest, buffer, 'imp') == 'ort sys'
+    assert _suggest(auto_suggest, buffer, 'import o') == 's'
+    assert _suggest(auto_suggest, buffer, 'pri') == 'nt(sys.path)'
+    assert _suggest(auto_suggest, buffer, 'ls -l') == ''
+    assert _suggest(auto_suggest, buffer, 'x') is None
+    assert _suggest(auto_suggest, buffer, '   ') is None
+
+    # Entries appended later are picked up.
+    history.append('import os.path')
+    assert _suggest(auto_suggest, buffer, 'imp') == 'ort os.path'
+    assert _suggest(auto_suggest, buffer, 'import s') == 'ys'
+
+
+def test_auto_suggest_from_history_matches_linear_scan():
+    r = random.Random(0)
+    history = InMemoryHistory()
+    buffer = Buffer(history=history)
+    auto_suggest = AutoSuggestFromHistory()
+
+    for i in range(300):
+        history.append('\n'.join(
+            ''.join(r.choice('abc') for _ in range(r.randint(0, 6)))
+            for _ in range(r.randint(1, 2))))
+
+        prefix = ''.join(r.choice('abc') for _ in range(r.randint(1, 4)))
+        assert _suggest(auto_suggest, buffer, prefix) == _linear_suggest(history, prefix)
@@ -1,6 +1,9 @@
 from __future__ import unicode_literals
 
 from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.enums import IncrementalSearchDirection
+from prompt_toolkit.history import InMemoryHistory
+from prompt_toolkit.search_state import SearchState
 
 import pytest
 
@@ -109,3 +112,115 @@ def test_swap_characters_before_cursor(_buffer):
     _buffer.swap_characters_before_cursor()
 
     assert _buffer.text == 'hello wrold'
+
+
+def _history_buffer(*strings):
+    history = InMemoryHistory()
+    for s in strings:
+        history.append(s)
+    return Buffer(history=history)
+
+
+def test_search_history_backward():
+    buffer = _history_buffer('echo hello', 'ls -l', 'echo world\necho again', 'pwd')
+    buffer.insert_text('cat')
+
+    state = SearchState('echo', direction=IncrementalSearchDirection.BACKWARD)
+    buffer.apply_search(state, include_current_position=True)
+    assert buffer.working_index == 2
+    assert buffer.cursor_position == len('echo world\n')
+
+    buffer.apply_search(state, include_current_position=True)
+    assert buffer.working_index == 2
+    assert buffer.cursor_position == 0
+
+    buffer.apply_search(state, include_current_position=True)
+    assert buffer.working_index == 0
+    assert buffer.cursor_position == 0
+
+    # Nothing found.
+    buffer.apply_search(SearchState('xyz', direction=IncrementalSearchDirection.BACKWARD))
+    assert buffer.working_index == 0
+
+
+def test_search_history_forward():
+    buffer = _history_buffer('ECHO a', 'ls', 'echo b', 'pwd')
+    buffer.go_to_history(0)
+    buffer.cursor_position = 0
+
+    state = SearchState('echo', direction=IncrementalSearchDirection.FORWARD)
+    buffer.apply_search(state, include_current_position=False)
+    assert buffer.working_index == 2
+    assert buffer.cursor_position == 0
+
+    # Wrap around to the first entry, ignoring case.
+    state = SearchState('echo', ignore_case=True)
+    buffer.apply_search(state, include_current_position=False)
+    assert buffer.working_index == 0
+    assert buffer.cursor_position == 0
+
+
+def test_search_history_after_edit():
+    buffer = _history_buffer('abc', 'def')
+    state = SearchState('xyz', direction=IncrementalSearchDirection.BACKWARD)
+    assert buffer.document_for_search(state).text == ''
+
+    # Editing a working line should be taken into account.
+    buffer.go_to_history(0)
+    buffer.text = 'xyz'
+    buffer.go_to_history(2)
+    assert buffer.document_for_search(state).text == 'xyz'
+
+
+def test_history_search_with_prefix():
+    history = InMemoryHistory()
+    for s in ['git status', 'ls', 'git log', 'pwd', 'git diff']:
+        history.append(s)
+    buffer = Buffer(history=history, enable_history_search=True)
+    buffer.insert_text('git')
+
+    buffer.history_backward()
+    assert buffer.text == 'git diff'
+    buffer.history_backward(count=2)
+    assert buffer.text == 'git status'
+
+    # Nothing older matches.
+    buffer.history_backward()
+    assert buffer.text == 'git status'
+
+    buffer.history_forward()
+    assert buffer.text == 'git log'
+    buffer.history_forward(count=10)
+    assert buffer.text == 'git'
+
+
+def test_working_lines_index_after_edit():
+    history = InMemoryHistory()
+    for s in ['git status', 'ls', 'git log']:
+        history.append(s)
+    buffer = Buffer(history=history, enable_history_search=True)
+    buffer.insert_text('git')
+    buffer.history_backward()
+    index = buffer._working_lines_index
+
+    # Editing a line doesn't rebuild the index, but the edited lines are
+    # found.
+    buffer.text = 'git push'
+    buffer.go_to_history(1)
+    buffer.text = 'git add'
+    buffer.go_to_history(3)
+    buffer.text = 'git'
+    assert buffer._working_lines_index is index
+
+    buffer.history_search_text = None
+    buffer.history_backward()
+    assert buffer.text == 'git push'
+    buffer.history_backward()
+    assert buffer.text == 'git add'
+    buffer.history_backward()
+    assert buffer.text == 'git status'
+
+    state = SearchState('add', direction=IncrementalSearchDirection.BACKWARD)
+    buffer.go_to_history(3)
+    assert buffer.document_for_search(state).text == 'git add'
+    assert buffer._working_lines_index is index
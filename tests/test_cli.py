@@ -7,17 +7,30 @@ from __future__ import unicode_literals
 from prompt_toolkit.application import Application
 from prompt_toolkit.buffer import Buffer, AcceptAction
 from prompt_toolkit.clipboard import InMemoryClipboard, ClipboardData
+from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.enums import DEFAULT_BUFFER, EditingMode
 from prompt_toolkit.eventloop.posix import PosixEventLoop
 from prompt_toolkit.history import InMemoryHistory
 from prompt_toolkit.input import PipeInput
 from prompt_toolkit.interface import CommandLineInterface
+from prompt_toolkit.key_binding.input_processor import KeyPress
 from prompt_toolkit.key_binding.manager import KeyBindingManager
+from prompt_toolkit.keys import Keys
+from prompt_toolkit.layout.menus import CompletionsMenuControl, MultiColumnCompletionMenuControl
+from prompt_toolkit.token import Token
 from prompt_toolkit.output import DummyOutput
+from prompt_toolkit.validation import Validator, ValidationError
 from prompt_toolkit.terminal.vt100_input import ANSI_SEQUENCES
+from prompt_toolkit.filters import Condition
 from functools import partial
+import threading
 import pytest
 
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
 
 def _history():
     h = InMemoryHistory()
@@ -627,3 +640,349 @@ def test_vi_character_paste():
     result, cli = feed('abcde\x1bhhxP\n')
     assert result.text == 'abcde'
     assert result.cursor_position == 2
+
+
+class _ManualEventLoop(PosixEventLoop):
+    """
+    Event loop that runs executor tasks synchronously and collects the
+    callbacks, so that tests can run them one by one.
+    """
+    def __init__(self):
+        super(_ManualEventLoop, self).__init__()
+        self.calls = []
+
+    def run_in_executor(self, callback, dropped_callback=None):
+        callback()
+
+    def call_from_executor(self, callback, _max_postpone_until=None):
+        self.calls.append(callback)
+
+    def run_calls(self, count=None):
+        calls, self.calls = self.calls[:count], self.calls[count:]
+        for c in calls:
+            c()
+
+
+def _create_cli_with_completer(completer, loop):
+    return CommandLineInterface(
+        application=Application(
+            buffer=Buffer(completer=completer, complete_while_typing=True),
+            key_bindings_registry=KeyBindingManager.for_prompt().registry),
+        eventloop=loop,
+        input=PipeInput(),
+        output=DummyOutput())
+
+
+class _ListCompleter(Completer):
+    def __init__(self, words):
+        self.words = words
+
+    def get_completions(self, document, complete_event):
+        word = document.get_word_before_cursor()
+        for w in self.words:
+            if w.startswith(word):
+                yield Completion(w, -len(word))
+
+
+def test_streaming_completions():
+    loop = _ManualEventLoop()
+    cli = _create_cli_with_completer(_ListCompleter(['abc', 'abd', 'abe']), loop)
+    cli.completion_batch_interval = 0
+    buffer = cli.current_buffer
+
+    buffer.insert_text('ab')
+
+    # Completions are delivered one by one.
+    loop.run_calls(1)
+    assert [c.text for c in buffer.complete_state.current_completions] == ['abc']
+
+    # The user can select a completion in the meantime.
+    buffer.complete_next()
+    assert buffer.text == 'abc'
+
+    loop.run_calls()
+    assert [c.text for c in buffer.complete_state.current_completions] == ['abc', 'abd', 'abe']
+    assert buffer.text == 'abc'
+
+
+def test_completions_without_streaming():
+    loop = _ManualEventLoop()
+    cli = _create_cli_with_completer(_ListCompleter(['abc', 'abd', 'abe']), loop)
+    cli.completion_batch_interval = None
+    buffer = cli.current_buffer
+
+    buffer.insert_text('ab')
+    assert len(loop.calls) == 1
+
+    loop.run_calls()
+    assert [c.text for c in buffer.complete_state.current_completions] == ['abc', 'abd', 'abe']
+
+
+def test_dropped_completion():
+    class DroppingEventLoop(_ManualEventLoop):
+        " Drop the first executor task, like a full executor queue would. "
+        dropped = False
+
+        def run_in_executor(self, callback, dropped_callback=None):
+            if self.dropped:
+                callback()
+            else:
+                self.dropped = True
+                dropped_callback()
+
+    loop = DroppingEventLoop()
+    cli = _create_cli_with_completer(_ListCompleter(['abc', 'abd']), loop)
+    cli.completion_batch_interval = None
+    buffer = cli.current_buffer
+
+    buffer.insert_text('ab')
+    assert loop.calls == []
+
+    # The completion for the same input can be started again.
+    cli.start_completion()
+    loop.run_calls()
+    assert [c.text for c in buffer.complete_state.current_completions] == ['abc', 'abd']
+
+
+class _ThreadedEventLoop(_ManualEventLoop):
+    " Like `_ManualEventLoop`, but run executor tasks in threads. "
+    def __init__(self):
+        super(_ThreadedEventLoop, self).__init__()
+        self.threads = []
+
+    def run_in_executor(self, callback, dropped_callback=None):
+        t = threading.Thread(target=callback)
+        t.start()
+        self.threads.append(t)
+
+    def join(self):
+        for t in self.threads:
+            t.join()
+
+
+def test_cancel_stale_completions():
+    release = threading.Event()
+    consumed = []
+
+    class SlowCompleter(Completer):
+        def get_completions(self, document, complete_event):
+            for w in ['abc', 'abd', 'abe']:
+                if document.text == 'a':
+                    release.wait()
+                consumed.append((document.text, w))
+                yield Completion(w, -len(document.text))
+
+    loop = _ThreadedEventLoop()
+    cli = _create_cli_with_completer(SlowCompleter(), loop)
+    cli.completion_batch_interval = None
+    buffer = cli.current_buffer
+
+    buffer.insert_text('a')
+    buffer.insert_text('b')  # Cancels the completion of 'a'.
+    release.set()
+    loop.join()
+    loop.run_calls()
+
+    assert [w for text, w in consumed if text == 'a'] == ['abc']
+    assert [c.text for c in buffer.complete_state.current_completions] == ['abc', 'abd', 'abe']
+
+
+class _CoroutineEventLoop(_ManualEventLoop):
+    " Like `_ManualEventLoop`, but run coroutines in an asyncio loop. "
+    supports_coroutines = True
+
+    def __init__(self):
+        super(_CoroutineEventLoop, self).__init__()
+        self.loop = asyncio.new_event_loop()
+        self.tasks = []
+
+        # Errors in the callbacks of the tasks. (asyncio only logs them.)
+        self.errors = []
+        self.loop.set_exception_handler(lambda loop, context: self.errors.append(context))
+
+    def create_task(self, coroutine):
+        task = asyncio.ensure_future(coroutine, loop=self.loop)
+        self.tasks.append(task)
+        return task
+
+    def run_tasks(self):
+        " Run the asyncio loop until all the tasks are done. "
+        tasks, self.tasks = self.tasks, []
+        if tasks:
+            self.loop.run_until_complete(asyncio.wait(tasks, loop=self.loop))
+
+        assert self.errors == []
+
+
+@pytest.mark.skipif(asyncio is None, reason='Requires asyncio.')
+def test_async_completions():
+    documents = []
+
+    class AsyncCompleter(_ListCompleter):
+        def get_completions(self, document, complete_event):
+            assert False, 'Should not be called in a thread.'
+
+        def get_completions_async(self, document, complete_event):
+            documents.append(document.text)
+            completions = list(_ListCompleter.get_completions(self, document, complete_event))
+            return asyncio.sleep(0.01, result=completions, loop=loop.loop)
+
+    loop = _CoroutineEventLoop()
+    cli = _create_cli_with_completer(AsyncCompleter(['abc', 'abd', 'bcd']), loop)
+    buffer = cli.current_buffer
+
+    buffer.insert_text('a')
+    buffer.insert_text('b')  # Cancels the completion of 'a'.
+    loop.run_tasks()
+
+    assert documents == ['a', 'ab']
+    assert [c.text for c in buffer.complete_state.current_completions] == ['abc', 'abd']
+
+
+@pytest.mark.skipif(asyncio is None, reason='Requires asyncio.')
+def test_async_validation():
+    accepted = []
+
+    class AsyncValidator(Validator):
+        def validate(self, document):
+            assert False, 'Should not be called.'
+
+        def validate_async(self, document):
+            future = asyncio.Future(loop=loop.loop)
+            if document.text == 'valid':
+                future.set_result(None)
+            else:
+                future.set_exception(ValidationError(cursor_position=1, message='Invalid'))
+            return future
+
+    loop = _CoroutineEventLoop()
+    cli = CommandLineInterface(
+        application=Application(
+            buffer=Buffer(validator=AsyncValidator(),
+                          accept_action=AcceptAction(lambda cli, buffer: accepted.append(buffer.text))),
+            key_bindings_registry=KeyBindingManager.for_prompt().registry),
+        eventloop=loop,
+        input=PipeInput(),
+        output=DummyOutput())
+    buffer = cli.current_buffer
+
+    buffer.insert_text('invalid')
+    buffer.accept_action.validate_and_handle(cli, buffer)
+    loop.run_tasks()
+
+    assert accepted == []
+    assert buffer.validation_error.message == 'Invalid'
+    assert buffer.cursor_position == 1
+
+    buffer.text = 'valid'
+    buffer.accept_action.validate_and_handle(cli, buffer)
+    loop.run_tasks()
+
+    assert accepted == ['valid']
+
+
+def test_max_completions():
+    def create_cli(**kw):
+        return CommandLineInterface(
+            application=Application(
+                buffer=Buffer(completer=_ListCompleter(['abcd', 'abc', 'abe', 'ab', 'abf']),
+                              complete_while_typing=True, **kw),
+                key_bindings_registry=KeyBindingManager.for_prompt().registry),
+            eventloop=loop,
+            input=PipeInput(),
+            output=DummyOutput())
+
+    # Without sort key: the first completions.
+    loop = _ManualEventLoop()
+    cli = create_cli(max_completions=2)
+    cli.current_buffer.insert_text('a')
+    loop.run_calls()
+
+    complete_state = cli.current_buffer.complete_state
+    assert [c.text for c in complete_state.current_completions] == ['abcd', 'abc']
+    assert complete_state.hidden_count == 3
+
+    # Both menus show how many completions were left out.
+    for control in [CompletionsMenuControl(), MultiColumnCompletionMenuControl()]:
+        width = control.preferred_width(cli, 80)
+        height = control.preferred_height(cli, width, 10, False)
+        content = control.create_content(cli, width, height)
+        last_line = content.get_line(content.line_count - 1)
+
+        assert ''.join(text for _, text in last_line).strip() == '3 more...'
+        assert last_line[0][0] == Token.Menu.Completions.More
+
+    # Selecting a completion keeps the count.
+    cli.current_buffer.complete_next()
+    assert cli.current_buffer.complete_state.hidden_count == 3
+
+    # With sort key: the best completions, sorted.
+    loop = _ManualEventLoop()
+    cli = create_cli(max_completions=3, completion_sort_key=lambda c: len(c.text))
+    cli.current_buffer.insert_text('a')
+    loop.run_calls()
+
+    complete_state = cli.current_buffer.complete_state
+    assert [c.text for c in complete_state.current_completions] == ['ab', 'abc', 'abe']
+    assert complete_state.hidden_count == 2
+
+    # Synchronous completion.
+    buffer = Buffer(completer=_ListCompleter(['abc', 'abd', 'abe']), max_completions=1)
+    buffer.insert_text('a')
+    buffer.set_completions(completions=None)
+    assert [c.text for c in buffer.complete_state.current_completions] == ['abc']
+    assert buffer.complete_state.hidden_count == 2
+
+
+def test_coalesced_text_insert():
+    changes = []
+    cli = CommandLineInterface(
+        application=Application(
+            buffer=Buffer(on_text_changed=lambda buffer: changes.append(buffer.text)),
+            key_bindings_registry=KeyBindingManager.for_prompt().registry),
+        eventloop=PosixEventLoop(),
+        input=PipeInput(),
+        output=DummyOutput())
+    callbacks = cli.create_eventloop_callbacks()
+
+    callbacks.feed_keys([KeyPress(c, c) for c in 'hello'] +
+                        [KeyPress(Keys.ControlA, '\x01')] +
+                        [KeyPress(c, c) for c in 'ab'])
+
+    assert cli.current_buffer.text == 'abhello'
+    assert changes == ['hello', 'abhello']
+
+    # Keys fed from inside a key binding are handled before the remaining
+    # keys, like when they are fed one by one.
+    cli.application.key_bindings_registry.add_binding('x')(
+        lambda event: event.cli.input_processor.feed(KeyPress(Keys.ControlE, '\x05')))
+    callbacks.feed_keys([KeyPress(c, c) for c in 'xyz'])
+
+    assert cli.current_buffer.text == 'abhelloyz'
+
+    # The `beforeKeyPress` event is fired before the binding is chosen.
+    cli.current_buffer.reset()
+    del changes[:]
+    upper = [False]
+
+    cli.application.key_bindings_registry.add_binding(
+        'a', filter=Condition(lambda cli: upper[0], changes_on_text_insert=False))(
+        lambda event: event.current_buffer.insert_text('A'))
+
+    def before_key_press(sender):
+        upper[0] = True
+    cli.input_processor.beforeKeyPress += before_key_press
+
+    callbacks.feed_keys([KeyPress(c, c) for c in 'abc'])
+    assert cli.current_buffer.text == 'Abc'
+    assert changes == ['A', 'Abc']
+
+    # A run of characters stops at a key with a binding whose filter can
+    # depend on the text.
+    del changes[:]
+    cli.application.key_bindings_registry.add_binding(
+        '.', filter=Condition(lambda cli: cli.current_buffer.text.endswith('..')))(
+        lambda event: event.current_buffer.insert_text('!'))
+    callbacks.feed_keys([KeyPress(c, c) for c in 'de...'])
+    assert cli.current_buffer.text == 'Abcde..!'
+    assert changes == ['Abcde', 'Abcde.', 'Abcde..', 'Abcde..!']
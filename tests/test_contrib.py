@@ -1,8 +1,10 @@
 from __future__ import unicode_literals, absolute_import, print_function
 
+import multiprocessing
 import os
 import shutil
 import tempfile
+import threading
 
 from contextlib import contextmanager
 
@@ -10,7 +12,12 @@ from six import text_type
 
 from prompt_toolkit.completion import CompleteEvent
 from prompt_toolkit.document import Document
-from prompt_toolkit.contrib.completers.filesystem import PathCompleter
+from prompt_toolkit.contrib.completers.base import WordCompleter, IndexedWordCompleter
+from prompt_toolkit.contrib.completers.cache import CachingCompleter
+from prompt_toolkit.contrib.completers.filesystem import PathCompleter, DirectoryCache, ExecutableCompleter
+from prompt_toolkit.contrib.completers.fuzzy import FuzzyCompleter, numpy
+from prompt_toolkit.contrib.completers.merge import MergedCompleter
+from prompt_toolkit.contrib.completers.process import ProcessPoolCompleter
 
 
 @contextmanager
@@ -251,3 +258,338 @@ def test_pathcompleter_get_paths_constrains_path():
 
     # cleanup
     shutil.rmtree(test_dir)
+
+
+def test_directory_cache():
+    test_dir = tempfile.mkdtemp()
+    write_test_files(test_dir, ['abc', 'abd', 'x'])
+    os.mkdir(os.path.join(test_dir, 'abe'))
+
+    cache = DirectoryCache(ttl=1000)
+    assert cache.get_entries(test_dir, 'ab') == [('abc', False), ('abd', False), ('abe', True)]
+    assert cache.get_entries(os.path.join(test_dir, 'x')) == []
+
+    # Within the TTL, the directory is not listed again.
+    write_test_files(test_dir, ['abf'])
+    assert len(cache.get_entries(test_dir, 'ab')) == 3
+
+    # After the TTL, it's listed again when it has been modified.
+    cache.ttl = 0
+    os.utime(test_dir, (0, 0))
+    assert len(cache.get_entries(test_dir, 'ab')) == 4
+
+    # Using the cache from `PathCompleter`.
+    completer = PathCompleter(directory_cache=cache)
+    doc_text = os.path.join(test_dir, 'ab')
+    completions = completer.get_completions(Document(doc_text), CompleteEvent())
+    assert [c.display for c in completions] == ['abc', 'abd', 'abe/', 'abf']
+
+    shutil.rmtree(test_dir)
+
+
+def test_executable_completer():
+    test_dir = tempfile.mkdtemp()
+    write_test_files(test_dir, ['prog1', 'prog2', 'data'])
+    os.chmod(os.path.join(test_dir, 'prog1'), 0o755)
+    os.chmod(os.path.join(test_dir, 'data'), 0o755)
+
+    old_path = os.environ.get('PATH', '')
+    os.environ['PATH'] = test_dir
+
+    try:
+        completer = ExecutableCompleter()
+
+        def complete(text):
+            return [(c.text, c.display) for c in
+                    completer.get_completions(Document(text), CompleteEvent())]
+
+        assert complete('pr') == [('og1', 'prog1')]
+        assert complete('') == []
+
+        # The directories are checked again after the TTL, and listed again
+        # when they have been modified.
+        os.chmod(os.path.join(test_dir, 'prog2'), 0o755)
+        os.utime(test_dir, (0, 0))
+        assert complete('pr') == [('og1', 'prog1')]
+
+        completer._index.ttl = 0
+        assert complete('pr') == [('og1', 'prog1'), ('og2', 'prog2')]
+
+        # Changing $PATH.
+        os.environ['PATH'] = ''
+        assert complete('pr') == []
+    finally:
+        os.environ['PATH'] = old_path
+        shutil.rmtree(test_dir)
+
+
+class _CountingCompleter(WordCompleter):
+    def __init__(self, *a, **kw):
+        super(_CountingCompleter, self).__init__(*a, **kw)
+        self.calls = 0
+
+    def get_completions(self, document, complete_event):
+        self.calls += 1
+        return super(_CountingCompleter, self).get_completions(document, complete_event)
+
+
+def _complete(completer, text):
+    return [(c.text, c.start_position) for c in
+            completer.get_completions(Document(text), CompleteEvent(text_inserted=True))]
+
+
+def test_caching_completer_refines_completions():
+    inner = _CountingCompleter(['select', 'selection', 'set', 'insert'])
+    completer = CachingCompleter(inner)
+
+    assert _complete(completer, 'se') == [('select', -2), ('selection', -2), ('set', -2)]
+    assert _complete(completer, 'sel') == [('select', -3), ('selection', -3)]
+    assert _complete(completer, 'selecti') == [('selection', -7)]
+    assert _complete(completer, 'sel') == [('select', -3), ('selection', -3)]
+    assert inner.calls == 1
+
+    # Typing a separator calls the wrapped completer again.
+    assert _complete(completer, 'sel i') == [('insert', -1)]
+    assert inner.calls == 2
+
+    # Invalidation.
+    completer.invalidate()
+    _complete(completer, 'se')
+    assert inner.calls == 3
+
+
+def test_caching_completer_with_fuzzy_completer():
+    inner = FuzzyCompleter(WordCompleter(['select', 'selection', 'sleep'],
+                                         meta_dict={'select': 'keyword'}))
+    completer = CachingCompleter(inner)
+
+    def get_completions(completer, text):
+        return [(c.text, c.start_position, c.display_meta, c.highlighted_positions)
+                for c in completer.get_completions(Document(text), CompleteEvent(text_inserted=True))]
+
+    # Other words match, and other characters are highlighted, when more text
+    # is typed. So the completions are not refined.
+    for text in ['s', 'se', 'sel', 'sle', 'sel']:
+        assert get_completions(completer, text) == get_completions(inner, text)
+
+    # When refining is enabled, the highlighting of refined completions is
+    # cleared.
+    completer = CachingCompleter(inner, refine=True)
+    get_completions(completer, 'sel')
+    assert get_completions(completer, 'sele') == [
+        ('select', -4, 'keyword', None), ('selection', -4, '', None)]
+
+
+def test_caching_completer_matches_wrapped_completer():
+    words = ['Apple', 'apricot', 'banana', 'grape', 'pineapple']
+
+    for kwargs in [{}, {'ignore_case': True}, {'match_middle': True},
+                   {'ignore_case': True, 'match_middle': True}]:
+        inner = WordCompleter(words, **kwargs)
+        completer = CachingCompleter(inner, **kwargs)
+
+        for text in ['', 'a', 'ap', 'app', 'appl', 'p', 'pp', 'ple']:
+            assert _complete(completer, text) == _complete(inner, text)
+
+
+def test_caching_completer_lru():
+    inner = _CountingCompleter(['abc', 'xyz'])
+    completer = CachingCompleter(inner, maxsize=2)
+
+    _complete(completer, 'a')
+    _complete(completer, 'x')
+    _complete(completer, 'a')  # Cached, becomes most recently used.
+    _complete(completer, 'b')  # Evicts 'x'.
+    assert inner.calls == 3
+
+    _complete(completer, 'a')
+    assert inner.calls == 3
+    _complete(completer, 'x')
+    assert inner.calls == 4
+
+
+def test_indexed_word_completer_matches_word_completer():
+    words = ['pineapple', 'Apple', 'apricot', 'banana', 'apple', 'grape', 'apple', 'Ápple']
+
+    for kwargs in [{}, {'ignore_case': True}, {'match_middle': True},
+                   {'ignore_case': True, 'match_middle': True}, {'sentence': True}]:
+        expected_completer = WordCompleter(words, **kwargs)
+        completer = IndexedWordCompleter(words, **kwargs)
+
+        for text in ['', 'a', 'A', 'ap', 'app', 'apple', 'p', 'pp', 'ple', 'x', 'e a']:
+            # Same completions, but in sorted order.
+            result = _complete(completer, text)
+            assert sorted(result) == sorted(_complete(expected_completer, text))
+
+            if kwargs.get('ignore_case'):
+                assert result == sorted(result, key=lambda c: c[0].lower())
+            else:
+                assert result == sorted(result)
+
+
+def test_indexed_word_completer_is_lazy():
+    words = ['word%i' % i for i in range(10000)]
+
+    completions = IndexedWordCompleter(words).get_completions(
+        Document('word99'), CompleteEvent())
+    assert next(completions).text == 'word99'
+    assert next(completions).text == 'word990'
+
+    completions = IndexedWordCompleter(words, match_middle=True).get_completions(
+        Document('99'), CompleteEvent())
+    assert next(completions).text == 'word1099'
+    assert next(completions).text == 'word1199'
+
+    completions = IndexedWordCompleter(words, match_middle=True).get_completions(
+        Document('999'), CompleteEvent())
+    assert [c.text for c in completions] == (
+        ['word%i999' % i for i in range(1, 9)] + ['word999'] + ['word999%i' % i for i in range(10)])
+
+
+def _fuzzy_complete(completer, text):
+    return [(c.text, c.start_position, c.highlighted_positions) for c in
+            completer.get_completions(Document(text), CompleteEvent(text_inserted=True))]
+
+
+def test_fuzzy_completer():
+    words = ['FuzzyCompleter', 'fuzz', 'buzz', 'frozen_cream', 'fizz_counter']
+
+    for use_numpy in ([False, True] if numpy is not None else [False]):
+        completer = FuzzyCompleter(words, use_numpy=use_numpy)
+
+        # Closest matches first, matched characters are highlighted.
+        assert _fuzzy_complete(completer, 'fzcm') == [
+            ('FuzzyCompleter', -4, [0, 3, 5, 7]),
+            ('frozen_cream', -4, [0, 3, 7, 11]),
+        ]
+        assert _fuzzy_complete(completer, 'uzz') == [
+            ('fuzz', -3, [1, 2, 3]),
+            ('buzz', -3, [1, 2, 3]),
+            ('FuzzyCompleter', -3, [1, 2, 3]),
+        ]
+        assert _fuzzy_complete(completer, 'xyz') == []
+        assert len(_fuzzy_complete(completer, '')) == 5
+
+        # Case sensitive.
+        completer = FuzzyCompleter(words, ignore_case=False, use_numpy=use_numpy)
+        assert [c[0] for c in _fuzzy_complete(completer, 'FzC')] == ['FuzzyCompleter']
+
+
+def test_fuzzy_completer_wraps_completer():
+    completer = FuzzyCompleter(WordCompleter(['select', 'insert', 'delete']))
+
+    assert _fuzzy_complete(completer, 'sel') == [('select', -3, [0, 1, 2])]
+    assert _fuzzy_complete(completer, 'x srt') == [('insert', -3, [2, 4, 5])]
+    assert _fuzzy_complete(completer, 'x et') == [
+        ('delete', -2, [3, 4]), ('select', -2, [3, 5]), ('insert', -2, [3, 5])]
+
+
+def test_process_pool_completer():
+    words = ['word%i' % i for i in range(1000)]
+    completer = ProcessPoolCompleter(
+        WordCompleter(words, meta_dict={'word1': 'meta'}), batch_size=10)
+
+    try:
+        def complete(text, complete_event=None):
+            return completer.get_completions(Document(text), complete_event or CompleteEvent())
+
+        completions = list(complete('word1'))
+        assert [c.text for c in completions] == [w for w in words if w.startswith('word1')]
+        assert completions[0].start_position == -5
+        assert completions[0].display_meta == 'meta'
+
+        # When cancelled, the remaining batches are not sent.
+        complete_event = CompleteEvent()
+        completions = complete('word', complete_event)
+        next(completions)
+        complete_event.cancel()
+        assert len(list(completions)) == 9
+
+        # The worker can be reused afterwards.
+        assert [c.text for c in complete('word99')] == ['word99'] + ['word99%i' % i for i in range(10)]
+        assert len(completer._workers) == 1
+    finally:
+        completer.close()
+
+
+def test_process_pool_completer_with_context():
+    if not hasattr(multiprocessing, 'get_context'):  # Python 2.
+        return
+
+    context = multiprocessing.get_context('spawn')
+    completer = ProcessPoolCompleter(WordCompleter(['abc', 'abd', 'xyz']), context=context)
+
+    try:
+        completions = completer.get_completions(Document('ab'), CompleteEvent())
+        assert [c.text for c in completions] == ['abc', 'abd']
+        assert isinstance(completer._workers[0].process, context.Process)
+    finally:
+        completer.close()
+
+
+def test_merged_completer():
+    class BlockingCompleter(WordCompleter):
+        " Yields the first `count` completions, then waits for `event`. "
+        def __init__(self, words, event, count=0):
+            super(BlockingCompleter, self).__init__(words)
+            self.event = event
+            self.count = count
+
+        def get_completions(self, document, complete_event):
+            for i, c in enumerate(super(BlockingCompleter, self).get_completions(document, complete_event)):
+                if i == self.count:
+                    self.event.wait()
+                yield c
+
+    keywords = WordCompleter(['select', 'set', 'show'])
+    words = ['sequence', 'session', 'set', 'sort', 'split']
+
+    def complete(completer, text):
+        return [c.text for c in completer.get_completions(Document(text), CompleteEvent())]
+
+    # Duplicates are removed.
+    completer = MergedCompleter([keywords, WordCompleter(words)])
+    assert sorted(complete(completer, 'se')) == ['select', 'sequence', 'session', 'set']
+
+    # The fast source is not delayed by the slow one.
+    release = threading.Event()
+    completer = MergedCompleter([keywords, BlockingCompleter(words, release)])
+    completions = completer.get_completions(Document('s'), CompleteEvent())
+    assert [next(completions).text for _ in range(3)] == ['select', 'set', 'show']
+
+    release.set()
+    assert [c.text for c in completions] == ['sequence', 'session', 'sort', 'split']
+
+    # Sources are cancelled after their timeout. What they produced until
+    # then is kept.
+    release = threading.Event()
+    completer = MergedCompleter([keywords, BlockingCompleter(words, release, count=2)],
+                                timeout=[None, .1])
+    assert sorted(complete(completer, 's')) == ['select', 'sequence', 'session', 'set', 'show']
+    release.set()
+
+    # Ranking across sources.
+    completer = MergedCompleter([keywords, WordCompleter(words)], sort_key=lambda c: len(c.text))
+    assert complete(completer, 's') == ['set', 'show', 'sort', 'split', 'select', 'session', 'sequence']
+
+    # A source that hangs doesn't block the other sources. Requests for it
+    # wait until it's done, and don't run when they were cancelled meanwhile.
+    release = threading.Event()
+    calls = []
+
+    class HangingCompleter(WordCompleter):
+        def get_completions(self, document, complete_event):
+            calls.append(document.text)
+            release.wait()
+            return super(HangingCompleter, self).get_completions(document, complete_event)
+
+    completer = MergedCompleter([keywords, HangingCompleter(['sequence'])], timeout=.1)
+    for text in ['s', 'se', 'sel']:
+        assert complete(completer, text) == [w for w in ['select', 'set', 'show'] if w.startswith(text)]
+
+    # Without a timeout, the next request waits for the source. Only the first
+    # request and this one did run.
+    release.set()
+    completer.timeouts = [None, None]
+    assert complete(completer, 'seq') == ['sequence']
+    assert calls == ['s', 'seq']
@@ -0,0 +1,81 @@
+from __future__ import unicode_literals
+
+from prompt_toolkit.eventloop.executor import ThreadPool, ExecutorPriority
+
+import threading
+
+
+def test_thread_pool():
+    pool = ThreadPool(max_workers=2)
+    results = []
+    lock = threading.Lock()
+
+    def task(i):
+        def run():
+            with lock:
+                results.append(i)
+        return run
+
+    for i in range(100):
+        pool.submit(task(i))
+    pool.shutdown()
+
+    assert sorted(results) == list(range(100))
+
+    metrics = pool.metrics
+    assert metrics.workers <= 2
+    assert metrics.submitted == metrics.completed == 100
+    assert metrics.queue_depth == {
+        ExecutorPriority.INTERACTIVE: 0, ExecutorPriority.BACKGROUND: 0}
+
+
+def test_thread_pool_priorities():
+    pool = ThreadPool(max_workers=2, max_background_workers=1)
+    release = threading.Event()
+    started = threading.Event()
+    interactive_done = threading.Event()
+    order = []
+
+    def blocking():
+        started.set()
+        release.wait()
+
+    # The background task occupies the only background slot. Other
+    # background work has to wait, but interactive work can still run.
+    pool.submit(blocking, priority=ExecutorPriority.BACKGROUND)
+    started.wait()
+    pool.submit(lambda: order.append('background'), priority=ExecutorPriority.BACKGROUND)
+    pool.submit(lambda: (order.append('interactive'), interactive_done.set()))
+
+    interactive_done.wait()
+    assert order == ['interactive']
+    assert pool.metrics.queue_depth[ExecutorPriority.BACKGROUND] == 1
+
+    release.set()
+    pool.shutdown()
+    assert order == ['interactive', 'background']
+
+
+def test_thread_pool_queue_limit():
+    pool = ThreadPool(max_workers=1, max_queue_size=2)
+    release = threading.Event()
+    started = threading.Event()
+    results = []
+
+    def blocking():
+        started.set()
+        release.wait()
+
+    pool.submit(blocking)
+    started.wait()
+
+    # Oldest pending callback is dropped, and its submitter is told.
+    for i in range(3):
+        pool.submit(lambda i=i: results.append(i),
+                    dropped_callback=lambda i=i: results.append('dropped %i' % i))
+
+    release.set()
+    pool.shutdown()
+
+    assert results == ['dropped 0', 1, 2]
+    assert pool.metrics.dropped == 1
@@ -1,5 +1,5 @@
 from __future__ import unicode_literals
-from prompt_toolkit.filters import Condition, Never, Always, Filter
+from prompt_toolkit.filters import Condition, Never, Always, Filter, FilterEvaluator, RenderFilterCache, evaluate_for_render
 from prompt_toolkit.filters.types import CLIFilter, SimpleFilter
 from prompt_toolkit.filters.utils import to_cli_filter, to_simple_filter
 from prompt_toolkit.filters.cli import HasArg, HasFocus, HasSelection
@@ -166,3 +166,91 @@ def test_cli_filters():
     assert isinstance(HasArg(), CLIFilter)
     assert isinstance(HasFocus('BUFFER_NAME'), CLIFilter)
     assert isinstance(HasSelection(), CLIFilter)
+
+
+def test_filter_evaluator():
+    calls = []
+
+    def create_condition(name, value):
+        def func(cli):
+            calls.append(name)
+            return value
+        return Condition(func)
+
+    a = create_condition('a', True)
+    b = create_condition('b', False)
+    c = create_condition('c', True)
+
+    evaluator = FilterEvaluator(None)
+
+    assert evaluator(a & ~b)
+    assert not evaluator(a & b & c)  # `c` is not needed.
+    assert evaluator(b | c)
+    assert evaluator(~(a & b))
+    assert evaluator(Always())
+    assert not evaluator(Never())
+
+    # Every filter was called only once.
+    assert calls == ['a', 'b', 'c']
+    assert evaluator.call_count == 3
+    assert evaluator.calls == [a, b, c]
+
+    # After `clear`, the filters are called again.
+    evaluator.clear()
+    assert evaluator(a | b)
+    assert calls == ['a', 'b', 'c', 'a']
+    assert evaluator.call_count == 4
+
+
+def test_render_filter_cache():
+    class FakeCLI(object):
+        render_counter = 1
+        render_filter_cache = RenderFilterCache()
+
+    cli = FakeCLI()
+    values = {'pure': True, 'impure': True}
+    calls = []
+
+    def create_condition(name, pure_per_render):
+        def func(cli):
+            calls.append(name)
+            return values[name]
+        return Condition(func, pure_per_render=pure_per_render)
+
+    pure = create_condition('pure', True)
+    impure = create_condition('impure', False)
+
+    assert (pure & ~HasArg()).pure_per_render
+    assert not (pure | impure).pure_per_render
+
+    # Outside of a rendering, nothing is cached.
+    assert evaluate_for_render(pure, cli)
+    assert evaluate_for_render(pure, cli)
+    assert calls == ['pure', 'pure']
+
+    # During a rendering, only pure filters are cached.
+    del calls[:]
+    cli.render_filter_cache.begin(cli.render_counter)
+    for i in range(3):
+        assert evaluate_for_render(pure, cli)
+        assert evaluate_for_render(impure, cli)
+    assert calls == ['pure', 'impure', 'impure', 'impure']
+
+    values['pure'] = False
+    assert evaluate_for_render(pure, cli)
+    cli.render_filter_cache.end()
+
+    # Next rendering.
+    cli.render_counter += 1
+    cli.render_filter_cache.begin(cli.render_counter)
+    assert not evaluate_for_render(pure, cli)
+    cli.render_filter_cache.end()
+
+    # In debug mode, filters that change during a rendering are reported.
+    cli.render_filter_cache = RenderFilterCache(debug=True)
+    cli.render_filter_cache.begin(cli.render_counter)
+    assert not evaluate_for_render(pure, cli)
+    values['pure'] = True
+    assert evaluate_for_render(pure, cli)
+    assert cli.render_filter_cache.changed_filters == [(cli.render_counter, pure)]
+    cli.render_filter_cache.end()
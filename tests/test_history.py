@@ -0,0 +1,52 @@
+from __future__ import unicode_literals
+
+from prompt_toolkit.history import FileHistory, SharedFileHistory
+
+import os
+
+
+def test_file_history(tmpdir):
+    filename = str(tmpdir.join('history'))
+
+    history = FileHistory(filename)
+    history.append('line1')
+    history.append('line2\nline3')
+
+    assert list(FileHistory(filename)) == ['line1', 'line2\nline3']
+
+
+def test_shared_file_history(tmpdir):
+    filename = str(tmpdir.join('history'))
+
+    a = SharedFileHistory(filename, refresh_interval=0)
+    b = SharedFileHistory(filename, refresh_interval=0)
+
+    a.append('from a')
+    b.append('from b\nsecond line')
+    a.append('again from a')
+
+    # Both sessions see the entries of the other one.
+    assert list(a) == ['from a', 'again from a', 'from b\nsecond line']
+    assert list(b) == ['from b\nsecond line', 'from a', 'again from a']
+
+    # Compatible with `FileHistory`.
+    assert list(FileHistory(filename)) == ['from a', 'from b\nsecond line', 'again from a']
+
+
+def test_shared_file_history_flush(tmpdir):
+    filename = str(tmpdir.join('history'))
+
+    a = SharedFileHistory(filename, flush_every=2, refresh_interval=0)
+    b = SharedFileHistory(filename, refresh_interval=0)
+
+    a.append('1')
+    assert list(a) == ['1']
+    assert not os.path.exists(filename)
+    assert list(b) == []
+
+    a.append('2')
+    assert list(b) == ['1', '2']
+
+    a.append('3')
+    a.flush()
+    assert list(b) == ['1', '2', '3']
@@ -0,0 +1,74 @@
+from __future__ import unicode_literals
+
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.history import InMemoryHistory
+from prompt_toolkit.history_search import FuzzyHistorySearch
+
+
+def _history(*strings):
+    history = InMemoryHistory()
+    for s in strings:
+        history.append(s)
+    return history
+
+
+def test_fuzzy_history_search():
+    history = _history('git commit -m fix', 'ls -la', 'git checkout master', 'make test')
+    search = FuzzyHistorySearch(history)
+
+    # Typo in the query.
+    assert [m.text for m in search.find('git chekcout')] == ['git checkout master']
+
+    assert search.find('xyz') == []
+    assert search.find('   ') == []
+
+
+def test_fuzzy_history_search_frecency():
+    history = _history('docker ps', 'docker push', 'docker ps', 'docker ps', 'ls')
+    search = FuzzyHistorySearch(history)
+
+    # Used more often.
+    matches = search.find('docker p')
+    assert [m.text for m in matches] == ['docker ps', 'docker push']
+    assert [m.count for m in matches] == [3, 1]
+
+    # Used more recently. (New entries are picked up.)
+    history.append('docker push')
+    history.append('docker push')
+    history.append('docker push')
+    assert search.find('docker p')[0].text == 'docker push'
+
+    assert len(search.find('docker', max_results=1)) == 1
+
+
+def test_start_fuzzy_history_completion():
+    buffer = Buffer(history=_history('python setup.py test', 'pip install -e .'))
+    buffer.insert_text('setup test')
+    buffer.start_fuzzy_history_completion()
+
+    assert buffer.text == 'python setup.py test'
+    assert buffer.complete_state.current_completions[0].display_meta == 'Used once'
+
+
+def test_fuzzy_history_search_large_history():
+    history = _history('git status')
+    for i in range(5000):
+        history.append('git commit -m "change %i"' % i)
+    history.append('git status')
+
+    search = FuzzyHistorySearch(history, max_postings=100)
+
+    # Entries that were used recently are found, even when they were added
+    # long ago. Then the most recent ones.
+    matches = search.find('gi st')
+    assert matches[0].text == 'git status'
+    assert matches[0].count == 2
+    assert [m.text for m in matches[1:3]] == [
+        'git commit -m "change 4999"', 'git commit -m "change 4998"']
+
+    # Only the most recently used entries of common bigrams are considered.
+    texts = [m.text for m in search.find('git commit', max_results=10000)]
+    assert sorted(texts) == sorted('git commit -m "change %i"' % i for i in range(4900, 5000))
+
+    search = FuzzyHistorySearch(history)
+    assert len(search.find('git commit', max_results=10000)) == 5000
@@ -1,6 +1,6 @@
 from __future__ import unicode_literals
 
-from prompt_toolkit.terminal.vt100_input import InputStream
+from prompt_toolkit.terminal.vt100_input import InputStream, ANSI_SEQUENCES
 from prompt_toolkit.keys import Keys
 
 import pytest
@@ -140,3 +140,27 @@ def test_cpr_response_2(processor, stream):
     assert len(processor.keys) == 2
     assert processor.keys[0].key == Keys.CPRResponse
     assert processor.keys[1].key == Keys.ControlJ
+
+
+def test_plain_text_runs(processor, stream):
+    # Runs of text around escape sequences, split over several chunks.
+    stream.feed('abc\x1b[')
+    stream.feed('Adef\x1b')
+    stream.feed('x\rgh')
+
+    assert [k.key for k in processor.keys] == [
+        'a', 'b', 'c', Keys.Up, 'd', 'e', 'f', Keys.Escape, 'x', Keys.ControlJ, 'g', 'h']
+    assert [k.data for k in processor.keys][-4:] == ['x', '\n', 'g', 'h']
+
+
+def test_plain_text_runs_with_added_sequence(processor, stream):
+    stream.feed('ab')
+
+    # Sequences that are added later are recognised in runs of text.
+    ANSI_SEQUENCES['\xa7'] = Keys.F20
+    try:
+        stream.feed('c\xa7d')
+    finally:
+        del ANSI_SEQUENCES['\xa7']
+
+    assert [k.key for k in processor.keys] == ['a', 'b', 'c', Keys.F20, 'd']
@@ -1,7 +1,8 @@
 from __future__ import unicode_literals
 
 from prompt_toolkit.key_binding.input_processor import InputProcessor, KeyPress
-from prompt_toolkit.key_binding.registry import Registry
+from prompt_toolkit.key_binding.registry import Registry, MergedRegistry, ConditionalRegistry
+from prompt_toolkit.filters import Condition
 from prompt_toolkit.keys import Keys
 
 import pytest
@@ -96,3 +97,67 @@ def test_common_prefix(processor, handlers):
     processor.process_keys()
 
     assert handlers.called == ['control_x', 'control_d']
+
+
+def test_registry_lookup(handlers):
+    any_b = handlers.any_b
+
+    registry = Registry()
+    registry.add_binding(Keys.Any, 'b')(any_b)
+    registry.add_binding('a', 'b')(handlers.a_b)
+    registry.add_binding('a', Keys.Any)(handlers.a_any)
+    registry.add_binding('a', 'b', 'c')(handlers.a_b_c)
+
+    # The most specific binding comes last.
+    assert [b.keys for b in registry.get_bindings_for_keys(('a', 'b'))] == [
+        (Keys.Any, 'b'), ('a', Keys.Any), ('a', 'b')]
+    assert registry.get_bindings_for_keys(('x', 'y')) == []
+    assert [b.keys for b in registry.get_bindings_starting_with_keys(('a', ))] == [
+        (Keys.Any, 'b'), ('a', 'b'), ('a', Keys.Any), ('a', 'b', 'c')]
+
+    # Changes through a merged registry are visible right away.
+    extra = Registry()
+    merged = MergedRegistry([ConditionalRegistry(registry, True), extra])
+    assert len(merged.get_bindings_for_keys(('a', 'b'))) == 3
+
+    extra.add_binding('a', 'b')(handlers.extra_a_b)
+    assert len(merged.get_bindings_for_keys(('a', 'b'))) == 4
+
+    registry.remove_binding(any_b)
+    assert len(merged.get_bindings_for_keys(('a', 'b'))) == 3
+    assert len(merged.get_bindings_starting_with_keys(('a', ))) == 4
+    assert len(merged.key_bindings) == 4
+
+
+def test_filter_calls_per_key(handlers):
+    calls = []
+
+    @Condition
+    def enabled(cli):
+        calls.append(cli)
+        return True
+
+    registry = Registry()
+    registry.add_binding('a', filter=enabled)(handlers.a)
+    registry.add_binding('a', 'b', filter=enabled)(handlers.a_b)
+    registry.add_binding('b', filter=enabled)(handlers.b)
+    registry.add_binding('c', filter=enabled & ~enabled)(handlers.c)
+
+    processor = InputProcessor(registry, lambda: None)
+
+    # The shared condition is called once per key press.
+    processor.feed(KeyPress('a'))
+    processor.process_keys()
+    assert handlers.called == []
+    assert processor.filter_evaluator.call_count == 1
+
+    processor.feed(KeyPress('b'))
+    processor.process_keys()
+    assert handlers.called == ['a_b']
+    assert processor.filter_evaluator.call_count == 1
+
+    processor.feed(KeyPress('c'))
+    processor.process_keys()
+    assert handlers.called == ['a_b']
+    assert processor.filter_evaluator.call_count == 1
+    assert len(calls) == 3
@@ -1,5 +1,9 @@
 from __future__ import unicode_literals
 
+import os
+import shutil
+import tempfile
+
 from prompt_toolkit.completion import CompleteEvent, Completer, Completion
 from prompt_toolkit.contrib.regular_languages import compile
 from prompt_toolkit.contrib.regular_languages.compiler import Match, Variables
@@ -108,3 +112,56 @@ def test_completer():
     assert completions[0].start_position == -3
     assert completions[1].text == 'before2-def-after2-B'
     assert completions[1].start_position == -3
+
+
+def test_match_results_are_cached():
+    g = compile(r'(?P<var1>[a-z]*) \s+ (?P<var2>[a-z]*)')
+
+    # The completer, lexer and validator share the match results.
+    m = g.match_prefix('abc de')
+    assert g.match_prefix('abc de') is m
+    assert g.match('abc def') is g.match('abc def')
+    assert g.match('abc') is None
+
+    # Recently used inputs are kept, the least recently used is discarded.
+    n = g.match_prefix('n')
+    for i in range(7):
+        g.match_prefix('x' * i)
+        assert g.match_prefix('abc de') is m
+
+    g.match_prefix('y')
+    assert g.match_prefix('abc de') is m
+    assert g.match_prefix('n') is not n
+
+    for i in range(20):
+        g.match_prefix('z' * i)
+
+    assert g.match_prefix('abc de') is not m
+    assert g.match_prefix('abc de').variables().get('var2') == 'de'
+
+
+def test_cache_dir():
+    cache_dir = tempfile.mkdtemp()
+    grammar = r'(?P<var1>[a-z]*) \s+ (?P<var2>[a-z]*)'
+
+    try:
+        g1 = compile(grammar, cache_dir=cache_dir)
+        assert g1.root_node is not None
+        assert len(os.listdir(cache_dir)) == 1
+
+        # The second time, the grammar is not parsed.
+        g2 = compile(grammar, cache_dir=cache_dir)
+        assert g2.root_node is None
+        assert g2.match_prefix('abc de').variables().get('var2') == 'de'
+        assert g2.match('abc def').variables().get('var1') == 'abc'
+
+        # Invalid cache files are ignored.
+        for name in os.listdir(cache_dir):
+            with open(os.path.join(cache_dir, name), 'w') as f:
+                f.write('invalid')
+
+        g3 = compile(grammar, cache_dir=cache_dir)
+        assert g3.root_node is not None
+        assert g3.match('abc def').variables().get('var2') == 'def'
+    finally:
+        shutil.rmtree(cache_dir)